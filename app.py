@@ -5,14 +5,15 @@ BOTIX 荷兰内河船全周期成本分析工具
 这是升级版主程序入口文件（v6.0），负责初始化页面、加载
 输入参数、执行成本计算并调度各功能模块。文件控制
 UI 排版，确保各分析模块按照顺序展示，同时嵌入
-品牌 LOGO。每个程序文件保持在 100 行以内，便于维护
+品牌 LOGO。每个模块运行在独立的 fragment 中，模块内
+控件变化只重跑该模块。每个程序文件保持在 100 行以内，便于维护
 与迭代。
 """
 
 import streamlit as st
 
 from inputs import sidebar_inputs
-from cost_calculations import calculate_costs
+from core.scenario import cached_costs, cost_cache
 from visualizations import (
     show_cost_charts,
     show_opex_piecharts,
@@ -24,6 +25,39 @@ from modules.charging_analysis import charging_module
 from modules.power_calculation import power_module
 from modules.sailing_analysis import sailing_module
 from modules.sensitivity_analysis import sensitivity_module
+from modules.monte_carlo_analysis import monte_carlo_module
+from modules.voyage_simulation import voyage_module
+from modules.goal_seek_analysis import goal_seek_module
+from modules.report_export import report_export_module
+from modules.profiling_panel import profiling_panel, profiling_toggle, sync_profiling
+from core.profiling import is_enabled, span
+
+
+# 各模块：(标题, 渲染函数, 依赖的共享输入)。依赖 "costs"/"params" 的模块在侧边栏
+# 参数变化（整页重跑）时取得新结果；模块内控件变化只重跑该模块自身。
+SECTIONS = [
+    ("## 📈 模块 M2 - 成本累计与对比分析", show_cost_charts, ("costs", "params")),
+    ("## 📊 模块 M8 - 运营成本占比分析", show_opex_piecharts, ("costs", "params")),
+    ("## 💹 模块 M9 - ROI与回本周期分析", show_roi_analysis, ("costs", "params")),
+    ("## ♻️ 模块 M11 - 碳排放与减排效益分析", show_carbon_emissions, ("costs",)),
+    ("## 📊 模块 M10 - 成本敏感性分析", sensitivity_module, ("costs", "params")),
+    ("## 🎲 模块 M13 - 蒙特卡洛不确定性分析", monte_carlo_module, ("params",)),
+    ("## 🎯 目标求解模块", goal_seek_module, ("params",)),
+    ("## 📄 批量报告导出模块", report_export_module, ("params",)),
+    ("## 📑 模块 M12 - CEMT 船型快速查询", cemt_reference_module, ()),
+    ("## 🔌 岸电充电能力分析模块", charging_module, ("params",)),
+    ("## 🛠️ 船舶功率需求计算模块", power_module, ()),
+    ("## 🚤 续航能力分析模块", sailing_module, ()),
+    ("## 🧭 航次能量仿真模块", voyage_module, ()),
+]
+
+
+@st.fragment
+def render_section(render, *args) -> None:
+    """在独立的重跑作用域中渲染模块，模块内控件变化时只重跑本函数。"""
+    sync_profiling()
+    with span(render.__name__):
+        render(*args)
 
 
 def main() -> None:
@@ -32,56 +66,35 @@ def main() -> None:
         page_title="BOTIX 荷兰内河船全周期成本分析工具",
         layout="wide",
     )
-    # 显示 LOGO
-    st.image("assets/botix_logo.png", width=150)
-    st.title("BOTIX 荷兰内河船全周期成本与收益分析")
-    st.markdown("---")
-
-    # 1. 获取用户输入
-    params = sidebar_inputs()
-    # 2. 执行成本计算
-    try:
-        costs = calculate_costs(params)
-    except Exception as ex:
-        st.error(f"🚨 成本计算出错: {ex}")
-        st.stop()
-    # 3. 模块展示
-    st.markdown("## 📈 模块 M2 - 成本累计与对比分析")
-    show_cost_charts(costs, params)
-    st.markdown("---")
-
-    st.markdown("## 📊 模块 M8 - 运营成本占比分析")
-    show_opex_piecharts(costs, params)
-    st.markdown("---")
-
-    st.markdown("## 💹 模块 M9 - ROI与回本周期分析")
-    show_roi_analysis(costs, params)
-    st.markdown("---")
-
-    st.markdown("## ♻️ 模块 M11 - 碳排放与减排效益分析")
-    show_carbon_emissions(costs)
-    st.markdown("---")
-
-    st.markdown("## 📊 模块 M10 - 成本敏感性分析")
-    sensitivity_module(costs, params)
-    st.markdown("---")
-
-    st.markdown("## 📑 模块 M12 - CEMT 船型快速查询")
-    cemt_reference_module()
-    st.markdown("---")
-
-    st.markdown("## 🔌 岸电充电能力分析模块")
-    charging_module()
-    st.markdown("---")
-
-    st.markdown("## 🛠️ 船舶功率需求计算模块")
-    power_module()
-    st.markdown("---")
-
-    st.markdown("## 🚤 续航能力分析模块")
-    sailing_module()
-    st.markdown("---")
+    sync_profiling()
+    with span("rerun"):
+        # 显示 LOGO
+        st.image("assets/botix_logo.png", width=150)
+        st.title("BOTIX 荷兰内河船全周期成本与收益分析")
+        st.markdown("---")
+
+        # 1. 获取用户输入
+        with span("sidebar_inputs"):
+            params = sidebar_inputs()
+        # 2. 执行成本计算
+        try:
+            with span("cached_costs"):
+                costs = cached_costs(params)
+        except Exception as ex:
+            st.error(f"🚨 成本计算出错: {ex}")
+            st.stop()
+        stats = cost_cache.stats()
+        st.sidebar.caption(f"成本缓存：命中 {stats['hits']} / 未命中 {stats['misses']}（命中率 {stats['hit_rate']:.0%}）")
+        profiling_toggle()
+        # 3. 模块展示
+        shared = {"costs": costs, "params": params}
+        for title, render, deps in SECTIONS:
+            st.markdown(title)
+            render_section(render, *(shared[d] for d in deps))
+            st.markdown("---")
+    if is_enabled():
+        profiling_panel()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
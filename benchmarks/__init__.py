@@ -0,0 +1 @@
+"""BOTIX benchmarks package."""
\ No newline at end of file
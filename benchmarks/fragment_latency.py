@@ -0,0 +1,100 @@
+# fragment_latency.py (v6.0)
+"""模块内控件交互延迟对比（v6.0）。
+
+对每个模块修改其中一个控件，比较两种重跑方式的耗时：
+
+- 整页重跑（改造前）：通过 ``AppTest`` 重跑整个 ``app.py``；
+- 模块重跑（改造后）：只执行该模块的 fragment，等价于用同样的
+  ``costs``/``params`` 单独运行该模块的渲染函数。
+
+``AppTest`` 目前不模拟 fragment 级重跑，因此后者以单模块脚本计时。
+
+用法::
+
+    python -m benchmarks.fragment_latency [--repeat 5]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import Any, List, Optional
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (模块名, 控件类型, 控件 key 或标签, 新取值)
+INTERACTIONS = [
+    ("M8 运营成本占比", "radio", "opex_ship", "STAGE V 柴油船 (EU)"),
+    ("M9 ROI", "radio", "roi_ship", "电动船 (CN)"),
+    ("M10 敏感性", "selectbox", "选择敏感因素", "电价"),
+    ("M12 CEMT", "number_input", "cemt_length", 120.0),
+    ("岸电充电", "number_input", "岸电电压(V)", 690),
+    ("功率需求", "number_input", "disp", 2000.0),
+    ("续航能力", "number_input", "charged_energy_sailing_module", 3000),
+]
+
+
+def _widget(at: AppTest, kind: str, ident: str) -> Any:
+    """按 key 查找控件，找不到时按标签查找。"""
+    widgets = getattr(at, kind)
+    for w in widgets:
+        if w.key == ident or w.label == ident:
+            return w
+    raise KeyError(ident)
+
+
+def _section_script(name: str) -> None:
+    """单模块脚本：以默认侧边栏参数计算一次 costs 后只渲染目标模块。"""
+    import streamlit as st
+    from app import SECTIONS
+    from core.scenario import cached_costs
+    from inputs import sidebar_inputs
+    if "bench_shared" not in st.session_state:
+        params = sidebar_inputs()
+        st.session_state["bench_shared"] = {"costs": cached_costs(params), "params": params}
+    shared = st.session_state["bench_shared"]
+    for title, render, deps in SECTIONS:
+        if name in title:
+            render(*(shared[d] for d in deps))
+
+
+def _timed_runs(at: AppTest, kind: str, ident: str, value: Any, repeat: int) -> List[float]:
+    samples = []
+    for i in range(repeat):
+        widget = _widget(at, kind, ident)
+        widget.set_value(value if i % 2 == 0 else widget.value)
+        start = time.perf_counter()
+        at.run()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return samples
+
+
+SECTION_KEYS = {"M8 运营成本占比": "M8", "M9 ROI": "M9", "M10 敏感性": "M10", "M12 CEMT": "M12",
+                "岸电充电": "岸电", "功率需求": "功率", "续航能力": "续航"}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """逐个交互测量整页与单模块重跑耗时，打印中位数对比。"""
+    parser = argparse.ArgumentParser(description="模块交互延迟对比")
+    parser.add_argument("--repeat", type=int, default=5, help="每个交互重复次数")
+    args = parser.parse_args(argv)
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+
+    page = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=300)
+    page.run()
+    print(f"{'交互':<14}{'整页重跑 ms':>14}{'模块重跑 ms':>14}{'加速':>8}")
+    for name, kind, ident, value in INTERACTIONS:
+        full = statistics.median(_timed_runs(page, kind, ident, value, args.repeat))
+        section = AppTest.from_function(_section_script, args=(SECTION_KEYS[name],), default_timeout=300)
+        section.run()
+        part = statistics.median(_timed_runs(section, kind, ident, value, args.repeat))
+        print(f"{name:<14}{full:>14.1f}{part:>14.1f}{full / part:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+# import_budget.py (v6.0)
+"""导入耗时预算检查（v6.0）。
+
+在全新解释器中分别导入各模块，取多次运行的最小耗时与预算对比，
+并检查计算核心是否误导入 Streamlit、Plotly、Matplotlib、pandas，以及
+纯标准库模块是否误导入 NumPy。
+超出预算或出现禁止依赖时返回非零退出码，可直接用于 CI。
+
+用法::
+
+    python -m benchmarks.import_budget [--repeat 5] [--scale 1.5]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ('streamlit', 'plotly', 'matplotlib', 'pandas')
+
+# 模块: (预算毫秒, 禁止导入的重型依赖)；预算约为空闲机器上实测最小导入耗时的 1.5–2 倍，
+# 较慢的机器用 --scale 放大
+BUDGETS: Dict[str, Tuple[float, Tuple[str, ...]]] = {
+    'utils.helpers': (110.0, HEAVY),
+    'utils.param_metadata': (5.0, HEAVY),
+    'utils.data_loader': (650.0, ('streamlit', 'plotly', 'matplotlib')),
+    'cost_calculations': (120.0, HEAVY),
+    'core.formulas': (110.0, HEAVY),
+    'core.cemt': (110.0, HEAVY),
+    'core.scenario': (120.0, HEAVY),
+    'core.sensitivity': (120.0, HEAVY),
+    'core.monte_carlo': (150.0, HEAVY),
+    'core.fleet': (120.0, HEAVY),
+    'core.voyage': (110.0, HEAVY),
+    'core.goal_seek': (120.0, HEAVY),
+    'core.jobs': (30.0, HEAVY + ('numpy',)),
+    'core.vessels': (20.0, HEAVY + ('numpy',)),
+    'core.smart_charging': (110.0, HEAVY),
+    'core.port_sim': (150.0, HEAVY),
+    'core.report_export': (150.0, HEAVY),
+    'core.service': (200.0, HEAVY),
+    'visualizations': (760.0, ('matplotlib',)),
+}
+# 探测全部预算项中出现过的禁止依赖
+PROBED: Tuple[str, ...] = tuple(sorted({m for _, forbidden in BUDGETS.values() for m in forbidden}))
+
+_PROBE = (
+    "import json, sys, time; t = time.perf_counter(); import {mod}; "
+    "print(json.dumps([time.perf_counter() - t, sorted(m for m in {heavy!r} if m in sys.modules)]))"
+)
+
+
+def measure(module: str, repeat: int = 5) -> Tuple[float, List[str]]:
+    """返回模块在全新解释器中的最小导入耗时 (ms) 与已加载的 ``PROBED`` 依赖。"""
+    best, loaded = float('inf'), []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', _PROBE.format(mod=module, heavy=PROBED)],
+                             cwd=ROOT, capture_output=True, text=True, check=True).stdout
+        seconds, loaded = json.loads(out.strip().splitlines()[-1])
+        best = min(best, seconds * 1000.0)
+    return best, loaded
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """逐模块测量并打印结果，存在超标项时返回 1。"""
+    parser = argparse.ArgumentParser(description="BOTIX 导入耗时预算检查")
+    parser.add_argument("--repeat", type=int, default=5, help="每个模块测量次数，取最小值")
+    parser.add_argument("--scale", type=float, default=float(os.environ.get('IMPORT_BUDGET_SCALE', 1.0)),
+                        help="预算放大系数，用于较慢的机器")
+    args = parser.parse_args(argv)
+    failed = 0
+    for module, (budget, forbidden) in BUDGETS.items():
+        ms, loaded = measure(module, args.repeat)
+        bad = [m for m in loaded if m in forbidden]
+        ok = ms <= budget * args.scale and not bad
+        failed += not ok
+        note = f" 禁止导入: {', '.join(bad)}" if bad else ""
+        print(f"{'OK ' if ok else 'FAIL'} {module:<22} {ms:8.1f} ms / {budget * args.scale:8.1f} ms{note}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
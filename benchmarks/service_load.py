@@ -0,0 +1,136 @@
+# service_load.py (v6.0)
+"""本地计算服务负载测试（v6.0）。
+
+多个客户端线程在各自的 keep-alive 连接上持续发送 ``POST /v1/costs``
+单场景请求，场景从固定大小的随机场景池中抽取（池越小缓存命中率越高），
+运行指定时长后报告吞吐量 (请求/秒)、延迟分位数与错误数，并读取服务端
+``/health`` 中的平均批大小与缓存命中率。未指定 ``--url`` 时在本进程内
+启动一个服务。
+
+用法::
+
+    python -m benchmarks.service_load [--url http://127.0.0.1:8765] [--clients 32]
+                                      [--duration 10] [--pool 1000] [--no-keepalive]
+"""
+
+import argparse
+import http.client
+import json
+import random
+import statistics
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+
+def scenario_pool(size: int, seed: int = 0) -> List[bytes]:
+    """随机场景池，每个元素为编码好的请求体。"""
+    rng = random.Random(seed)
+    return [json.dumps({'params': {
+        'mgo_price': round(rng.uniform(0.3, 1.2), 4),
+        'electricity_price': round(rng.uniform(0.1, 0.4), 4),
+        'annual_hours': rng.choice([1500.0, 2500.0, 4000.0]),
+        'battery_price': round(rng.uniform(200.0, 800.0), 1),
+    }}).encode() for _ in range(size)]
+
+
+def _client(host: str, port: int, pool: List[bytes], deadline: float, keepalive: bool, seed: int,
+            latencies: List[float], errors: List[str]) -> None:
+    rng = random.Random(seed)
+    conn = None
+    headers = {'Content-Type': 'application/json', 'Connection': 'keep-alive' if keepalive else 'close'}
+    while time.perf_counter() < deadline:
+        body = rng.choice(pool)
+        start = time.perf_counter()
+        try:
+            if conn is None:
+                conn = http.client.HTTPConnection(host, port, timeout=30)
+            conn.request('POST', '/v1/costs', body, headers)
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status != 200:
+                errors.append(f"HTTP {resp.status}")
+            if not keepalive or resp.will_close:
+                conn.close()
+                conn = None
+        except (OSError, http.client.HTTPException) as ex:
+            errors.append(type(ex).__name__)
+            conn = None
+            continue
+        latencies.append(time.perf_counter() - start)
+    if conn is not None:
+        conn.close()
+
+
+def run_load(url: str, clients: int = 32, duration: float = 10.0, pool_size: int = 1_000,
+             keepalive: bool = True) -> Dict[str, Any]:
+    """对服务施加负载，返回吞吐量、延迟分位数 (ms)、错误数与服务端统计。"""
+    parts = urlsplit(url)
+    pool = scenario_pool(pool_size)
+    per_client: List[List[float]] = [[] for _ in range(clients)]
+    errors: List[str] = []
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=_client, args=(parts.hostname, parts.port, pool, deadline, keepalive, i,
+                                                      per_client[i], errors), daemon=True) for i in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    latencies = sorted(x for lat in per_client for x in lat)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+    conn.request('GET', '/health')
+    health = json.loads(conn.getresponse().read())
+    conn.close()
+
+    def pct(q: float) -> float:
+        return latencies[min(int(q / 100 * len(latencies)), len(latencies) - 1)] * 1000.0 if latencies else float('nan')
+
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': len(latencies) / elapsed,
+        'p50_ms': pct(50), 'p90_ms': pct(90), 'p99_ms': pct(99),
+        'mean_ms': statistics.fmean(latencies) * 1000.0 if latencies else float('nan'),
+        'mean_batch': health['batcher']['mean_batch'],
+        'cache_hit_rate': health['cache']['hit_rate'],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口：打印负载测试结果。"""
+    parser = argparse.ArgumentParser(description="BOTIX 计算服务负载测试")
+    parser.add_argument("--url", default=None, help="服务地址，缺省在本进程内启动服务")
+    parser.add_argument("--clients", type=int, default=32, help="并发客户端（连接）数")
+    parser.add_argument("--duration", type=float, default=10.0, help="运行秒数")
+    parser.add_argument("--pool", type=int, default=1_000, help="随机场景池大小")
+    parser.add_argument("--no-keepalive", action="store_true", help="每个请求新建连接")
+    parser.add_argument("--max-batch", type=int, default=256, help="内置服务的单批最多场景数")
+    parser.add_argument("--max-delay-ms", type=float, default=2.0, help="内置服务的凑批等待毫秒数")
+    args = parser.parse_args(argv)
+
+    server = None
+    url = args.url
+    if url is None:
+        from core.service import ComputeService, make_server
+        server = make_server(port=0, service=ComputeService(args.max_batch, args.max_delay_ms / 1000.0))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        res = run_load(url, args.clients, args.duration, args.pool, not args.no_keepalive)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            server.service.close()
+    print(f"请求 {res['requests']}，错误 {res['errors']}，吞吐 {res['rps']:.0f} 请求/秒")
+    print(f"延迟 ms：P50 {res['p50_ms']:.2f}  P90 {res['p90_ms']:.2f}  P99 {res['p99_ms']:.2f}  平均 {res['mean_ms']:.2f}")
+    print(f"服务端：平均批大小 {res['mean_batch']:.1f}，缓存命中率 {res['cache_hit_rate']:.0%}")
+    return 1 if res['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
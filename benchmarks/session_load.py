@@ -0,0 +1,248 @@
+# session_load.py (v6.0)
+"""多会话负载测试与会话内存统计（v6.0）。
+
+以 ``AppTest`` 在同一进程内启动 N 个模拟用户会话，每个会话在独立线程中
+执行随机操作序列：修改侧边栏输入、切换单选框、操作折叠面板中的控件，
+每次操作后整页重跑。``AppTest`` 总会执行折叠面板的内容，因此“展开”
+折叠面板即以操作其中的控件代替。
+
+``AppTest.run`` 会改写进程级全局状态（运行时实例与配置项），不能在多个
+线程中同时执行，因此各会话的重跑经同一把锁串行执行；会话的共享缓存、
+``session_state`` 与内存占用仍与多会话服务器一致。延迟分别报告重跑本身
+的耗时与含排队等待的耗时，后者相当于 N 个用户同时操作时的响应时间。
+
+报告：
+
+- 重跑延迟分位数（所有会话合并，P50/P90/P99，含排队与不含排队）；
+- 每个会话 ``session_state`` 的深度大小及占用最大的键；
+- 进程总 RSS：启动前、首个会话运行后（含库导入与缓存预热）、其余会话
+  首次运行后（折算为每会话增量）以及每轮操作后的变化，用于估算服务器
+  容量并在发布前发现内存增长；
+- 进程内共享缓存（成本缓存、图表缓存）的条目数。
+
+用法::
+
+    python -m benchmarks.session_load [--sessions 8] [--rounds 3] [--steps 5]
+                                      [--seed 0] [--max-growth-mb 50]
+"""
+
+import argparse
+import gc
+import os
+import random
+import resource
+import statistics
+import sys
+import threading
+import time
+import types
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.fragment_latency import _widget
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (控件类型, 控件 key 或标签, 随机取值函数)，前几项位于侧边栏，其后为各模块单选框与折叠面板内控件
+ACTIONS: List[Tuple[str, str, Callable[[random.Random, Any], Any]]] = [
+    ("slider", "mgo_price", lambda rng, w: round(rng.uniform(w.min, w.max), 2)),
+    ("slider", "electricity_price", lambda rng, w: round(rng.uniform(w.min, w.max), 2)),
+    ("slider", "battery_price", lambda rng, w: round(rng.uniform(w.min, w.max) / 10) * 10),
+    ("number_input", "annual_hours", lambda rng, w: float(rng.choice([1500, 2500, 4000, 6000]))),
+    ("number_input", "avg_trip_distance", lambda rng, w: float(rng.randint(50, 400))),
+    ("checkbox", "smart_equipment_selected", lambda rng, w: not w.value),
+    ("radio", "opex_ship", lambda rng, w: rng.choice(w.options)),
+    ("radio", "opex_view", lambda rng, w: rng.choice(w.options)),
+    ("radio", "roi_ship", lambda rng, w: rng.choice(w.options)),
+    ("radio", "tornado_ship", lambda rng, w: rng.choice(w.options)),
+    ("selectbox", "选择敏感因素", lambda rng, w: rng.choice(w.options)),
+    ("number_input", "cemt_length", lambda rng, w: float(rng.randint(40, 135))),
+]
+
+# 不计入会话大小的对象：模块、类与函数属于代码而非会话数据
+_SKIP = (types.ModuleType, type, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+_RUN_LOCK = threading.Lock()
+
+
+def rss_bytes() -> int:
+    """当前进程常驻内存 (字节)，无 ``/proc`` 时退化为峰值 RSS。"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> int:
+    """进程峰值常驻内存 (字节)；Linux 上 ``ru_maxrss`` 单位为 KB，macOS 为字节。"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def deep_sizeof(obj: Any, seen: Optional[set] = None) -> int:
+    """对象及其引用的数据的总字节数，已计入的对象 (按 id) 不重复计算。"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen or isinstance(obj, _SKIP):
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        base = obj.base if obj.base is not None else None
+        return sys.getsizeof(obj) + (obj.nbytes if base is None else deep_sizeof(base, seen))
+    if hasattr(obj, "memory_usage") and hasattr(obj, "columns"):
+        return int(obj.memory_usage(deep=True).sum())
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(x, seen) for x in obj)
+    elif isinstance(obj, (str, bytes, bytearray, int, float, complex, bool)) or obj is None:
+        pass
+    else:
+        if hasattr(obj, "__dict__"):
+            size += deep_sizeof(vars(obj), seen)
+        for name in getattr(type(obj), "__slots__", ()):
+            if hasattr(obj, name):
+                size += deep_sizeof(getattr(obj, name), seen)
+    return size
+
+
+def session_memory(at: AppTest, top: int = 3) -> Dict[str, Any]:
+    """会话内存：``SessionState`` 整体深度大小（含控件状态）与最大的几个用户可见键。"""
+    state = at.session_state._state._state
+    seen: set = set()
+    keys = sorted(((deep_sizeof(v, seen), k) for k, v in state.filtered_state.items()), reverse=True)
+    return {'total': deep_sizeof(state, seen) + sum(s for s, _ in keys), 'top': keys[:top]}
+
+
+def _rerun(at: AppTest) -> Tuple[float, float]:
+    """串行重跑一个会话，返回 (重跑耗时, 含排队耗时)，单位秒。"""
+    queued = time.perf_counter()
+    with _RUN_LOCK:
+        start = time.perf_counter()
+        at.run()
+        end = time.perf_counter()
+    return end - start, end - queued
+
+
+def _user(at: AppTest, steps: int, rng: random.Random, latencies: List[Tuple[float, float]],
+          errors: List[str]) -> None:
+    """一个模拟用户：随机操作 ``steps`` 次，每次操作后整页重跑并记录耗时。"""
+    for _ in range(steps):
+        kind, ident, pick = rng.choice(ACTIONS)
+        try:
+            widget = _widget(at, kind, ident)
+            widget.set_value(pick(rng, widget))
+            latencies.append(_rerun(at))
+            if at.exception:
+                errors.append(f"{ident}: {at.exception[0].value}")
+        except Exception as ex:  # 单个会话失败不影响其余会话的统计
+            errors.append(f"{ident}: {type(ex).__name__}: {ex}")
+
+
+def _parallel(targets: List[Callable[[], None]]) -> None:
+    threads = [threading.Thread(target=t, daemon=True) for t in targets]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def run_sessions(sessions: int = 8, rounds: int = 3, steps: int = 5, seed: int = 0,
+                 timeout: float = 300.0) -> Dict[str, Any]:
+    """启动 ``sessions`` 个会话并发运行 ``rounds`` 轮、每轮每会话 ``steps`` 次操作。
+
+    Returns:
+        延迟分位数 (ms)、每会话 ``session_state`` 大小、各阶段 RSS (MB) 与共享缓存条目数。
+    """
+    from core.scenario import cost_cache
+    from visualizations import figure_cache
+
+    gc.collect()
+    rss_start = rss_bytes()
+    apps = [AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=timeout) for _ in range(sessions)]
+    first: List[float] = []
+
+    def initial(at: AppTest) -> None:
+        first.append(_rerun(at)[0])
+
+    initial(apps[0])  # 首个会话承担库导入与共享缓存预热，不计入每会话增量
+    gc.collect()
+    rss_warm = rss_bytes()
+    _parallel([lambda at=at: initial(at) for at in apps[1:]])
+    gc.collect()
+    rss_loaded = rss_bytes()
+    rngs = [random.Random(seed * 1_000_003 + i) for i in range(sessions)]
+    latencies: List[List[Tuple[float, float]]] = [[] for _ in range(sessions)]
+    errors: List[str] = []
+    rss_rounds = []
+    for _ in range(rounds):
+        _parallel([lambda i=i: _user(apps[i], steps, rngs[i], latencies[i], errors) for i in range(sessions)])
+        gc.collect()
+        rss_rounds.append(rss_bytes())
+    runs = sorted(x[0] for lat in latencies for x in lat)
+    waits = sorted(x[1] for lat in latencies for x in lat)
+
+    def pct(samples: List[float], q: float) -> float:
+        return samples[min(int(q / 100 * len(samples)), len(samples) - 1)] * 1000.0 if samples else float('nan')
+
+    mb = 1 / 2 ** 20
+    memory = [session_memory(at) for at in apps]
+    return {
+        'reruns': len(runs),
+        'errors': errors,
+        'first_ms': statistics.median(first) * 1000.0,
+        **{f'p{q}_ms': pct(runs, q) for q in (50, 90, 99)},
+        **{f'queued_p{q}_ms': pct(waits, q) for q in (50, 90, 99)},
+        'session_kb': [m['total'] / 1024 for m in memory],
+        'session_top': memory[0]['top'] if memory else [],
+        'rss_start_mb': rss_start * mb,
+        'rss_loaded_mb': rss_loaded * mb,
+        'rss_warm_mb': rss_warm * mb,
+        'rss_per_session_mb': (rss_loaded - rss_warm) * mb / max(sessions - 1, 1),
+        'rss_rounds_mb': [r * mb for r in rss_rounds],
+        'growth_mb': (rss_rounds[-1] - rss_rounds[0]) * mb if len(rss_rounds) > 1 else 0.0,
+        'peak_rss_mb': peak_rss_bytes() * mb,
+        'cost_cache': cost_cache.stats()['size'],
+        'figure_cache': figure_cache.stats()['size'],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口：打印延迟与内存报告，超过内存增长阈值时返回 1。"""
+    parser = argparse.ArgumentParser(description="BOTIX 多会话负载测试与内存统计")
+    parser.add_argument("--sessions", type=int, default=8, help="并发模拟用户数")
+    parser.add_argument("--rounds", type=int, default=3, help="操作轮数，每轮后记录一次 RSS")
+    parser.add_argument("--steps", type=int, default=5, help="每轮每个会话的操作次数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--max-growth-mb", type=float, default=None, help="首轮之后允许的 RSS 增长上限 (MB)")
+    args = parser.parse_args(argv)
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+
+    res = run_sessions(args.sessions, args.rounds, args.steps, args.seed)
+    sizes = res['session_kb']
+    print(f"会话 {args.sessions}，重跑 {res['reruns']} 次，错误 {len(res['errors'])}")
+    for err in res['errors'][:5]:
+        print(f"  {err}")
+    print(f"首次运行中位数 {res['first_ms']:.0f} ms；重跑延迟 ms：P50 {res['p50_ms']:.0f}  "
+          f"P90 {res['p90_ms']:.0f}  P99 {res['p99_ms']:.0f}；含排队 P50 {res['queued_p50_ms']:.0f}  "
+          f"P90 {res['queued_p90_ms']:.0f}  P99 {res['queued_p99_ms']:.0f}")
+    print(f"session_state：平均 {statistics.fmean(sizes):.0f} KB，最大 {max(sizes):.0f} KB；最大的键 "
+          + "，".join(f"{k} {s / 1024:.0f} KB" for s, k in res['session_top']))
+    print(f"RSS：启动前 {res['rss_start_mb']:.0f} MB，首个会话后 {res['rss_warm_mb']:.0f} MB，"
+          f"全部会话后 {res['rss_loaded_mb']:.0f} MB "
+          f"(每会话 {res['rss_per_session_mb']:.1f} MB)，峰值 {res['peak_rss_mb']:.0f} MB")
+    print("各轮后 RSS (MB)：" + " → ".join(f"{r:.0f}" for r in res['rss_rounds_mb'])
+          + f"，首轮后增长 {res['growth_mb']:+.1f} MB")
+    print(f"共享缓存：成本 {res['cost_cache']} 条，图表 {res['figure_cache']} 条")
+    if args.max_growth_mb is not None and res['growth_mb'] > args.max_growth_mb:
+        print(f"内存增长超过阈值 {args.max_growth_mb:.0f} MB")
+        return 1
+    return 1 if res['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+# suite.py (v6.0)
+"""性能基准套件（v6.0）。
+
+覆盖标量成本模型、1 / 10^3 / 10^5 / 10^6 个场景的批量计算、敏感性
+扫描、1000 艘船全年逐时智能充电调度以及 ``visualizations`` 中的图表构建（Matplotlib 使用 Agg 后端
+离线渲染 PNG，Plotly 只构建图对象并序列化，不依赖浏览器或网络）。
+每个用例报告最短耗时、吞吐量与 ``tracemalloc`` 统计的峰值内存，
+可保存为基线 JSON，并与基线对比：吞吐量下降或峰值内存上升超过
+阈值百分比即返回非零退出码。此外 ``REFERENCE_SECONDS`` 内置了改造前
+（v6.0 基线）标量模型的单次耗时，``scalar_model`` 慢于其
+``--reference-factor`` 倍时同样判为回退，无需事先保存基线文件。
+
+10^6 场景按 10^5 一块分块计算（与蒙特卡洛引擎一致），单块结果约
+几百 MB，整批一次计算会超出普通机器内存。
+
+用法::
+
+    python -m benchmarks.suite [--repeat 3] [--only batch] [--skip-large]
+                               [--save baseline.json] [--compare baseline.json] [--threshold 20]
+                               [--reference-factor 3]
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+from cost_calculations import calculate_costs, calculate_costs_batch, merge_columns  # noqa: E402
+from utils.param_metadata import default_params  # noqa: E402
+
+BATCH_CHUNK = 100_000
+LARGE = 1_000_000
+# 用例名: (构建函数, 每次调用处理的单位数, 单位)；构建函数返回无参可调用对象
+Case = Tuple[Callable[[], Callable[[], Any]], int, str]
+# 改造前（v6.0 基线）纯 Python 标量 calculate_costs 在参考机器上的单次耗时 (秒)
+REFERENCE_SECONDS: Dict[str, float] = {'scalar_model': 47e-6}
+
+
+def _scenarios(n: int, seed: int = 0) -> Dict[str, Any]:
+    """在默认参数上对主要价格与耗量参数做 ±20% 均匀扰动，得到 n 行列式参数表。"""
+    rng = np.random.default_rng(seed)
+    base = default_params()
+    keys = ('electricity_price', 'mgo_price', 'battery_price', 'annual_hours', 'electric_consumption_per_hour')
+    return merge_columns(base, {k: base[k] * rng.uniform(0.8, 1.2, n) for k in keys}, n)
+
+
+def _scalar_case() -> Callable[[], Any]:
+    params = default_params()
+    return lambda: calculate_costs(params)
+
+
+def _batch_case(n: int) -> Callable[[], Callable[[], Any]]:
+    def build() -> Callable[[], Any]:
+        chunks = [_scenarios(min(BATCH_CHUNK, n - start), seed=start) for start in range(0, n, BATCH_CHUNK)]
+        # 每块计算后只保留末年累计成本，丢弃完整轨迹以控制内存
+        return lambda: [calculate_costs_batch(rows)['cumulative_costs'][:, :, -1] for rows in chunks]
+    return build
+
+
+def _sweep_case() -> Callable[[], Any]:
+    from core.sensitivity import sweep
+    params = default_params()
+    return lambda: sweep(params, 'electricity_price', np.linspace(0.1, 0.5, 101))
+
+
+def _sweep_2d_case() -> Callable[[], Any]:
+    from core.sensitivity import sweep_2d
+    params = default_params()
+    return lambda: sweep_2d(params, 'electricity_price', np.linspace(0.1, 0.5, 50), 'mgo_price', np.linspace(0.4, 1.0, 50))
+
+
+def _tornado_case() -> Callable[[], Any]:
+    from core.sensitivity import tornado
+    params = default_params()
+    return lambda: tornado(params)
+
+
+def _smart_charging_case() -> Callable[[], Any]:
+    from core.smart_charging import berth_mask, schedule_charging, synthetic_profiles
+    rng = np.random.default_rng(0)
+    profiles = synthetic_profiles()
+    berth = berth_mask(rng.integers(16, 22, 1_000), rng.integers(4, 9, 1_000))
+    need, power = rng.uniform(500, 2_000, 1_000), rng.uniform(50, 200, 1_000)
+    return lambda: schedule_charging(profiles['price'], profiles['carbon'], need, berth, power)
+
+
+def _port_sim_case() -> Callable[[], Any]:
+    from core.port_sim import simulate_port
+    return lambda: simulate_port(1_000, 60, 150.0, 20.0, 1_500.0, min_dwell=3.0, max_wait=12.0, max_calls=100_000,
+                                 horizon_hours=1e9)
+
+
+def _cost_figure_case() -> Callable[[], Any]:
+    from visualizations import _build_cost_figure
+    costs = calculate_costs(default_params())
+    years = tuple(costs['years'])
+    series = [(label, '#636EFA', years, tuple(costs['cumulative_costs'][label])) for label in costs['cumulative_costs']]
+    markers = [('x', '大修', 'bottom right', ())] * len(series)
+    return lambda: _build_cost_figure(series, markers, False).to_json()
+
+
+def _pie_case() -> Callable[[], Any]:
+    from visualizations import _render_pie
+    labels = ['能源', '维护', '船员', '港口费', '大修费', '保险', '电池更换费']
+    return lambda: _render_pie([5, 3, 2, 1, 1, 1, 2], labels, '占比图')
+
+
+CASES: Dict[str, Case] = {
+    'scalar_model': (_scalar_case, 1, 'scenario'),
+    'batch_1': (_batch_case(1), 1, 'scenario'),
+    'batch_1e3': (_batch_case(1_000), 1_000, 'scenario'),
+    'batch_1e5': (_batch_case(100_000), 100_000, 'scenario'),
+    'batch_1e6': (_batch_case(LARGE), LARGE, 'scenario'),
+    'sweep_1d_101': (_sweep_case, 101, 'point'),
+    'sweep_2d_50x50': (_sweep_2d_case, 2_500, 'point'),
+    'tornado': (_tornado_case, 1, 'chart'),
+    'smart_charging_1e3': (_smart_charging_case, 1_000, 'vessel-year'),
+    'port_sim_1e5': (_port_sim_case, 100_000, 'call'),
+    'figure_cost_curve': (_cost_figure_case, 1, 'figure'),
+    'figure_pie_png': (_pie_case, 1, 'figure'),
+}
+
+
+def run_case(name: str, repeat: int = 3) -> Dict[str, Any]:
+    """运行单个用例：预热一次后取 ``repeat`` 次最短耗时，再单独测一次峰值内存。"""
+    build, units, unit = CASES[name]
+    fn = build()
+    fn()
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    best = min(times)
+    return {
+        'seconds': best,
+        'median_seconds': statistics.median(times),
+        'throughput': units / best,
+        'unit': f"{unit}/s",
+        'peak_mb': peak / 2**20,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """返回超出阈值的回退项：吞吐量下降或峰值内存上升超过 ``threshold`` 百分比。"""
+    failures = []
+    for name, res in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            continue
+        drop = (1 - res['throughput'] / base['throughput']) * 100
+        grow = (res['peak_mb'] / max(base['peak_mb'], 1e-6) - 1) * 100
+        if drop > threshold:
+            failures.append(f"{name}: 吞吐量下降 {drop:.1f}% (> {threshold:g}%)")
+        if grow > threshold and res['peak_mb'] - base['peak_mb'] > 1.0:
+            failures.append(f"{name}: 峰值内存上升 {grow:.1f}% (> {threshold:g}%)")
+    return failures
+
+
+def check_reference(current: Dict[str, Any], factor: float) -> List[str]:
+    """返回慢于内置参考耗时 ``factor`` 倍的用例。"""
+    failures = []
+    for name, ref in REFERENCE_SECONDS.items():
+        res = current['results'].get(name)
+        if res is not None and res['seconds'] > ref * factor:
+            failures.append(f"{name}: 耗时 {res['seconds'] * 1e6:.0f} µs，超过基线 {ref * 1e6:.0f} µs 的 {factor:g} 倍")
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """运行选定用例并打印结果；与基线对比出现回退时返回 1。"""
+    parser = argparse.ArgumentParser(description="BOTIX 性能基准套件")
+    parser.add_argument("--repeat", type=int, default=3, help="每个用例计时次数，取最小值")
+    parser.add_argument("--only", default=None, help="只运行名称匹配该正则的用例")
+    parser.add_argument("--skip-large", action="store_true", help="跳过 10^6 场景用例")
+    parser.add_argument("--save", default=None, help="将结果保存为基线 JSON")
+    parser.add_argument("--compare", default=None, help="与指定基线 JSON 对比")
+    parser.add_argument("--threshold", type=float, default=float(os.environ.get('BENCH_THRESHOLD', 20.0)),
+                        help="允许的回退百分比")
+    parser.add_argument("--reference-factor", type=float, default=3.0, help="相对内置基线耗时允许的倍数")
+    args = parser.parse_args(argv)
+    names = [n for n in CASES if (args.only is None or re.search(args.only, n))
+             and not (args.skip_large and CASES[n][1] >= LARGE)]
+    current = {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': {},
+    }
+    for name in names:
+        res = run_case(name, args.repeat)
+        current['results'][name] = res
+        print(f"{name:<18} {res['seconds'] * 1e3:10.2f} ms {res['throughput']:14,.1f} {res['unit']:<13} 峰值 {res['peak_mb']:8.2f} MB")
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+        print(f"已保存基线: {args.save}")
+    failures = check_reference(current, args.reference_factor)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            failures += compare(current, json.load(f), args.threshold)
+    for line in failures:
+        print(f"FAIL {line}")
+    if failures:
+        return 1
+    if args.compare:
+        print(f"OK 与基线相比无超过 {args.threshold:g}% 的回退")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
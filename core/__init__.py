@@ -0,0 +1 @@
+"""BOTIX core package."""
\ No newline at end of file
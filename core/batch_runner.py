@@ -0,0 +1,146 @@
+# batch_runner.py (v6.0)
+"""无界面批量场景计算命令行工具（v6.0）。
+
+读取 CSV 或 Parquet 场景文件（每行一艘船或一个方案，列名与
+``param_info`` 及侧边栏参数一致，缺失列取默认值），按固定行数分块
+调用 ``calculate_costs_batch``，并将结果流式写出为 CSV 或 Parquet。
+同时在途的块数受进程数限制，内存占用与输入总行数无关。本模块不导入
+Streamlit、Plotly 或 Matplotlib。
+
+用法::
+
+    python -m core.batch_runner scenarios.csv results.parquet --chunk-size 50000 --workers 4
+"""
+
+import argparse
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from cost_calculations import BUILD_COMPONENTS, BUILD_KEYS, DERIVED_KEYS, SHIP_CODES, calculate_costs_batch, merge_columns
+from utils.param_metadata import default_params
+
+
+def param_columns() -> List[str]:
+    """场景文件中被识别为参数的列名。"""
+    defaults = default_params()
+    keys = [k for k in defaults if k not in BUILD_KEYS]
+    keys += [f"{ship}_{c}" for ship in BUILD_KEYS for c in BUILD_COMPONENTS]
+    return keys + list(DERIVED_KEYS)
+
+
+def _is_parquet(path: str) -> bool:
+    return path.lower().endswith(('.parquet', '.pq'))
+
+
+def read_chunks(path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """按块读取场景文件。"""
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+class ChunkWriter:
+    """按块追加写出 CSV 或 Parquet 结果文件。"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._writer = None
+        self._first = True
+
+    def write(self, frame: pd.DataFrame) -> None:
+        if _is_parquet(self.path):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            frame.to_csv(self.path, mode='w' if self._first else 'a', header=self._first, index=False)
+        self._first = False
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+def evaluate_chunk(frame: pd.DataFrame, keep: Optional[List[str]] = None,
+                   full_years: bool = False) -> pd.DataFrame:
+    """计算一块场景并整理为结果表。
+
+    Args:
+        frame: 场景数据块，缺失的参数列取默认值。
+        keep: 原样保留到结果中的列；None 表示保留所有非参数列（如船名、编号）。
+        full_years: 为 True 时追加每年累计成本列。
+    """
+    known = set(param_columns())
+    overrides = {key: frame[key].to_numpy() for key in frame.columns if key in known}
+    cols = merge_columns(default_params(), overrides, len(frame))
+    res = calculate_costs_batch(cols)
+
+    keep = [c for c in frame.columns if c not in known] if keep is None else keep
+    out: Dict[str, Any] = {c: frame[c].to_numpy() for c in keep}
+    out['annual_income'] = res['annual_income']
+    for j, code in enumerate(SHIP_CODES):
+        out[f"initial_cost_{code}"] = res['initial_costs'][:, j]
+        out[f"annual_cost_{code}"] = res['annual_costs'][:, j]
+        out[f"tco_{code}"] = res['cumulative_costs'][:, j, -1]
+        out[f"payback_year_{code}"] = res['payback_year'][:, j]
+        out[f"emission_t_{code}"] = res['annual_emissions'][:, j]
+        if full_years:
+            for y in res['years']:
+                out[f"cum_cost_{code}_y{y}"] = res['cumulative_costs'][:, j, y]
+    return pd.DataFrame(out)
+
+
+def run(input_path: str, output_path: str, chunk_size: int = 50_000, workers: int = 1,
+        keep: Optional[List[str]] = None, full_years: bool = False) -> int:
+    """流式处理整个场景文件，返回处理的总行数。"""
+    writer = ChunkWriter(output_path)
+    rows = 0
+    try:
+        if workers <= 1:
+            for frame in read_chunks(input_path, chunk_size):
+                writer.write(evaluate_chunk(frame, keep, full_years))
+                rows += len(frame)
+            return rows
+        pending: deque = deque()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for frame in read_chunks(input_path, chunk_size):
+                pending.append(pool.submit(evaluate_chunk, frame, keep, full_years))
+                rows += len(frame)
+                # 限制在途块数，保持内存恒定并按输入顺序写出
+                while len(pending) >= 2 * workers:
+                    writer.write(pending.popleft().result())
+            while pending:
+                writer.write(pending.popleft().result())
+        return rows
+    finally:
+        writer.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口。"""
+    parser = argparse.ArgumentParser(description="BOTIX 批量场景成本计算")
+    parser.add_argument("input", help="输入场景文件 (.csv / .parquet)")
+    parser.add_argument("output", help="输出结果文件 (.csv / .parquet)")
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="每块行数")
+    parser.add_argument("--workers", type=int, default=1, help="并行进程数")
+    parser.add_argument("--keep", default=None, help="逗号分隔的保留列，默认保留所有非参数列")
+    parser.add_argument("--full-years", action="store_true", help="输出每年累计成本")
+    args = parser.parse_args(argv)
+    keep = args.keep.split(',') if args.keep else None
+    rows = run(args.input, args.output, args.chunk_size, args.workers, keep, args.full_years)
+    print(f"已处理 {rows} 行 -> {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+# cemt.py (v6.0)
+"""CEMT 内河船舶等级参考数据与查询（v6.0）。
+
+提供 CEMT 等级表、按船长匹配等级以及按典型功率估算固定航程所需
+电量的函数，供 Streamlit 模块与无界面调用共用。等级表在导入时
+预先转换为数值区间数组（长度上界、功率上下限），单船查询与整份
+船舶登记表的批量分级都通过 ``np.searchsorted`` 完成。
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+CEMT_TABLE = [
+    {"级别": "I", "长度范围": (0.0, 38.5), "宽度范围": "≤5.05 m", "水道里程": 300, "船舶数": 200, "功率范围": "≤200 kW"},
+    {"级别": "II", "长度范围": (38.5, 50.0), "宽度范围": "5.05–6.60 m", "水道里程": 1200, "船舶数": 800, "功率范围": "200–400 kW"},
+    {"级别": "III", "长度范围": (50.0, 80.0), "宽度范围": "6.60–9.50 m", "水道里程": 2000, "船舶数": 1500, "功率范围": "400–600 kW"},
+    {"级别": "IV", "长度范围": (80.0, 110.0), "宽度范围": "9.50–11.40 m", "水道里程": 3500, "船舶数": 1200, "功率范围": "600–1000 kW"},
+    {"级别": "V", "长度范围": (110.0, 185.0), "宽度范围": "11.40–12.50 m", "水道里程": 5000, "船舶数": 600, "功率范围": "1000–1500 kW"},
+    {"级别": "VI", "长度范围": (185.0, 200.0), "宽度范围": "12.50–17.00 m", "水道里程": 750, "船舶数": 150, "功率范围": "1500–2000 kW"},
+]
+
+
+def power_band(row: Dict[str, Any]) -> Tuple[int, int]:
+    """解析功率范围字符串，返回 (最小功率, 最大功率) kW。"""
+    if '–' in row['功率范围']:
+        p_min, p_max = [int(x) for x in row['功率范围'].replace(' kW', '').split('–')]
+    else:
+        single = int(row['功率范围'].replace('≤', '').split()[0])
+        p_min = p_max = single
+    return p_min, p_max
+
+
+def range_energy(p_avg: float, distance_km: float = 60.0, speed_kmh: float = 10.0) -> Tuple[float, float]:
+    """按平均功率估算完成给定航程所需的 (航行小时, 电量 kWh)。"""
+    hours = distance_km / speed_kmh
+    return hours, p_avg * hours
+
+
+# 预计算的数值索引：各级长度区间首尾相接，按上界有序排列
+CEMT_CLASSES = np.array([row["级别"] for row in CEMT_TABLE], dtype=object)
+LENGTH_MIN = CEMT_TABLE[0]["长度范围"][0]
+LENGTH_UPPER = np.array([row["长度范围"][1] for row in CEMT_TABLE])
+POWER_MIN, POWER_MAX = (np.array(band, dtype=float) for band in zip(*(power_band(row) for row in CEMT_TABLE)))
+
+
+def cemt_index(lengths: Any) -> np.ndarray:
+    """批量返回船长所属等级在 ``CEMT_TABLE`` 中的下标，超出范围（含 NaN）为 -1。
+
+    区间边界归入较低等级，与逐行匹配 ``lo <= L <= hi`` 的首个结果一致。
+    """
+    lengths = np.asarray(lengths, dtype=float)
+    idx = np.searchsorted(LENGTH_UPPER, lengths, side='left')
+    valid = (lengths >= LENGTH_MIN) & (idx < len(LENGTH_UPPER))
+    return np.where(valid, idx, -1)
+
+
+def match_cemt(length: float) -> Optional[Dict[str, Any]]:
+    """按船长返回匹配的 CEMT 等级行，超出范围时返回 None。"""
+    idx = int(cemt_index(length))
+    return CEMT_TABLE[idx] if idx >= 0 else None
+
+
+def classify(lengths: Any, distance_km: float = 60.0, speed_kmh: float = 10.0) -> Dict[str, np.ndarray]:
+    """批量分级：返回每条船的等级、功率范围与固定航程电量估算。
+
+    Returns:
+        ``index``、``class``（未匹配为 None）、``p_min``、``p_max``、``p_avg`` (kW)、
+        ``hours`` 与 ``energy_kWh``，未匹配的数值为 NaN。
+    """
+    idx = cemt_index(lengths)
+    valid = idx >= 0
+    safe = np.where(valid, idx, 0)
+    p_min = np.where(valid, POWER_MIN[safe], np.nan)
+    p_max = np.where(valid, POWER_MAX[safe], np.nan)
+    p_avg = (p_min + p_max) / 2
+    hours, energy = range_energy(p_avg, distance_km, speed_kmh)
+    return {
+        'index': idx,
+        'class': np.where(valid, CEMT_CLASSES[safe], None),
+        'p_min': p_min,
+        'p_max': p_max,
+        'p_avg': p_avg,
+        'hours': np.where(valid, hours, np.nan),
+        'energy_kWh': energy,
+    }
+
+
+def classify_register(register: Any, length_col: str, distance_km: float = 60.0,
+                      speed_kmh: float = 10.0) -> Any:
+    """为船舶登记表 (DataFrame) 的每一行追加 CEMT 等级、功率范围与航程电量列。"""
+    import pandas as pd
+    res = classify(pd.to_numeric(register[length_col], errors='coerce').to_numpy(dtype=float), distance_km, speed_kmh)
+    out = register.copy()
+    out['CEMT级别'] = res['class']
+    out['最小功率(kW)'] = res['p_min']
+    out['最大功率(kW)'] = res['p_max']
+    out['平均功率(kW)'] = res['p_avg']
+    out[f'{distance_km:g}km电量(kWh)'] = res['energy_kWh']
+    return out
@@ -0,0 +1,99 @@
+# fleet.py (v6.0)
+"""船队组合现金流聚合引擎（v6.0）。
+
+船队表每行一艘船，给出船型、投运年份与该船自身的参数（航线、电池、
+建造成本等，缺失取默认值）。引擎先以 ``calculate_costs_batch`` 一次
+计算全部船舶的逐年数组，再按投运年份平移到统一的日历年轴上，用
+``np.bincount`` 分船型求和，得到船队逐年建造支出、大修/换电支出、
+运营成本、收入、碳排放与累计现金流。计算量为 O(船舶数 × 年数)，
+全部为数组运算。本模块不依赖 Streamlit。
+"""
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from cost_calculations import SHIP_CODES, SHIP_TYPES, calculate_costs_batch, merge_columns
+from utils.param_metadata import default_params
+
+FLEET_COLUMNS = ('ship_type', 'commission_year', 'service_years')
+
+
+def _ship_index(values: Any) -> np.ndarray:
+    """将船型列（中文名称、代码或下标）转为船型下标数组。"""
+    values = np.asarray(values)
+    if values.dtype.kind in 'iuf':
+        return values.astype(int)
+    lookup = {name: i for i, name in enumerate(SHIP_TYPES)}
+    lookup.update({code: i for i, code in enumerate(SHIP_CODES)})
+    return np.array([lookup[v] for v in values], dtype=int)
+
+
+def aggregate_fleet(vessels: Any, base_params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """聚合船队逐年现金流。
+
+    Args:
+        vessels: ``pandas.DataFrame`` 或列字典。必需列 ``ship_type``（船型名称、
+            ``SHIP_CODES`` 代码或下标）与 ``commission_year``（投运日历年）；可选
+            ``service_years``（服役年数，默认与模型年限一致，不得超过模型年限）；
+            其余列按参数名覆盖 ``base_params``。
+        base_params: 基准参数，缺省为 ``default_params()``。
+
+    Returns:
+        ``calendar`` 为日历年数组 (T,)；``by_type`` 中 ``capex``（初期建造）、
+        ``events``（大修/换电）、``opex``（年度运营含保险）、``income``、
+        ``cashflow``、``emissions``（吨 CO2）与 ``fleet_size`` 均为 (船型, T)；
+        ``total`` 为对应的船队合计 (T,)，另含 ``cum_cashflow``。
+
+    Raises:
+        ValueError: 存在服役年数超过模型年限的船舶（超出部分无法计入，
+            船队成本会被低估），应先调大 ``horizon_years``。
+    """
+    if hasattr(vessels, 'columns'):
+        vessels = {c: vessels[c].to_numpy() for c in vessels.columns}
+    ship = _ship_index(vessels['ship_type'])
+    start = np.asarray(vessels['commission_year'], dtype=int)
+    n = len(ship)
+    overrides = {k: np.asarray(v) for k, v in vessels.items() if k not in FLEET_COLUMNS}
+    res = calculate_costs_batch(merge_columns(base_params or default_params(), overrides, n), time_step='year')
+
+    rows = np.arange(n)
+    years = res['years']
+    n_years = len(years)
+    service = np.asarray(vessels.get('service_years', np.full(n, n_years - 1)), dtype=int)
+    over = np.flatnonzero(service > n_years - 1)
+    if over.size:
+        raise ValueError(f"第 {', '.join(str(i) for i in over[:10])} 行船舶的服役年数超过模型年限 "
+                         f"{n_years - 1} 年，请调大 horizon_years")
+    active = years[None, :] <= service[:, None]
+    operating = active & (years[None, :] > 0)
+
+    initial = res['initial_costs'][rows, ship]
+    annual = res['annual_costs'][rows, ship]
+    income = np.broadcast_to(res['annual_income'], (n,))
+    emissions = res['annual_emissions'][rows, ship]
+    per_vessel = {
+        'capex': np.where(years[None, :] == 0, initial[:, None], 0.0),
+        'events': np.where(active, res['event_costs'][rows, ship], 0.0),
+        'opex': np.where(operating, annual[:, None], 0.0),
+        'income': np.where(operating, income[:, None], 0.0),
+        'emissions': np.where(operating, emissions[:, None], 0.0),
+        'fleet_size': operating.astype(float),
+    }
+    per_vessel['cashflow'] = per_vessel['income'] - per_vessel['opex'] - per_vessel['events'] - per_vessel['capex']
+
+    # 平移到日历年轴并按船型累加
+    first = int(start.min()) if n else 0
+    n_cal = (int(start.max()) - first + n_years) if n else n_years
+    slots = (ship[:, None] * n_cal + (start - first)[:, None] + years[None, :]).ravel()
+    size = len(SHIP_TYPES) * n_cal
+    by_type = {key: np.bincount(slots, weights=arr.ravel(), minlength=size).reshape(len(SHIP_TYPES), n_cal)
+               for key, arr in per_vessel.items()}
+    total = {key: arr.sum(axis=0) for key, arr in by_type.items()}
+    total['cum_cashflow'] = np.cumsum(total['cashflow'])
+    return {
+        'ships': SHIP_TYPES,
+        'calendar': np.arange(first, first + n_cal),
+        'by_type': by_type,
+        'total': total,
+    }
@@ -0,0 +1,47 @@
+# formulas.py (v6.0)
+"""岸电、功率与续航计算公式（v6.0）。
+
+从各 Streamlit 模块中抽出的纯计算函数，仅依赖标准库与 NumPy，
+参数既可为标量也可为等长数组，便于批量与无界面调用。
+"""
+
+import math
+from typing import Any, Tuple
+
+import numpy as np
+
+SQRT3 = math.sqrt(3)
+CRUISE_POWER_RATIO = 0.7
+
+
+def _scalar(value: Any) -> Any:
+    """0 维数组还原为 Python 标量。"""
+    return value.item() if isinstance(value, np.ndarray) and value.ndim == 0 else value
+
+
+def shore_charging_power(voltage: Any, current: Any, power_factor: Any) -> Any:
+    """交流三相岸电充电功率 (kW)：P = √3 · U · I · PF / 1000。"""
+    return voltage * current * SQRT3 * power_factor / 1000.0
+
+
+def charged_energy(charged_power: Any, docking_hours: Any, battery_capacity: Any) -> Any:
+    """靠岸时间内可充入的电量 (kWh)，不超过电池容量。"""
+    return _scalar(np.minimum(charged_power * docking_hours, battery_capacity))
+
+
+def installed_power(displacement: Any, k_disp: Any) -> Any:
+    """按排水量经验系数估算推荐安装功率 (kW)：P_inst = k_disp · Δ。"""
+    return k_disp * displacement
+
+
+def cruise_power(p_inst: Any, ratio: float = CRUISE_POWER_RATIO) -> Any:
+    """连续巡航功率 (kW)，默认取安装功率的 70%。"""
+    return p_inst * ratio
+
+
+def sailing_endurance(charged_energy: Any, ship_power: Any, sailing_speed: Any) -> Tuple[Any, Any]:
+    """按充入电量与航行功率估算续航时间 (h) 与航程 (km)；功率为 0 时续航为 0。"""
+    power = np.asarray(ship_power, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hours = np.where(power != 0, charged_energy / np.where(power != 0, power, 1.0), 0.0)
+    return _scalar(hours), _scalar(hours * sailing_speed)
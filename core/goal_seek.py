@@ -0,0 +1,129 @@
+# goal_seek.py (v6.0)
+"""目标求解器（v6.0）。
+
+回答成本模型的反向问题：满足航线能量需求的最小电池容量、电动船
+先于柴油船回本（或全周期成本更低）的临界电价、在 N 年内回本所需的
+补贴比例。求解采用批量网格细化：每一轮在当前区间上取一组点，由
+``calculate_costs_batch``（或 ``simulate_voyage``）一次性向量化计算，
+定位条件首次成立的位置后把区间收缩到相邻两点之间，数轮即可收敛，
+每次查询只需几次批量调用。本模块不依赖 Streamlit。
+"""
+
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+from cost_calculations import SHIP_TYPES
+from core.sensitivity import evaluate
+from core.vessels import VESSEL_TYPES, VESSELS_BY_NAME
+from core.voyage import simulate_voyage
+
+SUBSIDY_KEYS = {v.name: v.subsidy_key for v in VESSEL_TYPES}
+CRITERIA = ('payback', 'tco')
+
+
+def grid_refine(condition: Callable[[np.ndarray], np.ndarray], lo: float, hi: float,
+                points: int = 33, tol: float = 1e-6, max_iter: int = 30) -> Dict[str, Any]:
+    """从 ``lo`` 向 ``hi`` 方向寻找 ``condition`` 首次成立的取值。
+
+    ``condition`` 接收一维取值数组并返回等长布尔数组，要求在区间内单调
+    （只翻转一次）；``lo`` 可大于 ``hi``，用于从上往下搜索。
+
+    Returns:
+        ``value`` 为条件成立的最靠近 ``lo`` 的取值（区间内始终不成立时为 None），
+        ``bracket`` 为最终区间，``at_bound`` 表示在 ``lo`` 处即已成立，
+        ``evaluations`` 与 ``iterations`` 为计算点数与轮数。
+    """
+    xs = np.linspace(lo, hi, points)
+    ok = np.asarray(condition(xs), dtype=bool)
+    evaluations, iterations = points, 1
+    if ok[0]:
+        return {'value': float(lo), 'bracket': (float(lo), float(lo)), 'at_bound': True,
+                'evaluations': evaluations, 'iterations': iterations}
+    if not ok.any():
+        return {'value': None, 'bracket': (float(lo), float(hi)), 'at_bound': False,
+                'evaluations': evaluations, 'iterations': iterations}
+    i = int(np.argmax(ok))
+    a, b = xs[i - 1], xs[i]
+    while abs(b - a) > tol * max(1.0, abs(b)) and iterations < max_iter:
+        xs = np.linspace(a, b, points)[1:-1]
+        ok = np.asarray(condition(xs), dtype=bool)
+        evaluations += len(xs)
+        iterations += 1
+        if ok.any():
+            i = int(np.argmax(ok))
+            a, b = (xs[i - 1] if i else a), xs[i]
+        else:
+            a = xs[-1]
+    return {'value': float(b), 'bracket': (float(a), float(b)), 'at_bound': False,
+            'evaluations': evaluations, 'iterations': iterations}
+
+
+def _payback_years(res: Dict[str, Any], ship: str) -> np.ndarray:
+    """某船型的回本年限，未回本记为无穷大。"""
+    pb = res['payback_year'][:, SHIP_TYPES.index(ship)]
+    return np.where(pb >= 0, pb / res['steps_per_year'], np.inf)
+
+
+def _tco(res: Dict[str, Any], ship: str) -> np.ndarray:
+    return res['cumulative_costs'][:, SHIP_TYPES.index(ship), -1]
+
+
+def solve_param(params: Dict[str, Any], key: str, lo: float, hi: float,
+                predicate: Callable[[Dict[str, Any]], np.ndarray], **kwargs: Any) -> Dict[str, Any]:
+    """对任意数值参数求解：``predicate`` 接收批量结果并返回 (N,) 布尔数组。"""
+    return grid_refine(lambda xs: predicate(evaluate(params, {key: xs})), lo, hi, **kwargs)
+
+
+def subsidy_for_payback(params: Dict[str, Any], ship: str, years: float,
+                        lo: float = 0.0, hi: float = 1.0, **kwargs: Any) -> Dict[str, Any]:
+    """使 ``ship`` 在 ``years`` 年内回本所需的最小补贴比例。"""
+    res = solve_param(params, SUBSIDY_KEYS[ship], lo, hi, lambda r: _payback_years(r, ship) <= years, **kwargs)
+    res['key'] = SUBSIDY_KEYS[ship]
+    return res
+
+
+def break_even_price(params: Dict[str, Any], ship: str = SHIP_TYPES[1], against: str = SHIP_TYPES[0],
+                     key: str = 'electricity_price', criterion: str = 'payback',
+                     lo: float = 0.0, hi: float = 1.0, **kwargs: Any) -> Dict[str, Any]:
+    """``ship`` 仍优于 ``against`` 的最高价格（从 ``hi`` 向 ``lo`` 搜索）。
+
+    ``criterion='payback'`` 要求 ``ship`` 严格先于 ``against`` 回本；``'tco'``
+    要求末年累计成本不高于 ``against``。
+    """
+    if criterion not in CRITERIA:
+        raise ValueError(f"未知的比较口径: {criterion}，可选 {CRITERIA}")
+    if criterion == 'payback':
+        predicate = lambda r: _payback_years(r, ship) < _payback_years(r, against)
+    else:
+        predicate = lambda r: _tco(r, ship) <= _tco(r, against)
+    res = solve_param(params, key, hi, lo, predicate, **kwargs)
+    res['key'] = key
+    return res
+
+
+def min_battery_for_route(params: Dict[str, Any], route: Dict[str, Any], ship: str = SHIP_TYPES[1],
+                          lo: float = 100.0, hi: float = 20000.0, step: float = 50.0,
+                          **kwargs: Any) -> Dict[str, Any]:
+    """满足航线 SOC 下限的最小电池容量，以及可行容量中全周期成本最低者。
+
+    ``route`` 为 ``simulate_voyage`` 除电池容量外的参数。全周期成本并不随
+    电池容量单调变化：容量越大循环寿命对应的年限越长，换电次数按整数
+    跳变，TCO 在若干容量处阶梯式下降。因此先求可行性阈值，再在
+    [阈值, ``hi``] 上以 ``step`` 为间距批量计算 TCO 取最小值。
+
+    Returns:
+        ``value`` 为最小可行容量，``tco`` 为其全周期成本；``best_size`` 与
+        ``best_tco`` 为可行容量中 TCO 最低者；``sizes``/``tcos`` 为所评估的网格。
+        无可行容量时上述取值均为 None。
+    """
+    key = VESSELS_BY_NAME[ship].capacity_key
+    res = grid_refine(lambda xs: simulate_voyage(battery_kWh=xs, **route)['feasible'], lo, hi, **kwargs)
+    res.update(key=key, tco=None, best_size=None, best_tco=None, sizes=None, tcos=None)
+    if res['value'] is not None:
+        sizes = np.unique(np.concatenate([[res['value']], np.arange(np.ceil(res['value'] / step) * step, hi + step / 2, step)]))
+        tcos = _tco(evaluate(params, {key: sizes}), ship)
+        best = int(np.argmin(tcos))
+        res.update(tco=float(tcos[0]), best_size=float(sizes[best]), best_tco=float(tcos[best]), sizes=sizes, tcos=tcos)
+        res['evaluations'] += len(sizes)
+    return res
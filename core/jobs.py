@@ -0,0 +1,212 @@
+# jobs.py (v6.0)
+"""后台分析任务池（v6.0）。
+
+耗时分析（大网格敏感性扫描、蒙特卡洛等）提交到进程内共享的线程池
+执行，Streamlit 脚本线程只轮询状态，页面保持可交互，其它控件的重跑
+也不会从头重启分析。每个任务有会话内的任务 ID，任务函数通过
+``JobContext.report`` 汇报进度与阶段性结果，并在各块之间调用
+``JobContext.check``，收到取消请求时抛出 ``JobCancelled`` 协作退出。
+
+线程池大小（环境变量 ``BOTIX_JOB_WORKERS``，默认 CPU 核数）限定了
+全部会话合计的计算线程数；每个会话同时排队或运行的任务数不超过
+``BOTIX_JOBS_PER_SESSION``（默认 2），超出时 ``submit`` 抛出
+``JobLimitError``。``submit`` 的 ``key`` 标识任务输入，同名任务的输入
+变化时旧任务自动取消。
+
+已结束的任务在 ``BOTIX_JOB_TTL`` 秒（默认 1800）后由 ``get``、``jobs``
+等查询顺带清理；设置了 ``session_alive`` 时，所属会话已不存在的任务会被
+取消并移除，避免断开的会话继续占用线程与内存。本模块仅依赖标准库。
+"""
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+ACTIVE = ('queued', 'running')
+HISTORY_PER_SESSION = 20
+RESULT_TTL = float(os.environ.get('BOTIX_JOB_TTL', 1800))
+
+
+class JobCancelled(Exception):
+    """任务被取消时由 ``JobContext.check`` 抛出。"""
+
+
+class JobLimitError(RuntimeError):
+    """会话内活动任务数已达上限。"""
+
+
+@dataclass
+class Job:
+    """一个后台任务的状态快照（由任务池线程更新）。"""
+
+    id: str
+    session: str
+    name: str
+    key: Hashable = None
+    status: str = 'queued'
+    progress: float = 0.0
+    message: str = ''
+    partial: Any = None
+    result: Any = None
+    error: Optional[str] = None
+    submitted: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def active(self) -> bool:
+        return self.status in ACTIVE
+
+    @property
+    def elapsed(self) -> float:
+        """已运行秒数（排队期间为 0）。"""
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+
+class JobContext:
+    """传给任务函数的上下文：汇报进度、检查取消。"""
+
+    def __init__(self, job: Job) -> None:
+        self._job = job
+
+    @property
+    def cancelled(self) -> bool:
+        return self._job.cancel_event.is_set()
+
+    def check(self) -> None:
+        """已请求取消时抛出 ``JobCancelled``。"""
+        if self._job.cancel_event.is_set():
+            raise JobCancelled(self._job.id)
+
+    def report(self, progress: float, partial: Any = None, message: str = '') -> None:
+        """汇报进度 (0–1) 与可选的阶段性结果，并检查是否已取消。"""
+        self._job.progress = min(max(float(progress), 0.0), 1.0)
+        if partial is not None:
+            self._job.partial = partial
+        if message:
+            self._job.message = message
+        self.check()
+
+
+class JobManager:
+    """共享任务池：按会话管理任务、限制并发并支持取消。"""
+
+    def __init__(self, max_workers: Optional[int] = None, per_session: Optional[int] = None,
+                 ttl: float = RESULT_TTL, session_alive: Optional[Callable[[str], bool]] = None) -> None:
+        """
+        Args:
+            ttl: 已结束任务的保留秒数。
+            session_alive: 判断会话是否仍存在的回调，由界面层按运行时注入；
+                为 None 时不检查会话。
+        """
+        self.max_workers = max_workers or int(os.environ.get('BOTIX_JOB_WORKERS', os.cpu_count() or 1))
+        self.per_session = per_session or int(os.environ.get('BOTIX_JOBS_PER_SESSION', 2))
+        self.ttl = ttl
+        self.session_alive = session_alive
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='botix-job')
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, session: str, name: str, fn: Callable[..., Any], *args: Any,
+               key: Hashable = None, **kwargs: Any) -> Job:
+        """提交任务 ``fn(ctx, *args, **kwargs)``，返回 ``Job``。
+
+        同一会话中同名且 ``key`` 相同的活动任务直接返回，``key`` 不同则先取消旧任务。
+        """
+        with self._lock:
+            for job in self._session_jobs(session):
+                if job.name == name and job.active:
+                    if job.key == key:
+                        return job
+                    job.cancel_event.set()
+            active = [j for j in self._session_jobs(session) if j.active and not j.cancel_event.is_set()]
+            if len(active) >= self.per_session:
+                raise JobLimitError(f"每个会话最多同时运行 {self.per_session} 个分析任务")
+            job = Job(id=uuid.uuid4().hex[:12], session=session, name=name, key=key)
+            self._jobs[job.id] = job
+            self._prune()
+        self._pool.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job: Job, fn: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        if job.cancel_event.is_set():
+            job.status, job.finished = 'cancelled', time.time()
+            return
+        job.status, job.started = 'running', time.time()
+        try:
+            job.result = fn(JobContext(job), *args, **kwargs)
+            job.progress, job.status = 1.0, 'done'
+        except JobCancelled:
+            job.status = 'cancelled'
+        except Exception as ex:  # 任务异常记录在 Job 上，由界面展示
+            job.status, job.error = 'error', f"{type(ex).__name__}: {ex}"
+        finally:
+            job.finished = time.time()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def jobs(self, session: str) -> List[Job]:
+        """会话内的任务，按提交时间排序。"""
+        with self._lock:
+            self._prune()
+            return self._session_jobs(session)
+
+    def latest(self, session: str, name: str) -> Optional[Job]:
+        """会话内最近提交的同名任务。"""
+        found = [j for j in self.jobs(session) if j.name == name]
+        return found[-1] if found else None
+
+    def cancel(self, job_id: str) -> bool:
+        """请求取消任务，返回任务是否仍处于活动状态。"""
+        job = self.get(job_id)
+        if job is None or not job.active:
+            return False
+        job.cancel_event.set()
+        return True
+
+    def cancel_session(self, session: str, name: Optional[str] = None) -> int:
+        """取消会话内（可限定名称的）全部活动任务，返回数量。"""
+        jobs = [j for j in self.jobs(session) if j.active and (name is None or j.name == name)]
+        for job in jobs:
+            job.cancel_event.set()
+        return len(jobs)
+
+    def stats(self) -> Dict[str, int]:
+        """全部会话的任务状态计数。"""
+        with self._lock:
+            out: Dict[str, int] = {}
+            for job in self._jobs.values():
+                out[job.status] = out.get(job.status, 0) + 1
+            return out
+
+    def _session_jobs(self, session: str) -> List[Job]:
+        return sorted((j for j in self._jobs.values() if j.session == session), key=lambda j: j.submitted)
+
+    def _prune(self) -> None:
+        """取消并移除已不存在会话的任务，移除超过 ``ttl`` 的已结束任务，
+        每个会话最多保留 ``HISTORY_PER_SESSION`` 个已结束任务。"""
+        now = time.time()
+        sessions = {j.session for j in self._jobs.values()}
+        for session in sessions:
+            if self.session_alive is not None and not self.session_alive(session):
+                for job in self._session_jobs(session):
+                    job.cancel_event.set()
+                    del self._jobs[job.id]
+                continue
+            done = [j for j in self._session_jobs(session) if not j.active]
+            kept = [j for j in done if j.finished is None or now - j.finished <= self.ttl]
+            for job in [j for j in done if j not in kept] + kept[:max(0, len(kept) - HISTORY_PER_SESSION)]:
+                del self._jobs[job.id]
+
+
+job_manager = JobManager()
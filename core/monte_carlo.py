@@ -0,0 +1,187 @@
+# monte_carlo.py (v6.0)
+"""蒙特卡洛不确定性分析引擎（v6.0）。
+
+为 ``param_info`` 中的输入参数指定分布（三角、正态、均匀），分块抽样
+并调用 ``calculate_costs_batch`` 批量计算，以固定箱数直方图流式汇总
+累计成本的 P10/P50/P90 区间与各年份回本概率。内存占用只取决于
+``chunk_size``，与样本总数无关；各块使用 ``SeedSequence`` 派生的独立
+种子，结果与进程池大小无关，可复现。本模块不依赖 Streamlit。
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from core.profiling import profiled
+from cost_calculations import DERIVED_KEYS, SHIP_TYPES, calculate_costs_batch
+from utils.param_metadata import param_info
+
+Dist = Tuple[Any, ...]
+DIST_TYPES = ("triangular", "normal", "uniform")
+N_BINS = 4096
+PERCENTILES = (10, 50, 90)
+
+
+def default_distributions(params: Dict[str, Any], spread: float = 0.2,
+                          kind: str = "triangular") -> Dict[str, Dist]:
+    """以当前参数为中心，为 ``param_info`` 中的每个参数生成默认分布。
+
+    三角分布为 (min, mode, max)，均匀分布为 (min, max)，正态分布为
+    (mean, std)，其中 std 取 spread / 2，使约 95% 样本落在 ±spread 内。
+    """
+    dists: Dict[str, Dist] = {}
+    for key in param_info:
+        value = float(params.get(key, param_info[key]['default']))
+        lo, hi = value * (1 - spread), value * (1 + spread)
+        if kind == "triangular":
+            dists[key] = ("triangular", lo, value, hi)
+        elif kind == "uniform":
+            dists[key] = ("uniform", lo, hi)
+        elif kind == "normal":
+            dists[key] = ("normal", value, abs(value) * spread / 2)
+        else:
+            raise ValueError(f"未知分布类型: {kind}")
+    return dists
+
+
+def sample_params(dists: Dict[str, Dist], n: int, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    """按分布定义抽取 n 组样本，负值截断为 0。"""
+    samples: Dict[str, np.ndarray] = {}
+    for key in sorted(dists):
+        kind, *args = dists[key]
+        if kind == "triangular":
+            lo, mode, hi = args
+            values = np.full(n, float(mode)) if hi <= lo else rng.triangular(lo, mode, hi, n)
+        elif kind == "normal":
+            values = rng.normal(args[0], args[1], n)
+        elif kind == "uniform":
+            values = rng.uniform(args[0], args[1], n)
+        else:
+            raise ValueError(f"未知分布类型: {kind}")
+        samples[key] = np.maximum(values, 0.0)
+    return samples
+
+
+def _evaluate(base: Dict[str, Any], dists: Dict[str, Dist], n: int,
+              seed: np.random.SeedSequence) -> Dict[str, np.ndarray]:
+    """抽样并批量计算一块样本。换电成本由批量引擎按抽样结果重新推导。"""
+    cols = {k: v for k, v in base.items() if k not in DERIVED_KEYS}
+    cols.update(sample_params(dists, n, np.random.default_rng(seed)))
+    return calculate_costs_batch(cols, time_step='year')
+
+
+def _histogram(values: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """对 (n, S, Y) 数组逐序列做直方图，含上下溢出箱，返回 (S, Y, N_BINS + 2)。"""
+    n, s, y = values.shape
+    width = np.where(hi > lo, hi - lo, 1.0)
+    idx = np.floor((values - lo) / width * N_BINS).astype(np.int64)
+    idx = np.clip(idx, -1, N_BINS) + 1
+    flat = idx + (np.arange(s * y).reshape(1, s, y) * (N_BINS + 2))
+    return np.bincount(flat.ravel(), minlength=s * y * (N_BINS + 2)).reshape(s, y, N_BINS + 2)
+
+
+def _run_chunk(args: Tuple[Any, ...]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """进程池任务：计算一块样本并返回直方图、回本年份计数与成本总和。"""
+    base, dists, n, seed, lo, hi = args
+    res = _evaluate(base, dists, n, seed)
+    return _reduce(res, lo, hi)
+
+
+def _reduce(res: Dict[str, Any], lo: np.ndarray, hi: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    cum = res['cumulative_costs']
+    n_years = cum.shape[-1]
+    payback = res['payback_year']
+    counts = np.stack([np.bincount(payback[:, j][payback[:, j] >= 0], minlength=n_years)
+                       for j in range(payback.shape[1])])
+    return _histogram(cum, lo, hi), counts, cum.sum(axis=0)
+
+
+def _quantiles(hist: np.ndarray, lo: np.ndarray, hi: np.ndarray, q: float) -> np.ndarray:
+    """由直方图按箱内线性插值求分位数，返回 (S, Y)。"""
+    total = hist.sum(axis=-1, keepdims=True)
+    cum = np.cumsum(hist, axis=-1)
+    target = q * total
+    k = np.argmax(cum >= target, axis=-1)
+    below = np.take_along_axis(cum, k[..., None], -1)[..., 0] - np.take_along_axis(hist, k[..., None], -1)[..., 0]
+    inside = np.take_along_axis(hist, k[..., None], -1)[..., 0]
+    frac = np.where(inside > 0, (target[..., 0] - below) / np.maximum(inside, 1), 0.0)
+    pos = np.clip(k - 1 + frac, 0, N_BINS)
+    return lo + (hi - lo) * pos / N_BINS
+
+
+@profiled()
+def run_monte_carlo(params: Dict[str, Any], dists: Optional[Dict[str, Dist]] = None,
+                    n_samples: int = 100_000, seed: int = 0, chunk_size: int = 20_000,
+                    workers: int = 1, on_chunk: Optional[Callable[[int, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """无界面蒙特卡洛分析入口。
+
+    Args:
+        params: 基准参数字典（与 ``calculate_costs`` 相同）。
+        dists: ``{参数名: (分布类型, *参数)}``；缺省时使用 ±20% 三角分布。
+        n_samples: 样本总数。
+        seed: 随机种子，相同种子与 chunk_size 下结果完全一致。
+        chunk_size: 每块样本数，决定峰值内存。
+        workers: 进程数，大于 1 时使用进程池并行计算各块。
+        on_chunk: 每完成一块后以 (已完成样本数, 阶段性结果) 回调，回调抛出的
+            异常（如任务取消）会中止计算。
+
+    Returns:
+        结果字典：``bands`` 为 {10/50/90: (船型, 年) 累计成本}，``mean`` 为
+        均值曲线，``payback_prob`` 为 (船型, 年) 到该年已回本的概率，
+        ``tco_hist`` 为末年累计成本直方图 (counts, edges)。
+    """
+    dists = dists if dists is not None else default_distributions(params)
+    seeds = np.random.SeedSequence(seed).spawn(max(1, -(-n_samples // chunk_size)))
+    sizes = [min(chunk_size, n_samples - i * chunk_size) for i in range(len(seeds))]
+
+    # 首块用于确定各序列直方图范围（两侧各留 50% 余量）
+    pilot = _evaluate(params, dists, sizes[0], seeds[0])
+    cum = pilot['cumulative_costs']
+    c_min, c_max = cum.min(axis=0), cum.max(axis=0)
+    lo, hi = c_min - 0.5 * (c_max - c_min), c_max + 0.5 * (c_max - c_min)
+    hist, counts, total = _reduce(pilot, lo, hi)
+    del pilot, cum
+    done = sizes[0]
+    if on_chunk is not None:
+        on_chunk(done, _summarize(hist, counts, total, lo, hi, done))
+
+    tasks = [(params, dists, n, s, lo, hi) for n, s in zip(sizes[1:], seeds[1:])]
+    with ProcessPoolExecutor(max_workers=workers) if workers > 1 and tasks else _inline() as pool:
+        for n, (h, c, t) in zip(sizes[1:], pool.map(_run_chunk, tasks)):
+            hist += h
+            counts += c
+            total += t
+            done += n
+            if on_chunk is not None:
+                on_chunk(done, _summarize(hist, counts, total, lo, hi, done))
+    return _summarize(hist, counts, total, lo, hi, n_samples)
+
+
+class _inline:
+    """与进程池接口一致的串行执行器，``map`` 惰性逐块计算。"""
+
+    def __enter__(self) -> "_inline":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+    @staticmethod
+    def map(fn: Callable, tasks: Any) -> Any:
+        return map(fn, tasks)
+
+
+def _summarize(hist: np.ndarray, counts: np.ndarray, total: np.ndarray,
+               lo: np.ndarray, hi: np.ndarray, n: int) -> Dict[str, Any]:
+    """由直方图与计数汇总分位数区间、均值与回本概率。"""
+    edges = np.linspace(lo[:, -1], hi[:, -1], N_BINS + 1, axis=-1)
+    return {
+        'ships': SHIP_TYPES,
+        'years': np.arange(hist.shape[1]),
+        'n_samples': n,
+        'bands': {q: _quantiles(hist, lo, hi, q / 100.0) for q in PERCENTILES},
+        'mean': total / n,
+        'payback_prob': np.cumsum(counts, axis=-1) / n,
+        'tco_hist': (hist[:, -1, 1:-1].copy(), edges),
+    }
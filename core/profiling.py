@@ -0,0 +1,162 @@
+# profiling.py (v6.0)
+"""轻量级计时剖析（v6.0）。
+
+``span(name)`` 上下文管理器与 ``profiled`` 装饰器记录各段耗时。设置
+环境变量 ``BOTIX_PROFILE=1`` 或在侧边栏隐藏开关中启用；开关按线程
+保存（Streamlit 每次重跑运行在各自的脚本线程中），关闭时 ``span``
+直接返回共享的空上下文，装饰器只多一次属性读取，开销接近于零。
+
+最外层 span 结束时形成一次“运行”记录（整页重跑或单模块 fragment
+重跑）。运行记录与滚动耗时样本按会话分开保存：``set_enabled`` 为当前
+线程登记会话 ID，每个会话保留最近 ``HISTORY`` 次运行与各名称最近
+``SAMPLES`` 个样本（用于 p50/p95 统计），最多保留最近活跃的
+``MAX_SESSIONS`` 个会话。查询、导出与清空均按会话进行，共享服务器上
+各用户互不可见。可导出为 JSON 或 Chrome trace（可在
+``chrome://tracing`` / Perfetto 中打开）。本模块仅依赖标准库。
+"""
+
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+ENV_VAR = 'BOTIX_PROFILE'
+ENABLED_BY_ENV = os.environ.get(ENV_VAR, '').lower() not in ('', '0', 'false', 'no')
+HISTORY = 50
+SAMPLES = 200
+MAX_SESSIONS = 32
+
+_local = threading.local()
+_lock = threading.Lock()
+_runs: "OrderedDict[Optional[str], Deque[Dict[str, Any]]]" = OrderedDict()
+_samples: Dict[Optional[str], Dict[str, Deque[float]]] = {}
+_NULL = contextlib.nullcontext()
+
+
+def is_enabled() -> bool:
+    """当前线程是否启用剖析，未显式设置时取环境变量。"""
+    return getattr(_local, 'enabled', ENABLED_BY_ENV)
+
+
+def set_enabled(flag: bool, session: Optional[str] = None) -> None:
+    """为当前线程（即本次重跑）开启或关闭剖析，并登记运行记录所属的会话。"""
+    _local.enabled = bool(flag)
+    _local.session = session
+
+
+class _Span:
+    __slots__ = ('name', 'start', 'record', 'owner')
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __enter__(self) -> "_Span":
+        run = getattr(_local, 'run', None)
+        self.owner = run is None
+        if self.owner:
+            run = _local.run = {'name': self.name, 'session': getattr(_local, 'session', None),
+                                'thread': threading.get_ident(), 'start': time.time(), 'spans': []}
+            _local.depth = 0
+            _local.origin = time.perf_counter()
+        self.record = {'name': self.name, 'depth': _local.depth}
+        run['spans'].append(self.record)
+        _local.depth += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        end = time.perf_counter()
+        _local.depth -= 1
+        self.record['offset_ms'] = (self.start - _local.origin) * 1e3
+        self.record['duration_ms'] = (end - self.start) * 1e3
+        if self.owner:
+            run = _local.run
+            _local.run = None
+            run['duration_ms'] = self.record['duration_ms']
+            _record(run)
+
+
+def _record(run: Dict[str, Any]) -> None:
+    session = run['session']
+    with _lock:
+        if session not in _runs:
+            _runs[session] = deque(maxlen=HISTORY)
+            _samples[session] = defaultdict(lambda: deque(maxlen=SAMPLES))
+        _runs.move_to_end(session)
+        _runs[session].append(run)
+        for rec in run['spans']:
+            _samples[session][rec['name']].append(rec['duration_ms'])
+        while len(_runs) > MAX_SESSIONS:
+            stale, _ = _runs.popitem(last=False)
+            del _samples[stale]
+
+
+def span(name: str) -> Any:
+    """计时上下文；剖析关闭时返回共享的空上下文。"""
+    if not getattr(_local, 'enabled', ENABLED_BY_ENV):
+        return _NULL
+    return _Span(name)
+
+
+def profiled(name: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """函数计时装饰器，默认以 ``模块.函数名`` 命名。"""
+    def decorate(fn: Callable) -> Callable:
+        label = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not getattr(_local, 'enabled', ENABLED_BY_ENV):
+                return fn(*args, **kwargs)
+            with _Span(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def runs(session: Optional[str] = None) -> List[Dict[str, Any]]:
+    """会话最近的运行记录（由旧到新）。"""
+    with _lock:
+        return list(_runs.get(session, ()))
+
+
+def stats(session: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    """会话内各名称的滚动统计：样本数、均值、p50、p95 (ms)。"""
+    with _lock:
+        samples = {k: sorted(v) for k, v in _samples.get(session, {}).items()}
+    out = {}
+    for name, values in samples.items():
+        n = len(values)
+        out[name] = {
+            'count': n,
+            'mean_ms': sum(values) / n,
+            'p50_ms': values[min(n - 1, int(0.50 * n))],
+            'p95_ms': values[min(n - 1, int(0.95 * n))],
+        }
+    return out
+
+
+def reset(session: Optional[str] = None) -> None:
+    """清空会话的运行记录与统计样本。"""
+    with _lock:
+        _runs.pop(session, None)
+        _samples.pop(session, None)
+
+
+def to_json(session: Optional[str] = None, indent: Optional[int] = 2) -> str:
+    """导出会话的运行记录与统计为 JSON 字符串。"""
+    return json.dumps({'runs': runs(session), 'stats': stats(session)}, ensure_ascii=False, indent=indent)
+
+
+def to_chrome_trace(session: Optional[str] = None) -> str:
+    """导出会话记录为 Chrome trace 事件格式（完整事件 ``ph='X'``，时间单位微秒）。"""
+    events = []
+    for run in runs(session):
+        base = run['start'] * 1e6
+        for rec in run['spans']:
+            events.append({'name': rec['name'], 'cat': run['name'], 'ph': 'X', 'pid': os.getpid(), 'tid': run['thread'],
+                           'ts': base + rec['offset_ms'] * 1e3, 'dur': rec['duration_ms'] * 1e3})
+    return json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'}, ensure_ascii=False)
@@ -0,0 +1,372 @@
+# report_export.py (v6.0)
+"""多场景批量报告导出（v6.0）。
+
+对每个场景计算成本结果，把初期成本、年度运营成本、保险、现金流与
+回本年限表格连同成本累计（M2）、运营成本占比（M8）、累计现金流
+（M9）与碳排放（M11）静态图表写入多工作表 Excel 和/或 PDF 报告。
+
+图表在进程池中用 Matplotlib 渲染为 PNG，同时在途的场景数受进程数
+限制并按输入顺序写出：Excel 以 openpyxl 只写模式逐行流式写入，图片
+先落盘到临时目录、保存时才读取；PDF 每个场景一页，由 ``PdfStream`` 逐页追加写盘。导出
+500 个场景时内存占用与场景总数无关。本模块在导入时不加载 Streamlit、
+Plotly 或 Matplotlib。
+
+用法::
+
+    python -m core.report_export scenarios.csv --xlsx report.xlsx --pdf report.pdf --workers 4
+"""
+
+import argparse
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from core.vessels import vessel
+from cost_calculations import BUILD_COMPONENTS, BUILD_KEYS, calculate_costs
+from utils.helpers import mpl_figure
+from utils.param_metadata import default_params
+
+CHARTS = (('cost', "累计成本对比"), ('opex', "年度运营成本占比"), ('cashflow', "累计净现金流"), ('emissions', "年度碳排放"))
+CHART_PX = (640, 400)
+PAGE_INCHES = (11.69, 8.27)  # A4 横向
+PAGE_DPI = 110
+SHEETS: Dict[str, Tuple[str, ...]] = {
+    "初期成本": ("场景", "船型", "初期建造成本 (€)"),
+    "年度成本": ("场景", "船型", "分项", "年度费用 (€)"),
+    "保险": ("场景", "船型", "年度保险费 (€)"),
+    "现金流": ("场景", "船型", "运营年数", "净现金流 (€)", "累计净现金流 (€)"),
+    "回本": ("场景", "船型", "回本年限", "全周期累计成本 (€)", "年度碳排放 (吨CO2)"),
+}
+CHART_SHEET = "图表"
+CHART_ROWS = 22  # 图表工作表中每个场景占用的行数
+
+
+Scenario = Tuple[str, Dict[str, Any]]
+
+
+def row_params(row: Dict[str, Any]) -> Dict[str, Any]:
+    """由场景文件的一行（列名同 ``batch_runner``）组装 ``calculate_costs`` 参数字典。"""
+    params = default_params()
+    for key, value in row.items():
+        if key in params and key not in BUILD_KEYS:
+            default = params[key]
+            params[key] = bool(value) if isinstance(default, bool) else value if isinstance(default, str) else float(value)
+    for ship in BUILD_KEYS:
+        params[ship] = [float(row.get(f"{ship}_{c}", v)) for c, v in zip(BUILD_COMPONENTS, params[ship])]
+    return params
+
+
+def read_scenarios(path: str, chunk_size: int = 1_000, name_column: Optional[str] = None) -> Iterator[Scenario]:
+    """按块读取场景文件，逐行产出 (场景名, 参数)；缺省名称列时取第一个非参数列或行号。"""
+    import pandas as pd
+
+    from core.batch_runner import param_columns, read_chunks
+    known = set(param_columns()) | set(default_params())
+    index = 0
+    for frame in read_chunks(path, chunk_size):
+        label = name_column or next((c for c in frame.columns if c not in known), None)
+        for row in frame.to_dict('records'):
+            index += 1
+            name = str(row[label]) if label is not None else f"场景 {index}"
+            yield name, row_params({k: v for k, v in row.items() if k in known and not pd.isna(v)})
+
+
+def count_scenarios(path: str) -> int:
+    """场景文件的行数（用于进度显示，不读取数据）。"""
+    from core.batch_runner import _is_parquet
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).metadata.num_rows
+    with open(path, 'rb') as fh:
+        return max(sum(1 for line in fh if line.strip()) - 1, 0)
+
+
+def scenario_tables(name: str, costs: Dict[str, Any]) -> Dict[str, List[tuple]]:
+    """单个场景各工作表的数据行。"""
+    ships = list(costs['initial_costs'])
+    years = costs['years']
+    return {
+        "初期成本": [(name, s, costs['initial_costs'][s]) for s in ships],
+        "年度成本": [(name, s, item, value) for s in ships for item, value in costs['annual_breakdown'][s].items()]
+                + [(name, s, costs['event_labels'][s] + "（年均）", sum(costs['event_costs'][s]) / costs['horizon_years']) for s in ships],
+        "保险": [(name, s, costs['insurance_costs'][s]) for s in ships],
+        "现金流": [(name, s, y, flow, cum) for s in ships
+                 for y, flow, cum in zip(years, costs['cashflow'][s], costs['cum_cashflow'][s])],
+        "回本": [(name, s, costs['payback_year'][s], costs['cumulative_costs'][s][-1], costs['annual_emissions'][s]) for s in ships],
+    }
+
+
+def _draw(kind: str, ax, costs: Dict[str, Any]) -> None:
+    """在给定坐标轴上绘制一种图表，内容与界面中对应模块一致。"""
+    ships = list(costs['initial_costs'])
+    years = costs['years']
+    if kind == 'cost':
+        for s in ships:
+            v, values = vessel(s), costs['cumulative_costs'][s]
+            ax.plot(years, [x / 1e4 for x in values], color=v.color, marker='.', label=s)
+            steps = [years.index(t) for t in costs['event_years'][s] if t in years]
+            ax.plot([years[j] for j in steps], [values[j] / 1e4 for j in steps], 'kx' if v.event.symbol == 'x' else 'kD', ms=5)
+        ax.set(xlabel='运营年数', ylabel='累计成本 (10k €)')
+        ax.legend(fontsize=7)
+    elif kind == 'opex':
+        labels = list(next(iter(costs['annual_breakdown'].values())))
+        bottom = [0.0] * len(ships)
+        for item in labels:
+            values = [costs['annual_breakdown'][s].get(item, 0.0) / 1e4 for s in ships]
+            ax.bar([vessel(s).short for s in ships], values, bottom=bottom, label=item)
+            bottom = [b + v for b, v in zip(bottom, values)]
+        ax.set(ylabel='年度运营成本 (10k €)', ylim=(0, max(bottom) * 1.3 or 1.0))
+        ax.legend(fontsize=7, ncol=len(labels), loc='upper center')
+    elif kind == 'cashflow':
+        for s in ships:
+            color = vessel(s).color
+            ax.plot(years, [x / 1e4 for x in costs['cum_cashflow'][s]], color=color, label=s)
+            if costs['payback_year'][s] is not None:
+                ax.axvline(costs['payback_year'][s], color=color, ls='--', lw=0.8)
+        ax.axhline(0, color='grey', lw=0.5)
+        ax.set(xlabel='运营年数', ylabel='累计净现金流 (10k €)')
+        ax.legend(fontsize=7)
+    else:
+        ax.bar([vessel(s).short for s in ships], [costs['annual_emissions'][s] for s in ships],
+               color=[vessel(s).color for s in ships])
+        ax.set(ylabel='碳排放 (吨CO₂/年)')
+
+
+def _png(fig, dpi: int) -> bytes:
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=dpi)
+    fig.clear()
+    return buf.getvalue()
+
+
+def render_charts(costs: Dict[str, Any], dpi: int = 100) -> Dict[str, bytes]:
+    """四张报告图表的 PNG 字节，按 ``CHARTS`` 顺序。"""
+    out = {}
+    for kind, title in CHARTS:
+        fig = mpl_figure(figsize=(CHART_PX[0] / dpi, CHART_PX[1] / dpi), layout='constrained')
+        ax = fig.subplots()
+        _draw(kind, ax, costs)
+        ax.set_title(title)
+        out[kind] = _png(fig, dpi)
+    return out
+
+
+def render_page(name: str, costs: Dict[str, Any], charts: Dict[str, bytes]) -> bytes:
+    """PDF 报告页（A4 横向）的 PNG：标题、汇总表与 ``render_charts`` 生成的四张图表。"""
+    import matplotlib.image as mpimg
+    fig = mpl_figure(figsize=PAGE_INCHES)
+    fig.suptitle(f"BOTIX 全周期成本报告 — {name}", fontsize=14)
+    ships = list(costs['initial_costs'])
+    table = fig.add_axes((0.05, 0.78, 0.9, 0.13))
+    table.axis('off')
+    cells = [[f"{costs['initial_costs'][s]:,.0f}", f"{costs['annual_costs'][s]:,.0f}", f"{costs['insurance_costs'][s]:,.0f}",
+              f"{costs['cumulative_costs'][s][-1]:,.0f}", str(costs['payback_year'][s] or '—'), f"{costs['annual_emissions'][s]:,.1f}"]
+             for s in ships]
+    table.table(cellText=cells, rowLabels=[vessel(s).short for s in ships], colLabels=["初期成本 (€)", "年度成本 (€)", "保险 (€/年)", "全周期累计 (€)",
+                                                            "回本年限", "碳排放 (吨/年)"], loc='center', cellLoc='right')
+    for i, (kind, _) in enumerate(CHARTS):
+        ax = fig.add_axes((0.03 + 0.49 * (i % 2), 0.03 + 0.37 * (1 - i // 2), 0.45, 0.36))
+        ax.imshow(mpimg.imread(io.BytesIO(charts[kind]), format='png'))
+        ax.axis('off')
+    return _png(fig, PAGE_DPI)
+
+
+def build_report(name: str, params: Dict[str, Any], charts: bool = True, page: bool = False) -> Dict[str, Any]:
+    """进程池任务：计算一个场景并生成表格行与图表。"""
+    costs = calculate_costs(params)
+    images = render_charts(costs) if charts or page else {}
+    return {
+        'name': name,
+        'tables': scenario_tables(name, costs),
+        'charts': images if charts else {},
+        'page': render_page(name, costs, images) if page else None,
+    }
+
+
+class PdfStream:
+    """逐页追加整页图片的最小 PDF 写出器。
+
+    每页写完即落盘，只在内存中保留各对象的偏移量，关闭时写出页树与
+    交叉引用表。Matplotlib 的 ``PdfPages`` 会把嵌入的图片缓存到关闭时
+    才写出，不适合大批量整页图片。
+    """
+
+    def __init__(self, path: str) -> None:
+        self._fh = open(path, 'wb')
+        self._fh.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._offsets: Dict[int, int] = {}
+        self._pages: List[int] = []
+        self._next = 3  # 1 为目录，2 为页树
+
+    def _object(self, num: int, body: bytes, stream: Optional[bytes] = None) -> None:
+        self._offsets[num] = self._fh.tell()
+        self._fh.write(b"%d 0 obj\n" % num + body)
+        if stream is not None:
+            self._fh.write(b"\nstream\n" + stream + b"\nendstream")
+        self._fh.write(b"\nendobj\n")
+
+    def add_page(self, png: bytes, dpi: float) -> None:
+        """以 PNG 图片为整页内容追加一页，页面尺寸按 ``dpi`` 换算。"""
+        import zlib
+
+        from PIL import Image
+        with Image.open(io.BytesIO(png)) as im:
+            rgb = im.convert('RGB')
+        width, height = rgb.size
+        pixels = zlib.compress(rgb.tobytes(), 6)
+        w_pt, h_pt = width * 72.0 / dpi, height * 72.0 / dpi
+        image, content, page = self._next, self._next + 1, self._next + 2
+        self._next += 3
+        self._object(image, b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB "
+                            b"/BitsPerComponent 8 /Filter /FlateDecode /Length %d >>" % (width, height, len(pixels)), pixels)
+        draw = b"q %.2f 0 0 %.2f 0 0 cm /Im0 Do Q" % (w_pt, h_pt)
+        self._object(content, b"<< /Length %d >>" % len(draw), draw)
+        self._object(page, b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] /Contents %d 0 R "
+                           b"/Resources << /XObject << /Im0 %d 0 R >> >> >>" % (w_pt, h_pt, content, image))
+        self._pages.append(page)
+
+    def close(self) -> None:
+        kids = b" ".join(b"%d 0 R" % p for p in self._pages)
+        self._object(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._pages)))
+        self._object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        xref = self._fh.tell()
+        self._fh.write(b"xref\n0 %d\n0000000000 65535 f \n" % self._next)
+        for num in range(1, self._next):
+            self._fh.write(b"%010d 00000 n \n" % self._offsets[num])
+        self._fh.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (self._next, xref))
+        self._fh.close()
+
+
+class ReportWriter:
+    """按场景顺序流式写出 Excel（只写模式）与 PDF 报告。"""
+
+    def __init__(self, xlsx: Optional[str] = None, pdf: Optional[str] = None, charts: bool = True) -> None:
+        self.xlsx, self.pdf, self.charts = xlsx, pdf, charts
+        self.count = 0
+        self._book = self._pages = self._tmp = None
+        if xlsx:
+            from openpyxl import Workbook
+            self._book = Workbook(write_only=True)
+            self._sheets = {name: self._book.create_sheet(name) for name in SHEETS}
+            for name, header in SHEETS.items():
+                self._sheets[name].append(header)
+            if charts:
+                self._chart_sheet = self._book.create_sheet(CHART_SHEET)
+                self._tmp = tempfile.TemporaryDirectory(prefix='botix-report-')
+        if pdf:
+            self._pages = PdfStream(pdf)
+
+    def write(self, report: Dict[str, Any]) -> None:
+        """写入一个场景的报告内容。"""
+        if self._book is not None:
+            for name, rows in report['tables'].items():
+                for row in rows:
+                    self._sheets[name].append(row)
+            if self.charts:
+                self._write_charts(report)
+        if self._pages is not None:
+            self._pages.add_page(report['page'], PAGE_DPI)
+        self.count += 1
+
+    def _write_charts(self, report: Dict[str, Any]) -> None:
+        from openpyxl.drawing.image import Image
+        from openpyxl.utils import get_column_letter
+        sheet = self._chart_sheet
+        top = self.count * CHART_ROWS + 1
+        sheet.append([report['name']])
+        for _ in range(CHART_ROWS - 1):
+            sheet.append([])
+        for i, (kind, png) in enumerate(report['charts'].items()):
+            path = os.path.join(self._tmp.name, f"{self.count}_{kind}.png")
+            with open(path, 'wb') as fh:
+                fh.write(png)
+            image = Image(path)
+            image.width, image.height = CHART_PX[0] // 2, CHART_PX[1] // 2
+            image.anchor = f"{get_column_letter(1 + 5 * i)}{top + 1}"
+            sheet.add_image(image)
+
+    def close(self) -> None:
+        if self._book is not None:
+            self._book.save(self.xlsx)
+            self._book = None
+        if self._tmp is not None:
+            self._tmp.cleanup()
+            self._tmp = None
+        if self._pages is not None:
+            self._pages.close()
+            self._pages = None
+
+
+def export_reports(scenarios: Iterable[Scenario], xlsx: Optional[str] = None, pdf: Optional[str] = None,
+                   workers: int = 1, charts: bool = True,
+                   on_progress: Optional[Callable[[int, str], None]] = None) -> int:
+    """流式导出全部场景的报告，返回场景数。
+
+    Args:
+        scenarios: (场景名, 参数字典) 的可迭代对象，可为惰性生成器。
+        xlsx: Excel 输出路径，None 表示不导出。
+        pdf: PDF 输出路径，None 表示不导出。
+        workers: 渲染进程数，大于 1 时使用进程池（``spawn`` 方式启动）。
+        charts: Excel 中是否嵌入图表图片。
+        on_progress: 每写完一个场景后以 (已完成数, 场景名) 回调，回调抛出的异常会中止导出。
+    """
+    if not xlsx and not pdf:
+        raise ValueError("至少指定一种输出格式")
+    writer = ReportWriter(xlsx, pdf, charts)
+    options = (bool(xlsx and charts), bool(pdf))
+
+    def emit(report: Dict[str, Any]) -> None:
+        writer.write(report)
+        if on_progress is not None:
+            on_progress(writer.count, report['name'])
+
+    try:
+        if workers <= 1:
+            for name, params in scenarios:
+                emit(build_report(name, params, *options))
+            return writer.count
+        pending: deque = deque()
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            try:
+                for name, params in scenarios:
+                    pending.append(pool.submit(build_report, name, params, *options))
+                    # 限制在途场景数，保持内存恒定并按输入顺序写出
+                    while len(pending) >= 2 * workers:
+                        emit(pending.popleft().result())
+                while pending:
+                    emit(pending.popleft().result())
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+        return writer.count
+    finally:
+        writer.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口。"""
+    parser = argparse.ArgumentParser(description="BOTIX 多场景批量报告导出")
+    parser.add_argument("input", help="输入场景文件 (.csv / .parquet)，列名同 batch_runner")
+    parser.add_argument("--xlsx", default=None, help="Excel 报告输出路径")
+    parser.add_argument("--pdf", default=None, help="PDF 报告输出路径")
+    parser.add_argument("--workers", type=int, default=1, help="渲染进程数")
+    parser.add_argument("--name-column", default=None, help="场景名称列，默认取第一个非参数列")
+    parser.add_argument("--no-charts", action="store_true", help="Excel 中不嵌入图表")
+    args = parser.parse_args(argv)
+    if not args.xlsx and not args.pdf:
+        parser.error("至少指定 --xlsx 或 --pdf")
+    count = export_reports(read_scenarios(args.input, name_column=args.name_column), args.xlsx, args.pdf,
+                           args.workers, not args.no_charts)
+    print(f"已导出 {count} 个场景 -> {', '.join(p for p in (args.xlsx, args.pdf) if p)}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+# scenario.py (v6.0)
+"""规范化场景对象与成本结果缓存（v6.0）。
+
+``Scenario`` 将侧边栏参数字典规范化为不可变、可哈希的对象：键排序、
+数值统一为 float、列表转为元组，并剔除仅影响显示的开关与可由其他
+参数推导的换电成本。``cached_costs`` 以其为键，在进程内共享的
+``ResultCache`` 中缓存 ``calculate_costs`` 结果，相同场景的重复
+计算（包括仅显示类控件触发的重跑）直接返回；单组按年步长的侧边栏
+参数未命中时走 ``calculate_costs`` 的标量快速路径。
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+from core.cache import ResultCache
+from core.vessels import SHOW_KEYS
+from cost_calculations import DERIVED_KEYS, calculate_costs
+
+# 不参与成本计算的显示开关，以及由 derive_costs 推导的量
+IGNORED_KEYS = frozenset(SHOW_KEYS + DERIVED_KEYS)
+
+cost_cache = ResultCache(maxsize=256, ttl=3600.0)
+
+
+def _canonical(value: Any) -> Any:
+    """将参数值转为规范的可哈希形式。"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_canonical(v) for v in value)
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class Scenario:
+    """不可变、可哈希的规范化场景。"""
+
+    items: Tuple[Tuple[str, Any], ...]
+
+    @classmethod
+    def from_params(cls, params: Dict[str, Any]) -> "Scenario":
+        """由参数字典构造场景，忽略显示开关与推导量。"""
+        return cls(tuple(sorted((k, _canonical(v)) for k, v in params.items() if k not in IGNORED_KEYS)))
+
+    def to_params(self) -> Dict[str, Any]:
+        """还原为 ``calculate_costs`` 可用的参数字典（元组转回列表）。"""
+        return {k: list(v) if isinstance(v, tuple) else v for k, v in self.items}
+
+
+def cached_costs(params: Dict[str, Any]) -> Dict[str, Any]:
+    """带缓存的 ``calculate_costs``。返回的结果字典为共享对象，调用方不得修改。"""
+    scenario = Scenario.from_params(params)
+    return cost_cache.get_or_compute(scenario, lambda: calculate_costs(scenario.to_params()))
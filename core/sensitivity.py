@@ -0,0 +1,137 @@
+# sensitivity.py (v6.0)
+"""敏感性分析引擎（v6.0）。
+
+对任意数值参数做一维扫描、二维网格扫描与龙卷风图排序。所有变化点
+组装为一张列式参数表，由 ``calculate_costs_batch`` 一次性批量计算，
+不再对每个点复制参数字典；换电成本等推导量统一由批量引擎按
+``derive_costs`` 重新计算。本模块不依赖 Streamlit。
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from core.profiling import profiled
+from cost_calculations import BUILD_COMPONENTS, BUILD_KEYS, DERIVED_KEYS, SIM_KEYS, SHIP_TYPES, calculate_costs_batch, merge_columns
+
+
+def numeric_params(params: Dict[str, Any]) -> List[str]:
+    """返回可参与扫描的数值参数名，包括 ``'柴油船_船体'`` 等建造分项。"""
+    keys = [k for k, v in params.items()
+            if isinstance(v, (int, float)) and not isinstance(v, bool) and k not in DERIVED_KEYS + SIM_KEYS]
+    keys += [f"{ship}_{c}" for ship in BUILD_KEYS if ship in params for c in BUILD_COMPONENTS]
+    return keys
+
+
+def base_value(params: Dict[str, Any], key: str) -> float:
+    """读取参数基准值，建造分项从对应列表中取出。"""
+    for ship in BUILD_KEYS:
+        if key.startswith(f"{ship}_"):
+            return float(params[ship][BUILD_COMPONENTS.index(key[len(ship) + 1:])])
+    return float(params[key])
+
+
+def evaluate(params: Dict[str, Any], overrides: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """在基准参数上应用等长的覆盖数组并批量计算。"""
+    return calculate_costs_batch(merge_columns(params, {k: np.asarray(v, dtype=float) for k, v in overrides.items()}))
+
+
+@profiled()
+def sweep(params: Dict[str, Any], key: str, values: Iterable[float]) -> Dict[str, Any]:
+    """一维扫描：参数 ``key`` 依次取 ``values``。
+
+    Returns:
+        ``cumulative_costs`` 为 (n, 船型, 年)，``tco`` 与 ``payback`` 为
+        (船型, n)，分别为末年累计成本与回本年份（未回本为 -1）。
+    """
+    values = np.asarray(list(values), dtype=float)
+    res = evaluate(params, {key: values})
+    return {
+        'ships': SHIP_TYPES,
+        'years': res['years'],
+        'values': values,
+        'cumulative_costs': res['cumulative_costs'],
+        'tco': res['cumulative_costs'][:, :, -1].T,
+        'payback': res['payback_year'].T,
+    }
+
+
+@profiled()
+def sweep_2d(params: Dict[str, Any], key_x: str, xs: Iterable[float],
+             key_y: str, ys: Iterable[float], chunk_rows: Optional[int] = None,
+             on_chunk: Optional[Callable[[float, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """二维网格扫描，默认整张网格在一次批量计算中完成。
+
+    Args:
+        chunk_rows: 每块计算的横轴点数，大网格分块以限制内存。
+        on_chunk: 每块完成后以 (完成比例, 阶段性结果) 回调，未计算的格点为 NaN；
+            回调抛出的异常（如任务取消）会中止扫描。
+
+    Returns:
+        ``tco`` 与 ``payback`` 为 (船型, len(xs), len(ys)) 数组。
+    """
+    xs = np.asarray(list(xs), dtype=float)
+    ys = np.asarray(list(ys), dtype=float)
+    shape = (len(SHIP_TYPES), len(xs), len(ys))
+    out = {'ships': SHIP_TYPES, 'xs': xs, 'ys': ys,
+           'tco': np.full(shape, np.nan), 'payback': np.full(shape, -1, dtype=np.int64)}
+    step = chunk_rows or max(len(xs), 1)
+    for start in range(0, len(xs), step):
+        stop = min(start + step, len(xs))
+        gx, gy = np.meshgrid(xs[start:stop], ys, indexing='ij')
+        res = evaluate(params, {key_x: gx.ravel(), key_y: gy.ravel()})
+        block = (len(SHIP_TYPES), stop - start, len(ys))
+        out['tco'][:, start:stop] = res['cumulative_costs'][:, :, -1].T.reshape(block)
+        out['payback'][:, start:stop] = res['payback_year'].T.reshape(block)
+        del res
+        if on_chunk is not None:
+            on_chunk(stop / len(xs), out)
+    return out
+
+
+@profiled()
+def tornado(params: Dict[str, Any], keys: Optional[List[str]] = None, delta: float = 0.2) -> Dict[str, Any]:
+    """龙卷风图：每个参数分别取 ``(1 ± delta)`` 倍，其余保持基准值。
+
+    所有参数的高低两点与基准点共 2K+1 行一次批量计算。
+
+    Returns:
+        ``tco``/``payback`` 为 (K, 2, 船型)，第二维依次为低值与高值，回本时间
+        按年计（月、周步长折算为年，-1 表示未回本）；``base_tco``/``base_payback``
+        为 (船型,)；``horizon_years`` 为分析年限；``swing_tco``/``swing_payback``
+        为 (K, 船型) 的高低两点之差的绝对值，未回本按分析年限计；``order``
+        与 ``order_payback`` 为 (船型, K)，分别按末年累计成本摆幅、回本年份
+        摆幅从大到小排列的参数下标，主口径相同时以另一口径排序。
+    """
+    keys = keys if keys is not None else numeric_params(params)
+    k = len(keys)
+    base = np.array([base_value(params, key) for key in keys])
+    factors = np.array([1 - delta, 1 + delta])
+    overrides = {}
+    for i, key in enumerate(keys):
+        column = np.full(2 * k + 1, base[i])
+        column[2 * i:2 * i + 2] = base[i] * factors
+        overrides[key] = column
+    res = evaluate(params, overrides)
+    tco = res['cumulative_costs'][:, :, -1]
+    payback = np.where(res['payback_year'] < 0, -1.0, res['payback_year'] / res['steps_per_year'])
+    horizon = res['horizon_years']
+    pb_pairs = np.where(payback[:-1] < 0, horizon, payback[:-1]).reshape(k, 2, -1)
+    tco_pairs = tco[:-1].reshape(k, 2, -1)
+    swing_tco = np.abs(tco_pairs[:, 1] - tco_pairs[:, 0])
+    swing_pb = np.abs(pb_pairs[:, 1] - pb_pairs[:, 0])
+    return {
+        'ships': SHIP_TYPES,
+        'params': keys,
+        'low': base * factors[0],
+        'high': base * factors[1],
+        'tco': tco_pairs,
+        'payback': payback[:-1].reshape(k, 2, -1),
+        'base_tco': tco[-1],
+        'base_payback': payback[-1],
+        'horizon_years': horizon,
+        'swing_tco': swing_tco,
+        'swing_payback': swing_pb,
+        'order': np.lexsort((-swing_pb, -swing_tco), axis=0).T,
+        'order_payback': np.lexsort((-swing_tco, -swing_pb), axis=0).T,
+    }
@@ -0,0 +1,394 @@
+# service.py (v6.0)
+"""本地 JSON 计算服务（v6.0）。
+
+以标准库 ``http.server`` 对外提供成本模型、CEMT 分级、岸电充电与续航
+计算，供报价、投标等内部系统调用，运行时不依赖 Streamlit 或其它第三方
+Web 框架。
+
+- ``POST /v1/costs``：``{"params": {...}}`` 或 ``{"scenarios": [{...}, ...]}``，
+  参数名同侧边栏（``param_info`` 与 ``extra_defaults``），缺省取默认值；
+  ``"trajectory": true`` 时附带逐年累计成本。
+- ``POST /v1/cemt``：``{"length": 85}`` 或 ``{"lengths": [...]}``，可选
+  ``distance_km``、``speed_kmh``。
+- ``POST /v1/charging``、``POST /v1/sailing``：字段同界面模块，可为标量或等长数组。
+- ``GET /v1/params``：参数默认值；``GET /health``：批处理与缓存统计。
+
+成本请求先按规范化场景（``core.scenario.Scenario``）查结果缓存；未命中
+的场景交给 ``MicroBatcher``，后者在 ``max_delay`` 秒内把并发请求的场景
+合并为一次 ``calculate_costs_batch`` 向量化计算（按仿真年限与步长分组，
+同一批内的相同场景只算一次）。连接使用 HTTP/1.1 keep-alive。
+
+用法::
+
+    python -m core.service --port 8765 [--max-batch 256] [--max-delay-ms 2]
+"""
+
+import argparse
+import json
+import math
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from core.cache import ResultCache
+from core.cemt import classify
+from core.formulas import charged_energy, sailing_endurance, shore_charging_power
+from core.scenario import Scenario
+from cost_calculations import (BUILD_COMPONENTS, BUILD_KEYS, INPUT_DEFAULTS, MAX_HORIZON_YEARS, SHIP_CODES,
+                               SHIP_TYPES, STEPS_PER_YEAR, calculate_costs_batch)
+from utils.param_metadata import default_params, param_info
+
+MAX_BODY_BYTES = 8 * 1024 * 1024
+MAX_SCENARIOS = 10_000
+REQUEST_TIMEOUT = 60.0
+# 计算器的字段与缺省值（同界面模块）
+CHARGING_FIELDS = {'voltage': 400.0, 'current': 125.0, 'power_factor': 0.9, 'docking_hours': 10.0,
+                   'battery_capacity': 2000.0}
+SAILING_FIELDS = {'charged_energy': 2000.0, 'ship_power': 300.0, 'sailing_speed': 10.0}
+
+
+class ValidationError(ValueError):
+    """请求参数不合法，对应 HTTP 400。"""
+
+
+def _number(key: str, value: Any, minimum: Optional[float] = None) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValidationError(f"{key} 须为有限数值")
+    if minimum is not None and value < minimum:
+        raise ValidationError(f"{key} 不能小于 {minimum}")
+    return float(value)
+
+
+def validate_params(raw: Any) -> Dict[str, Any]:
+    """校验单个场景的参数覆盖并与默认值合并，返回完整参数字典。
+
+    ``param_info`` 中的参数均为非负物理量；建造成本可按船型给 6 项列表，
+    也可按 ``'柴油船_船体'`` 等分项单独给出；可选的碳强度参数可为 ``null``。
+    """
+    if not isinstance(raw, dict):
+        raise ValidationError("场景参数须为 JSON 对象")
+    params = {**INPUT_DEFAULTS, **default_params()}
+    components = {f"{ship}_{c}": (ship, i) for ship in BUILD_KEYS for i, c in enumerate(BUILD_COMPONENTS)}
+    unknown = [k for k in raw if k not in params and k not in components]
+    if unknown:
+        raise ValidationError(f"未知参数: {', '.join(sorted(unknown))}")
+    for key, value in raw.items():
+        if key in components:
+            ship, i = components[key]
+            params[ship] = list(params[ship])
+            params[ship][i] = _number(key, value, 0.0)
+        elif key in BUILD_KEYS:
+            if not isinstance(value, list) or len(value) != len(BUILD_COMPONENTS):
+                raise ValidationError(f"{key} 须为 {len(BUILD_COMPONENTS)} 项数值列表")
+            params[key] = [_number(f"{key}[{i}]", v, 0.0) for i, v in enumerate(value)]
+        elif isinstance(params[key], bool):
+            if not isinstance(value, bool):
+                raise ValidationError(f"{key} 须为布尔值")
+            params[key] = value
+        elif key == 'time_step':
+            if value not in STEPS_PER_YEAR:
+                raise ValidationError(f"time_step 须为 {', '.join(STEPS_PER_YEAR)} 之一")
+            params[key] = value
+        elif key == 'horizon_years':
+            if _number(key, value) != int(value) or not 1 <= value <= MAX_HORIZON_YEARS:
+                raise ValidationError(f"horizon_years 须为 1–{MAX_HORIZON_YEARS} 的整数")
+            params[key] = int(value)
+        elif key in INPUT_DEFAULTS and value is None:
+            params[key] = INPUT_DEFAULTS[key]
+        else:
+            params[key] = _number(key, value, 0.0 if key in param_info else None)
+    return params
+
+
+def _row_result(res: Dict[str, Any], i: int) -> Dict[str, Any]:
+    """批量结果第 i 行整理为 JSON 可序列化的结果（逐年累计成本按年取点）。"""
+    spy = res['steps_per_year']
+    ships = {}
+    for j, ship in enumerate(SHIP_TYPES):
+        step = int(res['payback_year'][i, j])
+        ships[ship] = {
+            'code': SHIP_CODES[j],
+            'initial_cost': float(res['initial_costs'][i, j]),
+            'annual_cost': float(res['annual_costs'][i, j]),
+            'insurance_cost': float(res['insurance_costs'][i, j]),
+            'annual_emissions': float(res['annual_emissions'][i, j]),
+            'tco': float(res['cumulative_costs'][i, j, -1]),
+            'payback_year': None if step < 0 else (step if spy == 1 else step / spy),
+            'cumulative_costs': res['cumulative_costs'][i, j, ::spy].tolist(),
+        }
+    return {'horizon_years': res['horizon_years'], 'annual_income': float(res['annual_income'][i]), 'ships': ships}
+
+
+def evaluate_costs(scenarios: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """一次向量化计算一批完整参数字典（仿真年限与步长须一致）。"""
+    cols = {key: np.asarray([p[key] for p in scenarios]) for key in scenarios[0]}
+    res = calculate_costs_batch(cols)
+    return [_row_result(res, i) for i in range(len(scenarios))]
+
+
+class MicroBatcher:
+    """把并发提交的场景合并为批量计算的后台线程。
+
+    第一个场景到达后最多再等待 ``max_delay`` 秒或凑满 ``max_batch`` 个，
+    然后按仿真设置分组、合并相同场景，各组调用一次 ``evaluate``。
+    """
+
+    def __init__(self, evaluate: Callable[[List[Dict[str, Any]]], List[Any]], max_batch: int = 256,
+                 max_delay: float = 0.002, on_result: Optional[Callable[[Hashable, Any], None]] = None) -> None:
+        self.evaluate, self.max_batch, self.max_delay, self.on_result = evaluate, max_batch, max_delay, on_result
+        self._queue: "queue.Queue[Optional[Tuple[Hashable, Dict[str, Any], Future]]]" = queue.Queue()
+        self.batches = self.items = self.evaluated = self.largest = 0
+        self._thread = threading.Thread(target=self._loop, name='botix-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, key: Hashable, params: Dict[str, Any]) -> Future:
+        """提交一个场景，返回其结果的 ``Future``。"""
+        future: Future = Future()
+        self._queue.put((key, params, future))
+        return future
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    def _loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0.0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+            self._run(batch)
+
+    def _run(self, batch: List[Tuple[Hashable, Dict[str, Any], Future]]) -> None:
+        groups: Dict[Tuple[Any, Any], Dict[Hashable, Tuple[Dict[str, Any], List[Future]]]] = {}
+        for key, params, future in batch:
+            group = groups.setdefault((params['horizon_years'], params['time_step']), {})
+            group.setdefault(key, (params, []))[1].append(future)
+        self.batches += 1
+        self.items += len(batch)
+        self.largest = max(self.largest, len(batch))
+        for group in groups.values():
+            keys = list(group)
+            self.evaluated += len(keys)
+            try:
+                results = self.evaluate([group[k][0] for k in keys])
+            except Exception as ex:  # 整组失败时逐个通知请求方
+                for key in keys:
+                    for future in group[key][1]:
+                        future.set_exception(ex)
+                continue
+            for key, result in zip(keys, results):
+                if self.on_result is not None:
+                    self.on_result(key, result)
+                for future in group[key][1]:
+                    future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'batches': self.batches, 'items': self.items, 'evaluated': self.evaluated, 'largest_batch': self.largest,
+                'mean_batch': self.items / self.batches if self.batches else 0.0}
+
+
+class ComputeService:
+    """服务的计算核心：参数校验、结果缓存与微批处理，不涉及 HTTP。"""
+
+    def __init__(self, max_batch: int = 256, max_delay: float = 0.002, cache_size: int = 10_000) -> None:
+        self.cache = ResultCache(maxsize=cache_size)
+        self.batcher = MicroBatcher(evaluate_costs, max_batch, max_delay, on_result=self.cache.put)
+
+    def costs(self, scenarios: List[Any], trajectory: bool = False) -> List[Dict[str, Any]]:
+        """校验并计算多个场景，命中缓存的直接返回，其余交给微批处理。"""
+        if not 0 < len(scenarios) <= MAX_SCENARIOS:
+            raise ValidationError(f"场景数须为 1–{MAX_SCENARIOS}")
+        pending: List[Any] = []
+        for i, raw in enumerate(scenarios):
+            try:
+                params = validate_params(raw)
+            except ValidationError as ex:
+                raise ValidationError(f"场景 {i}: {ex}") from None
+            key = Scenario.from_params(params)
+            cached = self.cache.get(key)
+            pending.append(cached if cached is not None else self.batcher.submit(key, params))
+        results = [r.result(REQUEST_TIMEOUT) if isinstance(r, Future) else r for r in pending]
+        if not trajectory:
+            results = [{**r, 'ships': {s: {k: v for k, v in d.items() if k != 'cumulative_costs'} for s, d in r['ships'].items()}}
+                       for r in results]
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {'cache': self.cache.stats(), 'batcher': self.batcher.stats()}
+
+    def close(self) -> None:
+        self.batcher.close()
+
+
+def _vector(body: Dict[str, Any], fields: Dict[str, float]) -> Tuple[Dict[str, Any], bool]:
+    """读取计算器字段（标量或等长数组，缺省取默认值），返回 (数组字典, 是否为标量请求)。"""
+    unknown = [k for k in body if k not in fields]
+    if unknown:
+        raise ValidationError(f"未知字段: {', '.join(sorted(unknown))}")
+    values = {}
+    for key, default in fields.items():
+        value = body.get(key, default)
+        items = value if isinstance(value, list) else [value]
+        values[key] = np.asarray([_number(key, v, 0.0) for v in items])
+    lengths = {len(v) for v in values.values()} - {1}
+    if len(lengths) > 1:
+        raise ValidationError("数组字段长度须一致")
+    return values, not any(isinstance(body.get(k), list) for k in fields)
+
+
+def _output(values: Dict[str, Any], scalar: bool) -> Dict[str, Any]:
+    out = {k: np.asarray(v, dtype=float) for k, v in values.items()}
+    return {k: float(v.ravel()[0]) if scalar else v.tolist() for k, v in out.items()}
+
+
+def charging_endpoint(body: Dict[str, Any]) -> Dict[str, Any]:
+    """岸电三相充电功率 (kW) 与靠岸时间内充入电量 (kWh)。"""
+    v, scalar = _vector(body, CHARGING_FIELDS)
+    power = shore_charging_power(v['voltage'], v['current'], v['power_factor'])
+    return _output({'power_kW': power, 'energy_kWh': charged_energy(power, v['docking_hours'], v['battery_capacity'])}, scalar)
+
+
+def sailing_endpoint(body: Dict[str, Any]) -> Dict[str, Any]:
+    """续航时间 (h) 与航程 (km)。"""
+    v, scalar = _vector(body, SAILING_FIELDS)
+    hours, distance = sailing_endurance(v['charged_energy'], v['ship_power'], v['sailing_speed'])
+    return _output({'hours': hours, 'distance_km': distance}, scalar)
+
+
+def cemt_endpoint(body: Dict[str, Any]) -> Dict[str, Any]:
+    """按船长批量分级，未匹配的等级为 ``null``。"""
+    scalar = 'length' in body
+    lengths = [body['length']] if scalar else body.get('lengths')
+    if not isinstance(lengths, list) or not lengths:
+        raise ValidationError("须提供 length 或非空的 lengths 数组")
+    lengths = [_number('length', v) for v in lengths]
+    res = classify(lengths, _number('distance_km', body.get('distance_km', 60.0), 0.0),
+                   _number('speed_kmh', body.get('speed_kmh', 10.0), 1e-9))
+    rows = [{'class': res['class'][i],
+             **{k: None if np.isnan(res[k][i]) else float(res[k][i]) for k in ('p_min', 'p_max', 'p_avg', 'hours', 'energy_kWh')}}
+            for i in range(len(lengths))]
+    return rows[0] if scalar else {'results': rows}
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """JSON 请求处理：HTTP/1.1 keep-alive，每个响应都带 ``Content-Length``。"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'BOTIX/6.0'
+    timeout = 30  # 空闲 keep-alive 连接的关闭时间（秒）
+
+    @property
+    def service(self) -> ComputeService:
+        return self.server.service
+
+    def _send(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.path == '/health':
+            self._send(200, {'status': 'ok', **self.service.stats()})
+        elif self.path == '/v1/params':
+            self._send(200, {'defaults': default_params(), 'build_components': list(BUILD_COMPONENTS), 'ships': list(SHIP_TYPES)})
+        else:
+            self._send(404, {'error': f"未知路径: {self.path}"})
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._send(413, {'error': f"请求体超过 {MAX_BODY_BYTES} 字节"})
+            return
+        raw = self.rfile.read(length)
+        route = self.server.routes.get(self.path)
+        if route is None:
+            self._send(404, {'error': f"未知路径: {self.path}"})
+            return
+        try:
+            body = json.loads(raw or b'{}')
+            if not isinstance(body, dict):
+                raise ValidationError("请求体须为 JSON 对象")
+            self._send(200, route(body))
+        except (ValidationError, json.JSONDecodeError) as ex:
+            self._send(400, {'error': str(ex)})
+        except Exception as ex:  # 计算异常返回 500，服务继续运行
+            self._send(500, {'error': f"{type(ex).__name__}: {ex}"})
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class ServiceServer(ThreadingHTTPServer):
+    """每个连接一个线程；加大监听队列，避免大量客户端同时建连时被重置。"""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def make_server(host: str = '127.0.0.1', port: int = 8765, service: Optional[ComputeService] = None,
+                verbose: bool = False) -> ServiceServer:
+    """创建（未启动的）服务；``port=0`` 时由系统分配端口，见 ``server.server_address``。"""
+    server = ServiceServer((host, port), ServiceHandler)
+    server.service = service or ComputeService()
+    server.verbose = verbose
+
+    def costs(body: Dict[str, Any]) -> Dict[str, Any]:
+        trajectory = bool(body.get('trajectory', False))
+        if 'params' in body:
+            return {'result': server.service.costs([body['params']], trajectory)[0]}
+        if isinstance(body.get('scenarios'), list):
+            return {'results': server.service.costs(body['scenarios'], trajectory)}
+        raise ValidationError("须提供 params 对象或 scenarios 数组")
+
+    server.routes = {'/v1/costs': costs, '/v1/cemt': cemt_endpoint,
+                     '/v1/charging': charging_endpoint, '/v1/sailing': sailing_endpoint}
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口。"""
+    parser = argparse.ArgumentParser(description="BOTIX 本地 JSON 计算服务")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8765, help="监听端口")
+    parser.add_argument("--max-batch", type=int, default=256, help="单批最多场景数")
+    parser.add_argument("--max-delay-ms", type=float, default=2.0, help="凑批最长等待毫秒数")
+    parser.add_argument("--cache-size", type=int, default=10_000, help="结果缓存条目数")
+    parser.add_argument("--verbose", action="store_true", help="打印访问日志")
+    args = parser.parse_args(argv)
+    service = ComputeService(args.max_batch, args.max_delay_ms / 1000.0, args.cache_size)
+    server = make_server(args.host, args.port, service, args.verbose)
+    print(f"BOTIX 计算服务: http://{args.host}:{server.server_address[1]}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
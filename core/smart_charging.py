@@ -0,0 +1,149 @@
+# smart_charging.py (v6.0)
+"""逐时电价 / 碳强度曲线与智能充电调度（v6.0）。
+
+``load_profile`` 读取全年 8760 小时的电价 (€/kWh) 或电网碳强度
+(kg CO2/kWh) 曲线（CSV、DataFrame 或数组，闰年 8784 小时时剔除 2 月
+29 日）；``synthetic_profiles`` 生成带日内峰谷与季节变化的示例曲线。
+
+``schedule_charging`` 把每艘船每天的充电需求放到当天靠泊窗口内最便宜
+（或最清洁）的小时，每小时不超过岸电功率上限。同一天内按小时的排序
+对所有共用曲线的船只相同，只需排序一次，靠泊窗口仅作为容量掩码，
+(船舶, 天, 小时) 全部向量化；船舶数较多时按块计算以限制内存。
+得到的等效电价与等效碳强度可写回成本模型的 ``electricity_price`` 与
+``grid_carbon_intensity``。本模块不依赖 Streamlit。
+"""
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+HOURS_PER_YEAR = 8760
+HOURS_PER_DAY = 24
+DAYS_PER_YEAR = HOURS_PER_YEAR // HOURS_PER_DAY
+LEAP_DAY = slice(59 * HOURS_PER_DAY, 60 * HOURS_PER_DAY)
+OBJECTIVES = ('price', 'carbon', 'immediate')
+VESSEL_CHUNK = 256
+
+
+def load_profile(source: Any, column: Optional[str] = None) -> np.ndarray:
+    """读取全年逐时曲线，返回长度 8760 的 float64 数组。
+
+    Args:
+        source: CSV 路径或文件对象、``DataFrame`` 或数值序列。
+        column: 取用的列名，缺省取第一个数值列。
+    """
+    if isinstance(source, (str, bytes)) or hasattr(source, 'read'):
+        import pandas as pd
+        source = pd.read_csv(source)
+    if hasattr(source, 'columns'):
+        numeric = source.select_dtypes('number')
+        if column is None and numeric.shape[1] == 0:
+            raise ValueError("曲线文件中没有数值列")
+        source = source[column] if column is not None else numeric.iloc[:, 0]
+    values = np.asarray(source, dtype=float).ravel()
+    if len(values) == HOURS_PER_YEAR + HOURS_PER_DAY:
+        values = np.delete(values, np.arange(LEAP_DAY.start, LEAP_DAY.stop))
+    if len(values) != HOURS_PER_YEAR:
+        raise ValueError(f"逐时曲线须为 {HOURS_PER_YEAR} 或 {HOURS_PER_YEAR + HOURS_PER_DAY} 个值，实际 {len(values)}")
+    if np.isnan(values).any():
+        raise ValueError("逐时曲线含缺失值")
+    return values
+
+
+def synthetic_profiles(mean_price: float = 0.27, mean_carbon: float = 0.35, seed: int = 0) -> Dict[str, np.ndarray]:
+    """示例曲线：电价晚高峰、夜间低谷，碳强度午间光伏低谷、冬季偏高，均值与给定值一致。"""
+    rng = np.random.default_rng(seed)
+    hour = np.arange(HOURS_PER_YEAR) % HOURS_PER_DAY
+    day = np.arange(HOURS_PER_YEAR) // HOURS_PER_DAY
+    winter = np.cos(2 * np.pi * day / DAYS_PER_YEAR)
+    price = (1 + 0.35 * np.sin(2 * np.pi * (hour - 12) / 24) + 0.25 * np.exp(-((hour - 19) / 2.0) ** 2)
+             + 0.1 * winter + 0.08 * rng.standard_normal(HOURS_PER_YEAR))
+    carbon = (1 - 0.4 * np.exp(-((hour - 13) / 3.0) ** 2) * (1 - 0.5 * winter) + 0.15 * winter
+              + 0.05 * rng.standard_normal(HOURS_PER_YEAR))
+    price, carbon = np.clip(price, 0.05, None), np.clip(carbon, 0.05, None)
+    return {'price': price * mean_price / price.mean(), 'carbon': carbon * mean_carbon / carbon.mean()}
+
+
+def berth_mask(start_hour: Any, end_hour: Any) -> np.ndarray:
+    """每日靠泊窗口 [start, end) 的 (船舶, 24) 布尔掩码，end <= start 时跨越午夜。"""
+    start = np.atleast_1d(np.asarray(start_hour, dtype=int))[:, None] % HOURS_PER_DAY
+    end = np.atleast_1d(np.asarray(end_hour, dtype=int))[:, None] % HOURS_PER_DAY
+    hour = np.arange(HOURS_PER_DAY)
+    return np.where(start < end, (hour >= start) & (hour < end), (hour >= start) | (hour < end))
+
+
+def _daily(values: Any, n: int) -> np.ndarray:
+    """把 (8760,) 或 (船舶, 8760) 曲线整理为 (1 或 船舶, 天, 24)。"""
+    arr = np.asarray(values, dtype=float)
+    arr = arr.reshape((-1, DAYS_PER_YEAR, HOURS_PER_DAY))
+    if arr.shape[0] not in (1, n):
+        raise ValueError("逐时曲线的船舶维与船舶数不一致")
+    return arr
+
+
+def schedule_charging(price: Any, carbon: Any, daily_energy: Any, berth: Any, power_kw: Any,
+                      objective: str = 'price', carbon_price: float = 0.0,
+                      return_schedule: bool = False) -> Dict[str, Any]:
+    """按天在靠泊窗口内安排充电，(船舶, 天, 小时) 全部向量化。
+
+    Args:
+        price: 电价曲线 (€/kWh)，(8760,) 全船共用或 (船舶, 8760)。
+        carbon: 碳强度曲线 (kg CO2/kWh)，形状同 ``price``。
+        daily_energy: 每艘船每天需充入的电量 (kWh)，(船舶,) 或 (船舶, 365)。
+        berth: 靠泊掩码，(船舶, 24) 每日相同或 (船舶, 8760)。
+        power_kw: 岸电功率上限 (kW)，(船舶,) 或标量。
+        objective: ``'price'`` 电价最低、``'carbon'`` 碳排最低、``'immediate'``
+            靠泊即充（对照基准）。
+        carbon_price: 目标为 ``'price'`` 时计入的碳价 (€/吨 CO2)。
+        return_schedule: 是否返回 (船舶, 8760) 逐时充电量。
+
+    Returns:
+        ``energy``/``cost``/``emissions``/``unmet`` 为 (船舶,) 全年充电量 (kWh)、
+        电费 (€)、排放 (kg) 与窗口内充不下的电量 (kWh)；``effective_price``
+        (€/kWh) 与 ``effective_carbon`` (kg/kWh) 为按充电量加权的等效值。
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"未知调度目标: {objective}")
+    berth = np.asarray(berth, dtype=bool)
+    n = berth.shape[0]
+    price, carbon = _daily(price, n), _daily(carbon, n)
+    need = np.broadcast_to(np.asarray(daily_energy, dtype=float).reshape(-1, 1) if np.ndim(daily_energy) <= 1
+                           else np.asarray(daily_energy, dtype=float), (n, DAYS_PER_YEAR))
+    power = np.broadcast_to(np.asarray(power_kw, dtype=float).reshape(-1), (n,))
+    avail = berth[:, None, :] if berth.shape[1] == HOURS_PER_DAY else berth.reshape(n, DAYS_PER_YEAR, HOURS_PER_DAY)
+    out = {key: np.zeros(n) for key in ('energy', 'cost', 'emissions', 'unmet')}
+    schedule = np.zeros((n, HOURS_PER_YEAR)) if return_schedule else None
+    for start in range(0, n, VESSEL_CHUNK):
+        rows = slice(start, min(start + VESSEL_CHUNK, n))
+        p = price if price.shape[0] == 1 else price[rows]
+        c = carbon if carbon.shape[0] == 1 else carbon[rows]
+        if objective == 'price':
+            key = p + carbon_price * c / 1000.0 if carbon_price else p
+        elif objective == 'carbon':
+            key = c
+        else:
+            key = None
+        cap = np.broadcast_to(avail[rows] * power[rows, None, None], (rows.stop - rows.start, DAYS_PER_YEAR, HOURS_PER_DAY))
+        if key is None:
+            # 靠泊即充：按窗口开始后的先后顺序，跨午夜窗口从开始时刻起排
+            first = np.argmax(avail[rows] & ~np.roll(avail[rows], 1, axis=-1), axis=-1)
+            order = (first[..., None] + np.arange(HOURS_PER_DAY)) % HOURS_PER_DAY
+            order = np.broadcast_to(order, cap.shape)
+        else:
+            order = np.broadcast_to(np.argsort(key, axis=-1, kind='stable'), cap.shape)
+        sorted_cap = np.take_along_axis(cap, order, axis=-1)
+        before = np.cumsum(sorted_cap, axis=-1) - sorted_cap
+        alloc = np.clip(need[rows, :, None] - before, 0.0, sorted_cap)
+        charge = np.empty_like(alloc)
+        np.put_along_axis(charge, order, alloc, axis=-1)
+        out['energy'][rows] = charge.sum(axis=(1, 2))
+        out['cost'][rows] = (charge * p).sum(axis=(1, 2))
+        out['emissions'][rows] = (charge * c).sum(axis=(1, 2))
+        out['unmet'][rows] = np.maximum(need[rows] - charge.sum(axis=-1), 0.0).sum(axis=-1)
+        if schedule is not None:
+            schedule[rows] = charge.reshape(-1, HOURS_PER_YEAR)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out['effective_price'] = np.where(out['energy'] > 0, out['cost'] / out['energy'], np.nan)
+        out['effective_carbon'] = np.where(out['energy'] > 0, out['emissions'] / out['energy'], np.nan)
+    out['schedule'] = schedule
+    return out
@@ -0,0 +1,139 @@
+# vessels.py (v6.0)
+"""船型注册表（v6.0）。
+
+``VESSEL_TYPES`` 按顺序声明参与对比的全部船型：建造分项参数、电池
+投资占比、能源模型、排放因子、周期性事件（固定周期大修或按电池
+循环寿命换电）、补贴参数以及显示名称与颜色。成本引擎按注册表把
+各船型组装为 (场景, 船型) 费率矩阵，再整体推进 (场景, 船型, 时间步)
+仿真；图表、侧边栏开关与各分析模块均遍历注册表，新增船型只需在
+此处追加一项（所引用的参数须在 ``utils.param_metadata`` 中有默认值）。
+本模块仅依赖标准库。
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class EnergyModel:
+    """能源模型：年度能源费用 = 每小时耗量 × 年运营小时 × 单价。"""
+
+    name: str
+    consumption_key: str
+    price_key: str
+
+
+@dataclass(frozen=True)
+class PeriodicEvent:
+    """周期性事件。
+
+    ``kind='interval'`` 时每隔 ``interval_key`` 年发生一次，单次费用取
+    ``cost_key``；``kind='battery'`` 时周期为电池循环寿命折算的年数，单次
+    费用取 ``cost_key``，缺省按 电池投资 × 电池占比 × ``replace_ratio_key`` 推导。
+    """
+
+    label: str
+    kind: str
+    cost_key: str
+    interval_key: Optional[str] = None
+    replace_ratio_key: Optional[str] = None
+    marker: str = ''
+    symbol: str = 'x'
+
+
+@dataclass(frozen=True)
+class VesselType:
+    """一种船型配置。
+
+    Attributes:
+        build_key: 建造分项参数名（6 项，单位万欧）。
+        battery_share: 电池投资（容量 × 单价）计入建造成本的比例，无电池为 0。
+        capacity_key: 电池容量参数名 (kWh)，决定电池投资与循环比。
+        price_key: 电池单价参数名 (€/kWh)。
+        cycle_life_key: 电池深度循环次数参数名；换电周期 = 循环寿命 / 循环比，
+            循环比 = 年运营小时 × 本船型能源模型的每小时耗量 / 电池容量。
+        emission_factor: 年排放 (吨 CO2) = 年能源费用 × 因子 / 1000。
+        carbon_key: 碳强度参数 (kg CO2 / 能耗单位)；年排放 = 年耗量 × 碳强度 / 1000，
+            参数缺省时取 ``CARBON_DEFAULTS``，显式给 NaN 时退回 ``emission_factor``。
+        port_fee: 是否缴纳港口费。
+        smart_discount: 智能化设备保险优惠是否适用。
+        show_key: 成本曲线显示开关的参数名。
+    """
+
+    name: str
+    code: str
+    short: str
+    build_key: str
+    subsidy_key: str
+    energy: EnergyModel
+    emission_factor: float
+    maintenance_key: str
+    event: PeriodicEvent
+    battery_share: float = 0.0
+    port_fee: bool = False
+    smart_discount: bool = False
+    show_key: str = ''
+    color: str = '#636EFA'
+    carbon_key: Optional[str] = None
+    capacity_key: str = 'battery_capacity_kWh'
+    price_key: str = 'battery_price'
+    cycle_life_key: str = 'battery_cycle_life'
+
+
+DIESEL = EnergyModel('diesel', 'diesel_consumption_per_hour', 'mgo_price')
+ELECTRIC = EnergyModel('electric', 'electric_consumption_per_hour', 'electricity_price')
+
+OVERHAUL = PeriodicEvent('大修费', 'interval', 'overhaul_cost_per_event_diesel',
+                         interval_key='overhaul_interval_years_diesel', marker='大修', symbol='x')
+
+VESSEL_TYPES: Tuple[VesselType, ...] = (
+    VesselType("STAGE V 柴油船 (EU)", 'diesel_eu', 'EU D', '柴油船', 'subsidy_ratio_stage_v',
+               DIESEL, 3.2, 'maintenance_cost_diesel', OVERHAUL,
+               port_fee=True, show_key='show_stage_v', color='#636EFA'),
+    VesselType("电动船 (EU)", 'electric_eu', 'EU E', '电动船(EU)', 'subsidy_ratio_electric_eu',
+               ELECTRIC, 0.35, 'maintenance_cost_electric',
+               PeriodicEvent('电池更换费', 'battery', 'battery_replace_cost_eu',
+                             replace_ratio_key='battery_replace_ratio_eu', marker='电池更换', symbol='diamond'),
+               battery_share=1.0, smart_discount=True, show_key='show_electric_eu', color='#00CC96',
+               carbon_key='grid_carbon_intensity'),
+    VesselType("电动船 (CN)", 'electric_cn', 'CN E', '电动船(CN)', 'subsidy_ratio_electric_cn',
+               ELECTRIC, 0.35, 'maintenance_cost_electric',
+               PeriodicEvent('电池更换费', 'battery', 'battery_replace_cost_cn',
+                             replace_ratio_key='battery_replace_ratio_cn', marker='电池更换', symbol='diamond'),
+               battery_share=0.7, smart_discount=True, show_key='show_electric_cn', color='#EF553B',
+               carbon_key='grid_carbon_intensity'),
+)
+
+VESSELS_BY_NAME: Dict[str, VesselType] = {v.name: v for v in VESSEL_TYPES}
+
+
+def _unique(values) -> Tuple[str, ...]:
+    return tuple(dict.fromkeys(v for v in values if v))
+
+
+ENERGY_MODELS: Tuple[EnergyModel, ...] = tuple({v.energy.name: v.energy for v in VESSEL_TYPES}.values())
+SHOW_KEYS: Tuple[str, ...] = _unique(v.show_key for v in VESSEL_TYPES)
+REPLACE_RATIO_KEYS: Tuple[str, ...] = _unique(v.event.replace_ratio_key for v in VESSEL_TYPES)
+CARBON_KEYS: Tuple[str, ...] = _unique(v.carbon_key for v in VESSEL_TYPES)
+CAPACITY_KEYS: Tuple[str, ...] = _unique(v.capacity_key for v in VESSEL_TYPES)
+BATTERY_PRICE_KEYS: Tuple[str, ...] = _unique(v.price_key for v in VESSEL_TYPES)
+CYCLE_LIFE_KEYS: Tuple[str, ...] = _unique(v.cycle_life_key for v in VESSEL_TYPES if v.event.kind == 'battery')
+# 碳强度缺省值 (kg CO2 / 能耗单位)。电动船排放统一按 年耗电 kWh × 电网碳强度 计算，
+# 有意不再沿用旧版 年电费 (€) × 0.35 的口径，智能充电写回等效碳强度时口径不变
+CARBON_DEFAULTS: Dict[str, float] = {'grid_carbon_intensity': 0.35}
+# 注册表引用的全部数值参数（不含建造分项、推导的换电费用与可选的碳强度）
+PARAM_KEYS: Tuple[str, ...] = _unique(
+    key for v in VESSEL_TYPES for key in (
+        v.subsidy_key, v.energy.consumption_key, v.energy.price_key, v.maintenance_key,
+        v.event.interval_key, v.event.replace_ratio_key, v.event.cost_key if v.event.kind == 'interval' else None,
+        v.capacity_key, v.price_key, v.cycle_life_key if v.event.kind == 'battery' else None))
+
+
+def vessel(name: str) -> VesselType:
+    """按显示名称或代码查找船型。"""
+    if name in VESSELS_BY_NAME:
+        return VESSELS_BY_NAME[name]
+    for v in VESSEL_TYPES:
+        if v.code == name:
+            return v
+    raise KeyError(f"未知船型: {name}")
@@ -0,0 +1,116 @@
+# voyage.py (v6.0)
+"""航次能量仿真（v6.0）。
+
+把岸电充电、功率需求与续航三个计算串联起来：航线由若干航段与其后的
+靠泊组成，航段功率由排水量经验公式（``installed_power``/``cruise_power``）
+按航速三次方换算，靠泊时按 ``shore_charging_power`` 三相公式充电，
+逐段跟踪电池荷电状态 (SOC)。所有量按候选方案（航线、电池容量等）
+组成的第一维向量化，一次即可筛查整个航线网络的可行性。本模块仅依赖
+NumPy。
+"""
+
+from typing import Any, Dict
+
+import numpy as np
+
+from core.formulas import cruise_power, installed_power, shore_charging_power
+
+
+def leg_power(displacement: Any, speed: Any, k_disp: Any = 0.6, design_speed: Any = 10.0) -> np.ndarray:
+    """航段推进功率 (kW)：设计航速下取连续巡航功率，其余航速按 (v / v_design)^3 换算。"""
+    p_cruise = cruise_power(installed_power(displacement, k_disp))
+    return p_cruise * (np.asarray(speed, dtype=float) / design_speed) ** 3
+
+
+def simulate_voyage(legs_km: Any, speeds_kmh: Any, dwell_hours: Any, battery_kWh: Any,
+                    displacement: Any, k_disp: Any = 0.6, design_speed: Any = 10.0,
+                    voltage: Any = 400.0, current: Any = 125.0, power_factor: Any = 0.9,
+                    hotel_kW: Any = 0.0, initial_soc: float = 1.0, soc_floor: float = 0.2,
+                    n_cycles: int = 1, record: bool = False) -> Dict[str, Any]:
+    """按航段—靠泊顺序推进 M 个候选方案的荷电状态。
+
+    Args:
+        legs_km: 航段距离 (M, K) 或 (K,)，K 为单次航线的航段数。
+        speeds_kmh: 各航段航速，可广播到 (M, K)。
+        dwell_hours: 各航段之后的靠泊时长，0 表示不停靠。
+        battery_kWh: 电池容量 (M,) 或标量。
+        displacement: 排水量 (t)，与 ``k_disp``、``design_speed`` 共同决定推进功率。
+        voltage, current, power_factor: 各靠泊点岸电参数，可广播到 (M, K)；电流为 0 表示无岸电。
+        hotel_kW: 航行与靠泊期间的船上辅助负荷 (kW)。
+        initial_soc: 初始荷电状态（占容量比例）。
+        soc_floor: 荷电状态下限（占容量比例），低于该值即判定不可行。
+        n_cycles: 连续重复航线的次数，用于检验多次往返后的稳态。
+        record: 为 True 时返回每个航段与靠泊后的 SOC 轨迹。
+
+    Returns:
+        结果字典：``feasible``、``min_soc``、``final_soc``（比例）、``energy_used``
+        （电池放电量，含靠泊时岸电未覆盖的辅助负荷）、``energy_charged`` (kWh)、
+        ``sailing_hours``、``cycle_hours``、``consumption_per_hour``（航段每小时
+        耗电，可作为成本模型的 ``electric_consumption_per_hour``）均为 (M,)；
+        ``soc`` 为可选轨迹。
+    """
+    legs = np.atleast_2d(np.asarray(legs_km, dtype=float))
+    capacity = np.asarray(battery_kWh, dtype=float).reshape(-1)
+    m = max(legs.shape[0], capacity.shape[0], np.size(displacement) if np.ndim(displacement) else 1)
+    shape = (m, legs.shape[1])
+    legs = np.broadcast_to(legs, shape)
+    speeds = np.broadcast_to(np.asarray(speeds_kmh, dtype=float), shape)
+    dwell = np.broadcast_to(np.asarray(dwell_hours, dtype=float), shape)
+    capacity = np.broadcast_to(capacity, (m,))
+    disp = np.broadcast_to(np.asarray(displacement, dtype=float).reshape(-1) if np.ndim(displacement) else displacement, (m,))
+    hotel = np.broadcast_to(np.asarray(hotel_kW, dtype=float), (m,))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hours = np.where(speeds > 0, legs / speeds, 0.0)
+    propulsion = leg_power(disp[:, None], speeds, k_disp, design_speed)
+    leg_energy = (propulsion + hotel[:, None]) * hours
+    charger = np.broadcast_to(shore_charging_power(np.asarray(voltage, dtype=float), np.asarray(current, dtype=float), np.asarray(power_factor, dtype=float)), shape)
+    # 靠泊净能量：岸电不足以覆盖辅助负荷（含无岸电）时为负，差额由电池承担
+    berth_energy = (charger - hotel[:, None]) * dwell
+
+    soc = capacity * initial_soc
+    min_soc = soc.copy()
+    used = np.zeros(m)
+    sailing_used = np.zeros(m)
+    charged = np.zeros(m)
+    trace = [soc / capacity] if record else None
+    for _ in range(n_cycles):
+        for k in range(shape[1]):
+            soc = soc - leg_energy[:, k]
+            used += leg_energy[:, k]
+            sailing_used += leg_energy[:, k]
+            np.minimum(min_soc, soc, out=min_soc)
+            gain = np.minimum(berth_energy[:, k], np.maximum(capacity - soc, 0.0))
+            soc = soc + gain
+            charged += np.maximum(gain, 0.0)
+            used += np.maximum(-gain, 0.0)
+            np.minimum(min_soc, soc, out=min_soc)
+            if record:
+                trace.extend([(soc - gain) / capacity, soc / capacity])
+
+    sailing = hours.sum(axis=1) * n_cycles
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = {
+            'feasible': min_soc >= soc_floor * capacity,
+            'min_soc': min_soc / capacity,
+            'final_soc': soc / capacity,
+            'energy_used': used,
+            'energy_charged': charged,
+            'sailing_hours': sailing,
+            'cycle_hours': (hours.sum(axis=1) + dwell.sum(axis=1)) * n_cycles,
+            'consumption_per_hour': np.where(sailing > 0, sailing_used / sailing, 0.0),
+        }
+    if record:
+        result['soc'] = np.stack(trace, axis=1)
+    return result
+
+
+def min_feasible_battery(legs_km: Any, speeds_kmh: Any, dwell_hours: Any, displacement: Any,
+                         sizes: Any = None, **kwargs: Any) -> Dict[str, Any]:
+    """在一组候选电池容量上一次性仿真同一航线，返回可行性与最小可行容量。"""
+    sizes = np.arange(500.0, 20001.0, 50.0) if sizes is None else np.asarray(sizes, dtype=float)
+    res = simulate_voyage(legs_km, speeds_kmh, dwell_hours, sizes, displacement, **kwargs)
+    ok = res['feasible']
+    res['sizes'] = sizes
+    res['min_feasible'] = float(sizes[np.argmax(ok)]) if ok.any() else None
+    return res
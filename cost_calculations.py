@@ -4,116 +4,658 @@
 
 根据输入参数计算初期建造成本、年度运营成本、保险费、
 周期性大修与换电费用、现金流与回本周期以及碳排放。
-所有计算聚合在一个函数中，返回统一的结果字典。
+``cost_rates`` 计算与时间无关的费率，``iter_cost_chunks`` 按可配置
+年限（最长 40 年）与步长（年/月/周）分块推进仿真；
+``calculate_costs_batch`` 以 NumPy 向量化方式一次计算 N 组参数，
+``calculate_costs`` 为其单组参数的列表形式，所有图表均读取同一结果；
+单组、按年步长的常见情形走纯 Python 标量路径，结果与批量引擎逐位一致。
+船型由 ``core.vessels.VESSEL_TYPES`` 注册表声明，费率按 (场景, 船型)
+矩阵计算，时间推进不含任何按船型名称的分支。
 """
 
-from typing import Dict, Any, List, Tuple
-from utils.helpers import get_jump_years
+import math
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+import numpy as np
+from core.profiling import profiled
+from core.vessels import (BATTERY_PRICE_KEYS, CAPACITY_KEYS, CARBON_DEFAULTS, CARBON_KEYS, CYCLE_LIFE_KEYS, ENERGY_MODELS,
+                          REPLACE_RATIO_KEYS, VESSEL_TYPES)
+from utils.helpers import get_jump_years, jump_steps
+
+SHIP_TYPES: Tuple[str, ...] = tuple(v.name for v in VESSEL_TYPES)
+SHIP_CODES: Tuple[str, ...] = tuple(v.code for v in VESSEL_TYPES)
+BUILD_KEYS: Tuple[str, ...] = tuple(dict.fromkeys(v.build_key for v in VESSEL_TYPES))
+BUILD_COMPONENTS: Tuple[str, ...] = ("船体", "推进系统", "电气自动化", "居住区", "舾装设备", "组装调试")
+# 缺省时按电池投资推导的换电费用参数
+DERIVED_KEYS: Tuple[str, ...] = tuple(dict.fromkeys(v.event.cost_key for v in VESSEL_TYPES if v.event.kind == 'battery'))
+EVENT_LABELS: Tuple[str, ...] = tuple(v.event.label for v in VESSEL_TYPES)
+# 各船型的常量属性，按 SHIP_TYPES 顺序排成行向量
+BATTERY_SHARES = np.array([v.battery_share for v in VESSEL_TYPES])
+EMISSION_FACTORS = np.array([v.emission_factor for v in VESSEL_TYPES])
+PORT_FEE_MASK = np.array([v.port_fee for v in VESSEL_TYPES])
+SMART_DISCOUNT_MASK = np.array([v.smart_discount for v in VESSEL_TYPES])
+# 仿真设置：年限（年）、时间步长与季节运营小时分布，同一批场景内须一致
+SIM_KEYS: Tuple[str, ...] = ('horizon_years', 'time_step', 'seasonal_profile')
+STEPS_PER_YEAR = {'year': 1, 'month': 12, 'week': 52}
+DEFAULT_HORIZON_YEARS = 25
+MAX_HORIZON_YEARS = 40
+
+
+def derive_costs(capacity: Any, battery_price: Any, replace_ratios: Mapping[str, Any],
+                 build_totals: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+    """推导换电成本与原始建造成本（欧元），标量与 NumPy 数组通用。
+
+    侧边栏、标量与批量计算、敏感性分析均调用本函数，保证推导口径唯一。
+
+    Args:
+        capacity: 电池容量 (kWh)；为映射时按船型的 ``capacity_key`` 取值，否则各船型共用。
+        battery_price: 电池单价 (€/kWh)；为映射时按船型的 ``price_key`` 取值。
+        replace_ratios: 电池更换成本比率，键为 ``REPLACE_RATIO_KEYS``。
+        build_totals: 各建造分项参数的合计（万欧），键为 ``BUILD_KEYS``，缺省为 0。
+
+    Returns:
+        ``DERIVED_KEYS`` 各换电费用，以及 ``raw_build``：{船型名称: 原始建造成本}。
+    """
+    totals = build_totals or {}
+    out: Dict[str, Any] = {}
+    raw_build: Dict[str, Any] = {}
+    for v in VESSEL_TYPES:
+        battery = _by_key(capacity, v.capacity_key) * _by_key(battery_price, v.price_key)
+        if v.event.kind == 'battery':
+            out[v.event.cost_key] = battery * v.battery_share * replace_ratios[v.event.replace_ratio_key]
+        raw_build[v.name] = totals.get(v.build_key, 0.0) * 1e4 + battery * v.battery_share
+    out['raw_build'] = raw_build
+    return out
+
+
+def _by_key(value: Any, key: str) -> Any:
+    """映射按参数名取值，标量或数组视为各船型共用。"""
+    return value[key] if isinstance(value, Mapping) else value
+
+
+def derive_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """按单组参数字典调用 ``derive_costs``。"""
+    return derive_costs(
+        {k: params[k] for k in CAPACITY_KEYS}, {k: params[k] for k in BATTERY_PRICE_KEYS},
+        {k: params[k] for k in REPLACE_RATIO_KEYS},
+        {k: sum(params[k]) for k in BUILD_KEYS},
+    )
 
 
 def calculate_costs(params: Dict[str, Any]) -> Dict[str, Any]:
-    """根据输入参数计算成本与现金流。"""
-    years: List[int] = list(range(26))
+    """根据输入参数计算成本与现金流。
+
+    按 ``params`` 中的 ``horizon_years``（默认 25 年）、``time_step``（year/month/
+    week，默认 year）与可选的 ``seasonal_profile``（12 个月运营小时占比）调用
+    批量仿真核心，返回按船型名称组织的列表结果。按年步长时 ``years`` 为
+    整数年份，否则为以年计的浮点时间。
+
+    参数均为标量且按年步长时直接以 ``_scalar_costs`` 计算，避免 N=1 时
+    批量引擎的数组与分块开销。
+    """
+    if _scalar_ready(params):
+        return _scalar_costs(params)
+    return format_costs(calculate_costs_batch(params))
+
 
+_SCALAR_TYPES = (bool, int, float, str, np.generic)
+
+
+def _scalar_ready(params: Any) -> bool:
+    """单组参数、按年步长、各参数均为标量（建造成本为分项列表）时可走标量路径。"""
+    if not isinstance(params, dict) or params.get('time_step', 'year') != 'year':
+        return False
+    for key, value in params.items():
+        if key in BUILD_KEYS:
+            if not isinstance(value, (list, tuple)):
+                return False
+        elif key != 'seasonal_profile' and not isinstance(value, _SCALAR_TYPES):
+            return False
+    return all(key in params for key in BUILD_KEYS)
+
+
+def _scalar(params: Dict[str, Any], key: str) -> float:
+    """按 ``read_input`` 的口径读取一个标量参数。"""
+    if key in params:
+        return float(params[key])
+    default = INPUT_DEFAULTS.get(key)
+    if default is None:
+        raise KeyError(key)
+    return float(default)
+
+
+def _scalar_costs(params: Dict[str, Any]) -> Dict[str, Any]:
+    """``calculate_costs`` 的单组按年步长快速路径。
+
+    逐船型按 ``RATE_NODES`` 的公式与运算次序以 Python 浮点计算费率，再逐年
+    推进轨迹，结果与 ``format_costs(calculate_costs_batch(params))`` 逐位一致。
+    修改 ``RATE_NODES`` 或轨迹公式时须同步修改本函数，
+    ``tests/test_cost_calculations.py`` 以随机场景校验两条路径逐位一致。
+    """
+    g = lambda key: _scalar(params, key)
+    _, horizon = time_grid(params.get('horizon_years', DEFAULT_HORIZON_YEARS), 'year')
     # 年收入估算
-    travel_time = params['avg_trip_distance'] * 2.0 / params['economic_speed'] if params['economic_speed'] else 0
-    trip_time = travel_time + params['turnaround_time']
-    trips_per_year = params['annual_hours'] / trip_time if trip_time > 0 else 0
-    annual_volume = trips_per_year * params['ship_length'] * params['carry_per_meter']
-    auto_income = params['unit_income'] * annual_volume * params['avg_trip_distance']
-    annual_income = params['annual_income'] if params.get('annual_income') else auto_income
-
-    # 初期建造成本（万欧）转换为欧元并扣除补贴
-    raw_diesel = sum(params['柴油船']) * 1e4
-    raw_elec_eu = sum(params['电动船(EU)']) * 1e4 + params['battery_capacity_kWh'] * params['battery_price']
-    raw_elec_cn = sum(params['电动船(CN)']) * 1e4 + params['battery_capacity_kWh'] * params['battery_price'] * 0.7
-    initial_costs = {
-        "STAGE V 柴油船 (EU)": raw_diesel * (1 - params['subsidy_ratio_stage_v']),
-        "电动船 (EU)": raw_elec_eu * (1 - params['subsidy_ratio_electric_eu']),
-        "电动船 (CN)": raw_elec_cn * (1 - params['subsidy_ratio_electric_cn']),
-    }
+    dist, speed, hours = g('avg_trip_distance'), g('economic_speed'), g('annual_hours')
+    travel = dist * 2.0 / speed if speed != 0 else 0.0
+    trip = travel + g('turnaround_time')
+    trips = hours / trip if trip > 0 else 0.0
+    auto_income = g('unit_income') * (trips * g('ship_length') * g('carry_per_meter')) * dist
+    manual = g('annual_income')
+    manual = 0.0 if math.isnan(manual) else manual
+    income = manual if manual != 0 else auto_income
+    # 与时间无关的费率
+    capacity = {k: g(k) for k in CAPACITY_KEYS}
+    builds = {}
+    for key in BUILD_KEYS:
+        total = 0.0
+        for part in params[key]:
+            total = total + float(part)
+        builds[key] = total
+    derived = derive_costs(capacity, {k: g(k) for k in BATTERY_PRICE_KEYS}, {k: g(k) for k in REPLACE_RATIO_KEYS}, builds)
+    use = {m.name: g(m.consumption_key) * hours for m in ENERGY_MODELS}
+    energy = {m.name: use[m.name] * g(m.price_key) for m in ENERGY_MODELS}
+    crew = g('crew_num') * g('crew_avg_cost')
+    hull = g('insurance_rate') / 100.0
+    disc = g('insurance_discount') / 100.0 if bool(params['smart_equipment_selected']) else 0.0
+    port_fee = g('port_fee')
+    carbon = {key: g(key) for key in CARBON_KEYS}
+    years = list(range(horizon + 1))
+    out: Dict[str, Any] = {key: {} for key in (
+        'initial_costs', 'annual_costs', 'insurance_costs', 'annual_emissions', 'annual_breakdown', 'event_labels',
+        'event_costs', 'event_years', 'cumulative_costs', 'cashflow', 'cum_cashflow', 'payback_year')}
+    for v in VESSEL_TYPES:
+        raw = derived['raw_build'][v.name]
+        init = raw * (1 - g(v.subsidy_key))
+        insurance = raw * hull * (1 - (disc if v.smart_discount else 0.0))
+        maint = g(v.maintenance_key)
+        port = port_fee if v.port_fee else 0.0
+        fuel = energy[v.energy.name]
+        annual = fuel + crew + maint + port + insurance
+        if v.event.kind == 'interval':
+            cycle = max(1.0, g(v.event.interval_key))
+        else:
+            cap = capacity[v.capacity_key]
+            ratio = hours * g(v.energy.consumption_key) / cap if cap != 0 else 1.0
+            cycle = max(1.0, g(v.cycle_life_key) / ratio) if ratio != 0 else math.inf
+        cost = g(v.event.cost_key) if v.event.cost_key in params else derived[v.event.cost_key]
+        emission = fuel * v.emission_factor / 1000.0
+        if v.carbon_key is not None and not math.isnan(carbon[v.carbon_key]):
+            emission = use[v.energy.name] * carbon[v.carbon_key] / 1000.0
+        jumps = set(get_jump_years(cycle, horizon)) if math.isfinite(cycle) else set()
+        # 第 0 步为建造期；现金流首步与累计初值均为 -init，与批量引擎口径一致
+        cum, cash = init, -init + -init
+        costs, cumulative, cashflow, cum_cash = [0.0], [init], [-init], [cash]
+        payback = 0 if cash >= 0 else None
+        for t in years[1:]:
+            extra = cost if t in jumps else 0.0
+            cum = cum + annual + extra
+            flow = income * 1.0 - (annual + extra)
+            cash = cash + flow
+            costs.append(extra)
+            cumulative.append(cum)
+            cashflow.append(flow)
+            cum_cash.append(cash)
+            if payback is None and cash >= 0:
+                payback = t
+        name = v.name
+        out['event_labels'][name] = v.event.label
+        out['initial_costs'][name] = init
+        out['annual_costs'][name] = annual
+        out['insurance_costs'][name] = insurance
+        out['annual_emissions'][name] = emission
+        out['annual_breakdown'][name] = {'能源': fuel, '维护': maint, '船员': crew, '港口费': port, '保险': insurance}
+        out['event_costs'][name] = costs
+        out['event_years'][name] = sorted(jumps)
+        out['cumulative_costs'][name] = cumulative
+        out['cashflow'][name] = cashflow
+        out['cum_cashflow'][name] = cum_cash
+        out['payback_year'][name] = payback
+    out.update(years=years, horizon_years=horizon, steps_per_year=1)
+    return out
 
-    # 年度运营成本（含保险）
-    diesel_fuel = params['diesel_consumption_per_hour'] * params['annual_hours'] * params['mgo_price']
-    elec_energy = params['electric_consumption_per_hour'] * params['annual_hours'] * params['electricity_price']
-    diesel_maint = params['maintenance_cost_diesel']
-    elec_maint = params['maintenance_cost_electric']
-    crew_cost = params['crew_num'] * params['crew_avg_cost']
-    hull_rate = params['insurance_rate'] / 100.0
-    disc = (params['insurance_discount'] / 100.0) if params['smart_equipment_selected'] else 0.0
-    diesel_ins = raw_diesel * hull_rate
-    elec_ins_eu = raw_elec_eu * hull_rate * (1 - disc)
-    elec_ins_cn = raw_elec_cn * hull_rate * (1 - disc)
-    port_fee = params.get('port_fee', 0)
-    annual_costs = {
-        "STAGE V 柴油船 (EU)": diesel_fuel + crew_cost + diesel_maint + port_fee + diesel_ins,
-        "电动船 (EU)": elec_energy + crew_cost + elec_maint + elec_ins_eu,
-        "电动船 (CN)": elec_energy + crew_cost + elec_maint + elec_ins_cn,
-    }
-    insurance_costs = {
-        "STAGE V 柴油船 (EU)": diesel_ins,
-        "电动船 (EU)": elec_ins_eu,
-        "电动船 (CN)": elec_ins_cn,
+
+def format_costs(res: Dict[str, Any]) -> Dict[str, Any]:
+    """把单组参数 (N=1) 的批量结果整理为按船型名称组织的列表结果。"""
+    spy = res['steps_per_year']
+    years: List[Any] = res['years'].tolist() if spy == 1 else (res['years'] / spy).tolist()
+
+    def per_ship(key: str) -> Dict[str, Any]:
+        return {ship: res[key][0, j].tolist() for j, ship in enumerate(SHIP_TYPES)}
+
+    payback: Dict[str, Any] = {}
+    for j, ship in enumerate(SHIP_TYPES):
+        step = int(res['payback_year'][0, j])
+        payback[ship] = None if step < 0 else (step if spy == 1 else step / spy)
+    return {
+        'initial_costs': per_ship('initial_costs'),
+        'annual_costs': per_ship('annual_costs'),
+        'insurance_costs': per_ship('insurance_costs'),
+        'annual_emissions': per_ship('annual_emissions'),
+        'annual_breakdown': {ship: {label: float(arr[0, j]) for label, arr in res['annual_breakdown'].items()}
+                             for j, ship in enumerate(SHIP_TYPES)},
+        'event_labels': dict(zip(SHIP_TYPES, EVENT_LABELS)),
+        'event_costs': per_ship('event_costs'),
+        'event_years': {ship: [years[t] for t in np.nonzero(res['event_mask'][0, j])[0]]
+                        for j, ship in enumerate(SHIP_TYPES)},
+        'cumulative_costs': per_ship('cumulative_costs'),
+        'cashflow': per_ship('cashflow'),
+        'cum_cashflow': per_ship('cum_cashflow'),
+        'payback_year': payback,
+        'years': years,
+        'horizon_years': res['horizon_years'],
+        'steps_per_year': spy,
     }
 
-    # 周期性大修与换电周期
-    cycle_ratio = (params['annual_hours'] * params['electric_consumption_per_hour'] / params['battery_capacity_kWh']) if params['battery_capacity_kWh'] else 1
-    battery_cycle_yr = max(1.0, params['battery_cycle_life'] / cycle_ratio)
-    overhaul_yr = max(1.0, params['overhaul_interval_years_diesel'])
-    jumps_eu = set(get_jump_years(battery_cycle_yr, years[-1]))
-    jumps_cn = set(jumps_eu)
-    jumps_ov = set(get_jump_years(overhaul_yr, years[-1]))
-
-    cumulative_costs: Dict[str, List[float]] = {}
-    cashflow: Dict[str, List[float]] = {}
-    cum_cashflow: Dict[str, List[float]] = {}
-    payback: Dict[str, int] = {}
-
-    for ship, init in initial_costs.items():
-        cum_cost = init
-        acc_cash = -init
-        cost_list: List[float] = []
-        cf_list: List[float] = []
-        cumcf_list: List[float] = []
-        for y in years:
-            extra = 0
-            if y > 0:
-                cum_cost += annual_costs[ship]
-                if ship == "STAGE V 柴油船 (EU)" and y in jumps_ov:
-                    extra = params['overhaul_cost_per_event_diesel']
-                if ship == "电动船 (EU)" and y in jumps_eu:
-                    extra = params['battery_replace_cost_eu']
-                if ship == "电动船 (CN)" and y in jumps_cn:
-                    extra = params['battery_replace_cost_cn']
-                cum_cost += extra
-            cost_list.append(cum_cost)
-            op_cost = annual_costs[ship] + (extra if y > 0 else 0)
-            net_cf = (annual_income - op_cost) if y > 0 else -init
-            cf_list.append(net_cf)
-            acc_cash += net_cf
-            cumcf_list.append(acc_cash)
-        cumulative_costs[ship] = cost_list
-        cashflow[ship] = cf_list
-        cum_cashflow[ship] = cumcf_list
-        payback[ship] = next((i for i, v in enumerate(cumcf_list) if v >= 0), None)
 
+def _to_columns(rows: Any) -> Tuple[Dict[str, Any], int]:
+    """将 DataFrame 或数组字典统一为列字典，并返回行数 N。"""
+    if hasattr(rows, 'columns'):
+        cols = {c: rows[c].to_numpy() for c in rows.columns}
+    else:
+        cols = dict(rows)
+    n = 1
+    for key, val in cols.items():
+        arr = np.asarray(val)
+        if key in BUILD_KEYS + ('seasonal_profile',) and arr.ndim < 2:
+            continue
+        if arr.ndim >= 1:
+            n = max(n, len(arr))
+    return cols, n
+
+
+def _col(cols: Dict[str, Any], key: str, n: int, default: Any = None) -> np.ndarray:
+    """取出一列并广播为长度 N 的 float64 数组；缺失且无默认值时抛出 KeyError。"""
+    if key not in cols:
+        if default is None:
+            raise KeyError(key)
+        return np.full(n, float(default))
+    arr = np.asarray(cols[key], dtype=float)
+    return np.broadcast_to(arr, (n,)).astype(float)
+
+
+def _build_total(cols: Dict[str, Any], key: str, n: int) -> np.ndarray:
+    """按组件顺序逐项累加建造成本（万欧），与标量版 ``sum`` 的求和次序一致。
+
+    ``key`` 列可为单船的 6 项列表（广播到 N 行）或 (N, 6) 数组；缺失时
+    读取 ``f"{key}_{组件}"`` 分项列。
+    """
+    if key in cols:
+        val = cols[key]
+        if getattr(val, 'dtype', None) == object:
+            val = [list(v) for v in val]
+        comps = np.atleast_2d(np.asarray(val, dtype=float))
+        comps = np.broadcast_to(comps, (n, comps.shape[1]))
+        parts = [comps[:, j] for j in range(comps.shape[1])]
+    else:
+        parts = [_col(cols, f"{key}_{c}", n) for c in BUILD_COMPONENTS]
+    total = np.zeros(n)
+    for part in parts:
+        total = total + part
+    return total
+
+
+def merge_columns(base: Dict[str, Any], overrides: Dict[str, Any], n: Any = None) -> Dict[str, Any]:
+    """以 ``base`` 为标量基准、``overrides`` 为覆盖列组装列式参数表（浅层映射）。
+
+    ``base`` 中的换电成本等推导量会被剔除，由批量引擎按覆盖后的参数重新
+    推导；若覆盖了 ``'柴油船_船体'`` 等建造分项，则对应列表展开为分项列。
+    给定 ``n`` 时标量广播为长度 n 的数组。
+    """
+    cols = {k: v for k, v in base.items() if k not in DERIVED_KEYS}
+    for ship in BUILD_KEYS:
+        if ship in cols and any(f"{ship}_{c}" in overrides for c in BUILD_COMPONENTS):
+            for c, v in zip(BUILD_COMPONENTS, cols.pop(ship)):
+                cols[f"{ship}_{c}"] = v
+    cols.update(overrides)
+    if n is not None:
+        cols = {k: np.full(n, v) if np.ndim(v) == 0 else v for k, v in cols.items()}
+    return cols
+
+
+def _setting(cols: Dict[str, Any], key: str, default: Any) -> Any:
+    """读取批量内必须一致的仿真设置（年限、步长），不一致时抛出 ValueError。"""
+    values = np.unique(np.ravel(np.asarray(cols.get(key, default))))
+    if len(values) != 1:
+        raise ValueError(f"{key} 在同一批场景中必须一致")
+    value = values[0]
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def time_grid(horizon_years: Any = DEFAULT_HORIZON_YEARS, time_step: str = 'year') -> Tuple[int, int]:
+    """校验仿真年限与步长，返回 (每年步数, 总步数)。"""
+    if time_step not in STEPS_PER_YEAR:
+        raise ValueError(f"未知时间步长: {time_step}")
+    horizon = int(horizon_years)
+    if horizon != horizon_years or not 1 <= horizon <= MAX_HORIZON_YEARS:
+        raise ValueError(f"仿真年限须为 1–{MAX_HORIZON_YEARS} 的整数年")
+    spy = STEPS_PER_YEAR[time_step]
+    return spy, horizon * spy
+
+
+def step_weights(steps_per_year: int, n_steps: int, profile: Any = None) -> np.ndarray:
+    """各时间步占全年运营小时的比例，第 0 步（建造期）为 0。
+
+    ``profile`` 为 12 个月的相对运营小时，缺省为全年均匀；按周步长时
+    每周取所在月份的占比并在该月各周间均分。
+    """
+    weights = np.zeros(n_steps + 1)
+    t = np.arange(1, n_steps + 1)
+    if profile is None or steps_per_year == 1:
+        weights[1:] = 1.0 / steps_per_year
+        return weights
+    profile = np.asarray(profile, dtype=float)
+    profile = profile / profile.sum()
+    month = ((t - 1) % steps_per_year) * 12 // steps_per_year
+    per_month = np.bincount(month[:steps_per_year], minlength=12)
+    weights[1:] = profile[month] / per_month[month]
+    return weights
+
+
+# 缺失时取缺省值的输入参数，其余参数缺失时抛出 KeyError；碳强度取注册表缺省值，无缺省值时
+# 为 NaN，即按排放因子计算
+INPUT_DEFAULTS = {'port_fee': 0.0, 'annual_income': 0.0, **{key: CARBON_DEFAULTS.get(key, np.nan) for key in CARBON_KEYS}}
+
+
+def read_input(cols: Dict[str, Any], key: str, n: int) -> Any:
+    """按费率节点的口径读取一个输入参数。
+
+    建造成本返回分项合计 (N,)，智能设备选项返回布尔数组，换电成本列
+    缺失时返回 None（由节点按 ``derive_costs`` 推导），仿真设置返回批量内
+    一致的单值，其余参数返回长度 N 的 float64 数组。
+    """
+    if key in BUILD_KEYS:
+        return _build_total(cols, key, n)
+    if key == 'smart_equipment_selected':
+        return np.broadcast_to(np.asarray(cols[key], dtype=bool), (n,))
+    if key in DERIVED_KEYS:
+        return _col(cols, key, n) if key in cols else None
+    if key == 'horizon_years':
+        return _setting(cols, key, DEFAULT_HORIZON_YEARS)
+    if key == 'time_step':
+        return _setting(cols, key, 'year')
+    if key == 'seasonal_profile':
+        return cols.get(key)
+    return _col(cols, key, n, INPUT_DEFAULTS.get(key))
+
+
+def _stack(*columns: Any) -> np.ndarray:
+    return np.stack(columns, axis=1)
+
+
+def _per_type(keys: Tuple[str, ...]) -> Tuple[Tuple[str, ...], Callable[..., np.ndarray]]:
+    """按船型顺序把各船型引用的参数或节点（可重复）排成 (N, 船型) 矩阵。"""
+    deps = tuple(dict.fromkeys(keys))
+
+    def gather(*values: Any) -> np.ndarray:
+        lookup = dict(zip(deps, values))
+        return _stack(*(lookup[k] for k in keys))
+    return deps, gather
+
+
+_DERIVE_KEYS = CAPACITY_KEYS + BATTERY_PRICE_KEYS + REPLACE_RATIO_KEYS + BUILD_KEYS
+
+
+def _derive(*values: Any) -> Dict[str, Any]:
+    lookup = dict(zip(_DERIVE_KEYS, values))
+    return derive_costs(lookup, lookup, lookup, {k: lookup[k] for k in BUILD_KEYS})
+
+
+def _cycle_ratio(hours: Any, *values: Any) -> np.ndarray:
+    """各船型的年循环比：年运营小时 × 本船型每小时耗量 / 本船型电池容量，容量为 0 时取 1。"""
+    lookup = dict(zip(_CYCLE_KEYS, values))
+    return _stack(*(np.where(lookup[v.capacity_key] != 0,
+                             hours * lookup[v.energy.consumption_key] / lookup[v.capacity_key], 1.0)
+                    for v in VESSEL_TYPES))
+
+
+def _event_cycle(ratio: np.ndarray, *values: Any) -> np.ndarray:
+    """固定周期事件取参数年数，换电事件按本船型电池循环寿命折算，均不少于 1 年。"""
+    lookup = dict(zip(CYCLE_LIFE_KEYS + _INTERVAL_KEYS, values))
+    return _stack(*(np.maximum(1.0, lookup[v.event.interval_key]) if v.event.kind == 'interval'
+                    else np.maximum(1.0, lookup[v.cycle_life_key] / ratio[:, j]) for j, v in enumerate(VESSEL_TYPES)))
+
+
+def _emissions(energy: np.ndarray, use: np.ndarray, *carbons: Any) -> np.ndarray:
+    """年度碳排放 (吨)：声明碳强度的船型按耗量 × 碳强度，其余船型（或碳强度为 NaN）按能源费用 × 排放因子。"""
+    out = energy * EMISSION_FACTORS / 1000.0
+    lookup = dict(zip(CARBON_KEYS, carbons))
+    for j, v in enumerate(VESSEL_TYPES):
+        if v.carbon_key is not None:
+            carbon = lookup[v.carbon_key]
+            out[:, j] = np.where(np.isnan(carbon), out[:, j], use[:, j] * carbon / 1000.0)
+    return out
+
+
+def _event_cost(derived: Dict[str, Any], *costs: Any) -> np.ndarray:
+    """单次事件费用；换电费用参数缺失（None）时取推导值。"""
+    lookup = dict(zip(_EVENT_COST_KEYS, costs))
+    return _stack(*(derived[v.event.cost_key] if lookup[v.event.cost_key] is None else lookup[v.event.cost_key]
+                    for v in VESSEL_TYPES))
+
+
+_INTERVAL_KEYS = tuple(dict.fromkeys(v.event.interval_key for v in VESSEL_TYPES if v.event.kind == 'interval'))
+_EVENT_COST_KEYS = tuple(dict.fromkeys(v.event.cost_key for v in VESSEL_TYPES))
+_CYCLE_KEYS = tuple(dict.fromkeys(k for v in VESSEL_TYPES for k in (v.capacity_key, v.energy.consumption_key)))
+
+# 与时间无关的费率计算图：(节点名, 依赖, 计算函数)，依赖为输入参数名或此前的节点名，
+# 按列表顺序即为拓扑序。船型维度顺序同 SHIP_TYPES，各船型的差异只体现在注册表
+# 声明的参数引用与常量行向量上。
+RATE_NODES: Tuple[Tuple[str, Tuple[str, ...], Callable[..., Any]], ...] = (
+    # 年收入估算
+    ('travel_time', ('economic_speed', 'avg_trip_distance'),
+     lambda speed, dist: np.where(speed != 0, dist * 2.0 / speed, 0.0)),
+    ('trip_time', ('travel_time', 'turnaround_time'), lambda travel, turnaround: travel + turnaround),
+    ('trips_per_year', ('trip_time', 'annual_hours'), lambda trip, hours: np.where(trip > 0, hours / trip, 0.0)),
+    ('annual_volume', ('trips_per_year', 'ship_length', 'carry_per_meter'),
+     lambda trips, length, carry: trips * length * carry),
+    ('auto_income', ('unit_income', 'annual_volume', 'avg_trip_distance'), lambda unit, volume, dist: unit * volume * dist),
+    ('income', ('annual_income', 'auto_income'),
+     lambda manual, auto: np.where(np.nan_to_num(manual) != 0, np.nan_to_num(manual), auto)),
+    # 初期建造成本
+    ('derived', _DERIVE_KEYS, _derive),
+    ('raw_build', ('derived',), lambda d: _stack(*(d['raw_build'][name] for name in SHIP_TYPES))),
+    ('subsidy', *_per_type(tuple(v.subsidy_key for v in VESSEL_TYPES))),
+    ('initial_costs', ('raw_build', 'subsidy'), lambda raw, subsidy: raw * (1 - subsidy)),
+    # 年度运营成本（含保险）：各能源模型的年耗量与年能源费用
+) + tuple(node for m in ENERGY_MODELS for node in (
+    (f'{m.name}_use', (m.consumption_key, 'annual_hours'), lambda rate, hours: rate * hours),
+    (f'{m.name}_energy', (f'{m.name}_use', m.price_key), lambda use, price: use * price),
+)) + (
+    ('crew_cost', ('crew_num', 'crew_avg_cost'), lambda num, cost: num * cost),
+    ('hull_rate', ('insurance_rate',), lambda rate: rate / 100.0),
+    ('insurance_disc', ('smart_equipment_selected', 'insurance_discount'), lambda smart, disc: np.where(smart, disc / 100.0, 0.0)),
+    ('insurance_costs', ('raw_build', 'hull_rate', 'insurance_disc'),
+     lambda raw, rate, disc: raw * rate[:, None] * (1 - np.where(SMART_DISCOUNT_MASK, disc[:, None], 0.0))),
+    ('energy_use', *_per_type(tuple(f'{v.energy.name}_use' for v in VESSEL_TYPES))),
+    ('energy_costs', *_per_type(tuple(f'{v.energy.name}_energy' for v in VESSEL_TYPES))),
+    ('maintenance_costs', *_per_type(tuple(v.maintenance_key for v in VESSEL_TYPES))),
+    ('crew_costs', ('crew_cost',), lambda crew: np.repeat(crew[:, None], len(VESSEL_TYPES), axis=1)),
+    ('port_fees', ('port_fee',), lambda fee: np.where(PORT_FEE_MASK, fee[:, None], 0.0)),
+    ('annual_costs', ('energy_costs', 'crew_costs', 'maintenance_costs', 'port_fees', 'insurance_costs'),
+     lambda energy, crew, maint, port, insurance: energy + crew + maint + port + insurance),
+    # 周期性事件：周期长度（年）与单次费用
+    ('cycle_ratio', ('annual_hours',) + _CYCLE_KEYS, _cycle_ratio),
+    ('event_cycle', ('cycle_ratio',) + CYCLE_LIFE_KEYS + _INTERVAL_KEYS, _event_cycle),
+    ('event_cost', ('derived',) + _EVENT_COST_KEYS, _event_cost),
     # 年度碳排放 (吨 CO2)
-    diesel_emission_factor = 3.2  # kg CO2/L
-    elec_emission_factor = 0.35  # kg CO2/kWh
-    annual_emissions = {
-        "STAGE V 柴油船 (EU)": diesel_fuel * diesel_emission_factor / 1000.0,
-        "电动船 (EU)": elec_energy * elec_emission_factor / 1000.0,
-        "电动船 (CN)": elec_energy * elec_emission_factor / 1000.0,
+    ('annual_emissions', ('energy_costs', 'energy_use') + CARBON_KEYS, _emissions),
+)
+
+
+def evaluate_nodes(cols: Dict[str, Any], n: int,
+                   nodes: Tuple[Tuple[str, Tuple[str, ...], Callable[..., Any]], ...] = RATE_NODES) -> Dict[str, Any]:
+    """按拓扑序计算全部节点，返回 ``{节点名或输入名: 值}``。"""
+    values: Dict[str, Any] = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for name, deps, fn in nodes:
+            for dep in deps:
+                if dep not in values:
+                    values[dep] = read_input(cols, dep, n)
+            values[name] = fn(*(values[d] for d in deps))
+    return values
+
+
+def pack_rates(values: Dict[str, Any], cols: Dict[str, Any], n: int) -> Dict[str, Any]:
+    """把费率节点整理为 ``cost_rates`` 的结果结构。"""
+    return {
+        'cols': cols,
+        'n': n,
+        'initial_costs': values['initial_costs'],
+        'annual_costs': values['annual_costs'],
+        'insurance_costs': values['insurance_costs'],
+        'energy_costs': values['energy_costs'],
+        'annual_breakdown': {
+            '能源': values['energy_costs'],
+            '维护': values['maintenance_costs'],
+            '船员': values['crew_costs'],
+            '港口费': values['port_fees'],
+            '保险': values['insurance_costs'],
+        },
+        'annual_income': values['income'],
+        'event_cost': values['event_cost'],
+        'event_cycle': values['event_cycle'],
+        'annual_emissions': values['annual_emissions'],
     }
 
+
+def cost_rates(rows: Any) -> Dict[str, Any]:
+    """计算每组参数与时间无关的费率：建造成本、年度成本及分项、收入、
+    周期事件单次费用与周期长度、年度碳排放。均为 (N,) 或 (N, 船型) 数组。
+
+    计算过程由 ``RATE_NODES`` 描述。
+    """
+    cols, n = _to_columns(rows)
+    return pack_rates(evaluate_nodes(cols, n), cols, n)
+
+
+def iter_cost_chunks(rates: Dict[str, Any], horizon_years: Any = DEFAULT_HORIZON_YEARS,
+                     time_step: str = 'year', profile: Any = None,
+                     chunk_steps: Any = None) -> Iterator[Dict[str, Any]]:
+    """按时间步分块推进仿真的生成器，内存只与块大小有关。
+
+    第 0 步为建造期，其后每步计入 ``年度成本 / 每年步数``；若给定季节
+    ``profile``，能源成本与收入按该步运营小时占比分配。大修与换电落在
+    ``round(周期 × 每年步数 × k)`` 步上。累计量跨块连续累加，按年步长时
+    结果与逐年逐项相加完全一致。
+
+    Yields:
+        每块的结果字典：``steps`` 为本块时间步下标，``cumulative_costs``、
+        ``cashflow``、``cum_cashflow``、``event_costs``、``event_mask`` 为
+        (N, 船型, 块长) 数组，``payback_year`` 为截至本块的首个回本步（-1 表示尚未回本）。
+    """
+    spy, n_steps = time_grid(horizon_years, time_step)
+    n, n_ship = rates['initial_costs'].shape
+    chunk_steps = chunk_steps or n_steps + 1
+    weights = step_weights(spy, n_steps, profile)
+    uniform = profile is None or spy == 1
+    event_rows, event_steps = jump_steps(rates['event_cycle'].ravel(), int(horizon_years), spy)
+    initial = rates['initial_costs']
+    cum_cost = cum_cash = None
+    payback = np.full((n, n_ship), -1)
+
+    for start in range(0, n_steps + 1, chunk_steps):
+        steps = np.arange(start, min(start + chunk_steps, n_steps + 1))
+        width = len(steps)
+        # 本块的周期事件
+        mask = np.zeros((n * n_ship, width), dtype=bool)
+        sel = (event_steps >= steps[0]) & (event_steps <= steps[-1])
+        mask[event_rows[sel], event_steps[sel] - steps[0]] = True
+        mask = mask.reshape(n, n_ship, width)
+        extra = np.where(mask, rates['event_cost'][:, :, None], 0.0)
+
+        # 每步运营成本与收入（第 0 步为建造期）
+        w = weights[steps]
+        operating = steps > 0
+        op = np.broadcast_to(rates['annual_costs'][:, :, None] / spy, (n, n_ship, width))
+        if not uniform:
+            op = op + rates['energy_costs'][:, :, None] * (w - 1.0 / spy)
+        op = np.where(operating, op, 0.0)
+        income = rates['annual_income'][:, None, None] * w
+
+        # 累计成本：按 [运营成本, 周期费用] 交替序列累加，保持逐项相加次序
+        inc = np.stack([op, extra], axis=-1).reshape(n, n_ship, 2 * width)
+        if start == 0:
+            inc = inc[:, :, 2:]
+            head = initial[:, :, None]
+        else:
+            head = cum_cost[:, :, None]
+        seq = np.cumsum(np.concatenate([head, inc], axis=-1), axis=-1)
+        cumulative = seq[:, :, ::2] if start == 0 else seq[:, :, 2::2]
+
+        # 现金流（首步为 -init，累计初值亦为 -init，与既有口径一致）
+        cashflow = income - (op + extra)
+        if start == 0:
+            cashflow[:, :, 0] = -initial
+        head = -initial[:, :, None] if start == 0 else cum_cash[:, :, None]
+        cum_cashflow = np.cumsum(np.concatenate([head, cashflow], axis=-1), axis=-1)[:, :, 1:]
+        reached = cum_cashflow >= 0
+        first = np.where(reached.any(axis=-1), steps[0] + np.argmax(reached, axis=-1), -1)
+        payback = np.where(payback >= 0, payback, first)
+
+        cum_cost, cum_cash = cumulative[:, :, -1], cum_cashflow[:, :, -1]
+        yield {
+            'steps': steps,
+            'cumulative_costs': cumulative,
+            'cashflow': cashflow,
+            'cum_cashflow': cum_cashflow,
+            'event_costs': extra,
+            'event_mask': mask,
+            'payback_year': payback,
+        }
+
+
+@profiled()
+def calculate_costs_batch(rows: Any, horizon_years: Any = None, time_step: Any = None,
+                          profile: Any = None, chunk_steps: Any = None) -> Dict[str, Any]:
+    """向量化批量计算 N 组参数的成本与现金流。
+
+    Args:
+        rows: 列式参数，可为 ``pandas.DataFrame`` 或 ``{参数名: 数组或标量}``
+            字典，列名与 ``calculate_costs`` 的 params 键一致。建造成本既可为
+            ``'柴油船'`` 等 (N, 6) 数组，也可为 ``'柴油船_船体'`` 等分项列。
+        horizon_years: 仿真年限（1–40），缺省读取 ``horizon_years`` 列或取 25。
+        time_step: ``'year'``/``'month'``/``'week'``，缺省读取 ``time_step`` 列或取年。
+        profile: 12 个月运营小时占比，缺省读取 ``seasonal_profile`` 列或全年均匀。
+        chunk_steps: 分块步数，仅影响中间内存，不影响结果。
+
+    Returns:
+        与 ``calculate_costs`` 同名键的结果字典：``initial_costs`` 等为
+        (N, 船型) 数组，``cumulative_costs``/``cashflow``/``cum_cashflow``
+        为 (N, 船型, 时间步) 数组，``payback_year`` 为 (N, 船型) 的回本时间步
+        下标（按年步长时即年份），未回本记为 -1；``event_costs`` 为
+        (N, 船型, 时间步) 的大修/换电费用；船型顺序见 ``ships``。
+    """
+    rates = cost_rates(rows)
+    cols = rates['cols']
+    horizon = _setting(cols, 'horizon_years', DEFAULT_HORIZON_YEARS) if horizon_years is None else horizon_years
+    step = _setting(cols, 'time_step', 'year') if time_step is None else time_step
+    profile = cols.get('seasonal_profile') if profile is None else profile
+    spy, _ = time_grid(horizon, step)
+    return assemble_result(rates, join_chunks(iter_cost_chunks(rates, horizon, step, profile, chunk_steps)), int(horizon), spy)
+
+
+TRAJECTORY_KEYS: Tuple[str, ...] = ('cumulative_costs', 'cashflow', 'cum_cashflow', 'event_costs', 'event_mask')
+
+
+def join_chunks(chunks: Any) -> Dict[str, Any]:
+    """拼接 ``iter_cost_chunks`` 的各块结果，返回完整轨迹与最终回本步。"""
+    chunks = list(chunks)
+    joined = {key: np.concatenate([c[key] for c in chunks], axis=-1) for key in TRAJECTORY_KEYS}
+    joined['payback_year'] = chunks[-1]['payback_year']
+    return joined
+
+
+def assemble_result(rates: Dict[str, Any], trajectory: Dict[str, Any], horizon: int, spy: int) -> Dict[str, Any]:
+    """由费率与轨迹组装 ``calculate_costs_batch`` 的结果字典。"""
     return {
-        'initial_costs': initial_costs,
-        'annual_costs': annual_costs,
-        'insurance_costs': insurance_costs,
-        'annual_emissions': annual_emissions,
-        'cumulative_costs': cumulative_costs,
-        'cashflow': cashflow,
-        'cum_cashflow': cum_cashflow,
-        'payback_year': payback,
-        'years': years,
-    }
\ No newline at end of file
+        'ships': SHIP_TYPES,
+        'initial_costs': rates['initial_costs'],
+        'annual_costs': rates['annual_costs'],
+        'insurance_costs': rates['insurance_costs'],
+        'annual_breakdown': rates['annual_breakdown'],
+        'annual_emissions': rates['annual_emissions'],
+        'annual_income': rates['annual_income'],
+        **trajectory,
+        'years': np.arange(horizon * spy + 1),
+        'horizon_years': horizon,
+        'steps_per_year': spy,
+    }
@@ -1,14 +1,90 @@
 # charging_analysis.py (v6.0)
 """岸电充电分析模块（v6.0）。
 
-计算岸电三相充电功率和可充入的电量，展示结果。
+计算岸电三相充电功率和可充入的电量，展示结果；并以该功率为上限，
+按全年逐时电价 / 碳强度曲线在每日靠泊窗口内安排智能充电，得到的
+等效电价与等效碳强度可一键写回成本模型；船队共用充电桩的排队仿真
+见 ``modules.port_simulation``。
 """
 
+import numpy as np
+import plotly.graph_objects as go
 import streamlit as st
-import math
+from core.formulas import charged_energy as calc_charged_energy, shore_charging_power
+from core.smart_charging import berth_mask, load_profile, schedule_charging, synthetic_profiles
+from core.vessels import CARBON_DEFAULTS
+from modules.port_simulation import port_simulation_section
 
+OBJECTIVES = {"电价最低": 'price', "碳排最低": 'carbon', "靠泊即充": 'immediate'}
+APPLIED_KEY = "smart_charging_applied"
 
-def charging_module() -> None:
+
+def _profiles(mean_price: float):
+    """读取上传的逐时曲线，未上传时使用示例曲线。"""
+    c1, c2 = st.columns(2)
+    price_file = c1.file_uploader("逐时电价 CSV (€/kWh, 8760 行)", type=["csv"], key="sc_price_file")
+    carbon_file = c2.file_uploader("逐时碳强度 CSV (kg CO2/kWh, 8760 行)", type=["csv"], key="sc_carbon_file")
+    mean_carbon = st.number_input("示例曲线平均碳强度 (kg CO2/kWh)", value=0.35, min_value=0.0, step=0.01, key="sc_mean_carbon")
+    demo = synthetic_profiles(mean_price, mean_carbon)
+    price, carbon = demo['price'], demo['carbon']
+    try:
+        if price_file is not None:
+            price = load_profile(price_file)
+        if carbon_file is not None:
+            carbon = load_profile(carbon_file)
+    except ValueError as ex:
+        st.error(f"🚨 曲线读取失败: {ex}")
+    if price_file is None or carbon_file is None:
+        st.caption(f"未上传的曲线使用示例曲线（平均电价取侧边栏 {mean_price:.2f} €/kWh）。")
+    return price, carbon
+
+
+def smart_charging_section(params, power_kw: float, berth_energy: float) -> None:
+    """智能充电调度：全年逐时排程、与靠泊即充对比，并可写回成本模型。"""
+    st.subheader("智能充电调度（全年逐时）")
+    price, carbon = _profiles(float(st.session_state.get('electricity_price', params['electricity_price'])))
+    c1, c2, c3 = st.columns(3)
+    start = c1.slider("靠泊开始 (时)", 0, 23, 18, key="sc_start")
+    end = c2.slider("靠泊结束 (时)", 0, 23, 6, key="sc_end")
+    daily = c3.number_input("每日充电需求 (kWh)", value=round(float(berth_energy), 1), min_value=0.0, step=50.0, key="sc_daily",
+                            help="默认取上方每次靠岸实际充入电量")
+    objective = OBJECTIVES[st.radio("调度目标", list(OBJECTIVES), horizontal=True, key="sc_objective")]
+    carbon_price = st.number_input("碳价 (€/吨 CO2，计入电价最低目标)", value=0.0, min_value=0.0, step=10.0, key="sc_carbon_price") if objective == 'price' else 0.0
+    berth = berth_mask(start, end)
+    res = schedule_charging(price, carbon, daily, berth, power_kw, objective, carbon_price, return_schedule=True)
+    base = schedule_charging(price, carbon, daily, berth, power_kw, 'immediate')
+    eff_price, eff_carbon = float(res['effective_price'][0]), float(res['effective_carbon'][0])
+    if np.isnan(eff_price):
+        st.warning("⚠️ 靠泊窗口或岸电功率为 0，无法安排充电。")
+        return
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("等效电价 (€/kWh)", f"{eff_price:.4f}", f"{eff_price - base['effective_price'][0]:+.4f} 较靠泊即充", delta_color="inverse")
+    m2.metric("等效碳强度 (kg CO2/kWh)", f"{eff_carbon:.4f}", f"{eff_carbon - base['effective_carbon'][0]:+.4f} 较靠泊即充", delta_color="inverse")
+    m3.metric("全年充电量 (MWh)", f"{res['energy'][0] / 1e3:,.1f}")
+    # 两种调度的年排放均按 充电量 × 碳强度 计算，与成本模型电动船排放口径一致
+    tonnes, base_tonnes = res['energy'][0] * eff_carbon / 1e3, base['energy'][0] * base['effective_carbon'][0] / 1e3
+    m4.metric("充电年排放 (吨 CO2)", f"{tonnes:,.1f}", f"{tonnes - base_tonnes:+,.1f} 较靠泊即充", delta_color="inverse")
+    if res['unmet'][0] > 0:
+        st.warning(f"⚠️ 靠泊窗口内全年有 {res['unmet'][0] / 1e3:,.1f} MWh 充不下，请延长靠泊时间或提高岸电功率。")
+    fig = go.Figure(go.Heatmap(z=res['schedule'][0].reshape(-1, 24).T, colorbar=dict(title='kWh')))
+    fig.update_layout(title="全年逐时充电量", xaxis_title="日", yaxis_title="时")
+    st.plotly_chart(fig, use_container_width=True)
+    applied = st.session_state.get(APPLIED_KEY)
+    c1, c2 = st.columns(2)
+    if c1.button("应用到成本模型", key="sc_apply"):
+        st.session_state[APPLIED_KEY] = {'electricity_price': eff_price, 'grid_carbon_intensity': eff_carbon}
+        st.rerun()
+    if applied and c2.button("恢复统一电价", key="sc_reset"):
+        del st.session_state[APPLIED_KEY]
+        st.rerun()
+    if applied:
+        st.caption(f"成本模型当前使用等效电价 {applied['electricity_price']:.4f} €/kWh、碳强度 {applied['grid_carbon_intensity']:.4f} kg/kWh。")
+    else:
+        st.caption(f"成本模型默认电网碳强度 {params.get('grid_carbon_intensity', CARBON_DEFAULTS['grid_carbon_intensity']):.2f} kg/kWh，"
+                   "电动船年排放按 年耗电 × 碳强度 计算，应用后只替换碳强度。")
+
+
+def charging_module(params) -> None:
     """展示岸电充电分析。"""
     with st.expander("🔌 岸电充电分析模块"):
         st.subheader("岸电充电参数设置")
@@ -17,8 +93,10 @@ def charging_module() -> None:
         docking_hours = st.number_input('靠岸可用时间(小时)', value=10.0, step=0.5)
         battery_capacity = st.number_input('船载电池总容量(kWh)', value=2000)
         power_factor = st.number_input('功率因数（PF）', value=0.9, min_value=0.8, max_value=1.0, step=0.01)
-        charged_power = voltage * current * math.sqrt(3) * power_factor / 1000.0  # kW
-        charged_energy = min(charged_power * docking_hours, battery_capacity)
+        charged_power = shore_charging_power(voltage, current, power_factor)  # kW
+        charged_energy = calc_charged_energy(charged_power, docking_hours, battery_capacity)
         st.metric(label="🔋 充电功率(kW)", value=f"{charged_power:.2f} kW")
         st.metric(label="⚡ 实际充入电量(kWh)", value=f"{charged_energy:.2f} kWh")
-        st.info(f"根据当前岸电（交流三相）设置，船舶实际充入电量为 {charged_energy:.2f} kWh。")
\ No newline at end of file
+        st.info(f"根据当前岸电（交流三相）设置，船舶实际充入电量为 {charged_energy:.2f} kWh。")
+        smart_charging_section(params, charged_power, charged_energy)
+        port_simulation_section(params, charged_power)
@@ -0,0 +1,57 @@
+# goal_seek_analysis.py (v6.0)
+"""目标求解模块（v6.0）。
+
+调用 ``core.goal_seek`` 直接求出临界值，无需反复拖动侧边栏滑块：
+满足航线能量需求的最小电池容量、电动船优于柴油船的临界电价，
+以及在指定年限内回本所需的补贴比例。
+"""
+
+import time
+
+import streamlit as st
+
+from cost_calculations import SHIP_TYPES
+from core.vessels import VESSEL_TYPES
+from core.goal_seek import break_even_price, min_battery_for_route, subsidy_for_payback
+from modules.voyage_simulation import DEFAULT_ROUTE
+
+QUERIES = ("最小电池容量", "临界电价", "回本所需补贴")
+
+
+def goal_seek_module(params) -> None:
+    """展示目标求解界面。"""
+    with st.expander("🎯 目标求解模块"):
+        query = st.radio("求解目标", QUERIES, horizontal=True, key="gs_query")
+        start = time.perf_counter()
+        if query == QUERIES[0]:
+            st.caption("航线取航次能量仿真模块的默认航线。")
+            displacement = st.number_input('排水量 Δ (t)', value=600.0, min_value=0.0, step=10.0, key='gs_disp')
+            soc_floor = st.slider('SOC 下限 (%)', 0, 50, 20, 5, key='gs_floor') / 100.0
+            legs, speeds, dwell, current = (DEFAULT_ROUTE[c].to_numpy(dtype=float) for c in DEFAULT_ROUTE.columns)
+            route = dict(legs_km=legs, speeds_kmh=speeds, dwell_hours=dwell, current=current,
+                         displacement=displacement, soc_floor=soc_floor)
+            res = min_battery_for_route(params, route)
+            label, unit = "最小可行电池容量", "kWh"
+        elif query == QUERIES[1]:
+            electric = [v.name for v in VESSEL_TYPES if v.energy.price_key == 'electricity_price']
+            ship = st.selectbox("电动船型", electric, key="gs_price_ship")
+            criterion = st.radio("比较口径", ("先于柴油船回本", "全周期成本低于柴油船"), horizontal=True, key="gs_criterion")
+            res = break_even_price(params, ship, criterion='payback' if criterion == "先于柴油船回本" else 'tco', hi=2.0)
+            label, unit = "临界电价（不高于该值时成立）", "€/kWh"
+        else:
+            ship = st.selectbox("船型", SHIP_TYPES, key="gs_subsidy_ship")
+            years = st.slider("目标回本年限", 1, int(params.get('horizon_years', 25)), 8, key="gs_years")
+            res = subsidy_for_payback(params, ship, years)
+            label, unit = f"{years} 年内回本所需最小补贴比例", ""
+        elapsed = (time.perf_counter() - start) * 1e3
+        if res['value'] is None:
+            st.warning("搜索区间内无解。")
+        else:
+            value = f"{res['value'] * 100:.2f} %" if query == QUERIES[2] else f"{res['value']:,.4g} {unit}"
+            st.metric(label, value)
+            if res.get('tco') is not None:
+                st.metric("对应全周期成本 (10k €)", f"{res['tco'] / 1e4:,.1f}")
+            if res.get('best_size') is not None:
+                st.metric("全周期成本最低的可行容量", f"{res['best_size']:,.0f} kWh",
+                          delta=f"{(res['best_tco'] - res['tco']) / 1e4:,.1f} 10k €", delta_color="inverse")
+        st.caption(f"共计算 {res['evaluations']} 个点、{res['iterations']} 轮，用时 {elapsed:.1f} ms。")
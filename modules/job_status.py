@@ -0,0 +1,82 @@
+# job_status.py (v6.0)
+"""后台分析任务的页面辅助函数（v6.0）。
+
+把 ``core.jobs.job_manager`` 中的任务与当前浏览器会话关联，显示
+进度条、阶段性结果与取消按钮。任务运行期间模块所在的 fragment
+每隔 ``POLL_SECONDS`` 自行重跑一次以刷新进度，不影响页面其余部分。
+"""
+
+import time
+from typing import Any, Callable, Hashable, Optional
+
+import streamlit as st
+from streamlit.errors import StreamlitAPIException
+
+from core.jobs import Job, JobLimitError, job_manager
+
+POLL_SECONDS = 0.5
+
+
+def session_id() -> str:
+    """当前 Streamlit 会话 ID，脚本脱离运行时执行时为 ``'local'``。"""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else 'local'
+
+
+def session_alive(session: str) -> bool:
+    """会话是否仍与运行时保持连接；``'local'`` 与无运行时的场景视为存在。"""
+    from streamlit.runtime import Runtime
+    if session == 'local' or not Runtime.exists():
+        return True
+    return Runtime.instance().is_active_session(session)
+
+
+job_manager.session_alive = session_alive
+
+
+def submit_job(name: str, fn: Callable[..., Any], *args: Any, key: Hashable = None) -> Optional[Job]:
+    """提交任务，达到会话并发上限时显示警告并返回 ``None``。"""
+    try:
+        return job_manager.submit(session_id(), name, fn, *args, key=key)
+    except JobLimitError as ex:
+        st.warning(f"⚠️ {ex}，请等待或取消正在运行的任务。")
+        return None
+
+
+def current_job(name: str, key: Hashable) -> Optional[Job]:
+    """会话内最近的同名任务；输入已变化的活动任务会被取消并返回 ``None``。"""
+    job = job_manager.latest(session_id(), name)
+    if job is not None and job.key != key:
+        if job.active:
+            job_manager.cancel(job.id)
+            st.info("输入已变化，已取消正在运行的分析。")
+        return None
+    return job
+
+
+def job_status(job: Job, label: str) -> None:
+    """显示任务进度、耗时与取消按钮，出错或已取消时给出提示。"""
+    if job.active:
+        c1, c2 = st.columns([5, 1])
+        text = f"{label}：{job.progress:.0%}（{job.elapsed:.1f} 秒）{job.message}"
+        c1.progress(job.progress, text=text if job.status == 'running' else f"{label}：排队中")
+        if c2.button("取消", key=f"cancel_{job.name}"):
+            job_manager.cancel(job.id)
+    elif job.status == 'error':
+        st.error(f"🚨 {label}出错: {job.error}")
+    elif job.status == 'cancelled':
+        st.info(f"{label}已取消。")
+    else:
+        st.caption(f"{label}完成，用时 {job.elapsed:.1f} 秒。")
+
+
+def poll(job: Optional[Job]) -> None:
+    """任务仍在运行时稍候重跑所在 fragment 以刷新进度，应在模块末尾调用。"""
+    if job is None or not job.active:
+        return
+    time.sleep(POLL_SECONDS)
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:  # 不在 fragment 中时退回整页重跑
+        st.rerun()
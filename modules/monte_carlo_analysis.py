@@ -0,0 +1,64 @@
+# monte_carlo_analysis.py (v6.0)
+"""蒙特卡洛不确定性分析模块（v6.0）。
+
+为全部输入参数设定统一的分布类型与波动幅度，调用
+``core.monte_carlo.run_monte_carlo`` 抽样计算，展示累计成本
+P10/P50/P90 区间与各船型按年回本概率曲线。计算作为后台任务提交到
+共享任务池，运行中逐块显示进度与阶段性区间，可随时取消；参数或
+抽样设置变化时正在运行的任务自动取消。
+"""
+
+import plotly.graph_objects as go
+import streamlit as st
+
+from core.monte_carlo import DIST_TYPES, default_distributions, run_monte_carlo
+from core.scenario import Scenario
+from core.vessels import vessel
+from modules.job_status import current_job, job_status, poll, submit_job
+
+JOB_NAME = "monte_carlo"
+
+
+def _run(ctx, params, dists, n_samples: int, seed: int):
+    """任务函数：每块完成后汇报进度与阶段性结果（任务池已占用计算线程，块内不再开进程池）。"""
+    return run_monte_carlo(params, dists, n_samples=n_samples, seed=seed,
+                           on_chunk=lambda done, partial: ctx.report(done / n_samples, partial))
+
+
+def monte_carlo_module(params) -> None:
+    """展示蒙特卡洛不确定性分析。"""
+    with st.expander("🎲 蒙特卡洛不确定性分析模块"):
+        st.subheader("抽样设置")
+        kind = st.selectbox("参数分布类型", DIST_TYPES, key="mc_kind")
+        spread = st.slider("参数波动幅度 (±%)", 5, 50, 20, 5, key="mc_spread") / 100.0
+        n_samples = st.select_slider("样本数", [10_000, 100_000, 1_000_000], value=100_000, key="mc_n")
+        seed = st.number_input("随机种子", value=0, min_value=0, step=1, key="mc_seed")
+        key = (Scenario.from_params(params), kind, spread, n_samples, int(seed))
+        job = current_job(JOB_NAME, key)
+        if st.button("运行蒙特卡洛分析", key="mc_run"):
+            dists = default_distributions(params, spread, kind)
+            job = submit_job(JOB_NAME, _run, params, dists, n_samples, int(seed), key=key) or job
+        res = None
+        if job is not None:
+            job_status(job, "蒙特卡洛抽样")
+            res = job.result if job.status == 'done' else job.partial
+        if res is None:
+            st.info("点击按钮开始抽样计算。")
+            poll(job)
+            return
+        years = list(res['years'])
+        colors = [vessel(ship).color for ship in res['ships']]
+        fill = [f"rgba({int(c[1:3], 16)},{int(c[3:5], 16)},{int(c[5:7], 16)},0.2)" for c in colors]
+        fig = go.Figure()
+        for idx, ship in enumerate(res['ships']):
+            fig.add_trace(go.Scatter(x=years, y=res['bands'][90][idx] / 1e4, mode='lines', line=dict(width=0), showlegend=False, hoverinfo='skip'))
+            fig.add_trace(go.Scatter(x=years, y=res['bands'][10][idx] / 1e4, mode='lines', line=dict(width=0), fill='tonexty', fillcolor=fill[idx], name=f"{ship} P10–P90"))
+            fig.add_trace(go.Scatter(x=years, y=res['bands'][50][idx] / 1e4, mode='lines', line=dict(color=colors[idx], width=2), name=f"{ship} P50"))
+        fig.update_layout(title=f"累计成本不确定性区间 (10k €, {res['n_samples']:,} 样本)", xaxis_title='运营年数', yaxis_title='累计成本 (10k €)', hovermode='x unified')
+        st.plotly_chart(fig, use_container_width=True)
+        fig2 = go.Figure()
+        for idx, ship in enumerate(res['ships']):
+            fig2.add_trace(go.Scatter(x=years, y=res['payback_prob'][idx] * 100, mode='lines+markers', name=ship, line=dict(color=colors[idx])))
+        fig2.update_layout(title="截至各年份的回本概率", xaxis_title="运营年数", yaxis_title="回本概率 (%)", yaxis_range=[0, 100])
+        st.plotly_chart(fig2, use_container_width=True)
+        poll(job)
@@ -0,0 +1,102 @@
+# port_simulation.py (v6.0)
+"""岸电充电桩排队仿真模块（v6.0）。
+
+调用 ``core.port_sim`` 对船队共用若干充电桩的靠港过程做离散事件仿真，
+按充电桩数量扫描排队等待时间分位数、利用率、实际航次数与缺电比例，
+并展示所选桩数下的等待时间分布与各船获得的电量。扫描作为后台任务
+提交到共享任务池，各桩数在进程池中并行仿真；仿真得到的平均在港时间
+可一键写回成本模型的 ``turnaround_time``。
+"""
+
+import os
+
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+
+from core.port_sim import simulate_port, sweep_chargers
+from modules.job_status import current_job, job_status, poll, submit_job
+
+JOB_NAME = "port_sim"
+APPLIED_KEY = "port_sim_applied"
+DETAIL_CALLS = 200_000  # 分布图的单次仿真在页面内运行，限制靠港次数
+SWEEP_CALLS = 1_000_000  # 扫描中每个桩数的靠港次数上限，限制各工作进程的内存与耗时
+
+
+def _run(ctx, counts, kwargs):
+    """任务函数：各桩数并行仿真，每完成一个汇报一次进度。"""
+    return sweep_chargers(counts, workers=min(os.cpu_count() or 1, len(counts)),
+                          on_result=lambda i, row: ctx.report((i + 1) / len(counts), message=f"{counts[i]} 桩完成"),
+                          **kwargs)
+
+
+def port_simulation_section(params, power_kw: float) -> None:
+    """船队共用充电桩的排队仿真：按桩数扫描并可写回在港时间。"""
+    st.subheader("充电桩排队仿真（离散事件）")
+    travel = float(params['avg_trip_distance']) * 2.0 / float(params['economic_speed']) if params['economic_speed'] else 0.0
+    c1, c2, c3 = st.columns(3)
+    n_vessels = c1.number_input("船舶数", value=20, min_value=1, max_value=100_000, step=1, key="ps_vessels")
+    low, high = c2.slider("充电桩数量范围", 1, 50, (2, 10), key="ps_chargers")
+    trip_hours = c3.number_input("平均往返航行时间 (h)", value=round(travel, 2), min_value=0.1, step=0.5, key="ps_trip",
+                                 help="默认取侧边栏航距与航速计算的往返航行时间")
+    c4, c5, c6 = st.columns(3)
+    energy = c4.number_input("每次靠港需充电量 (kWh)", value=round(float(params['electric_consumption_per_hour']) * trip_hours, 1),
+                             min_value=0.0, step=100.0, key="ps_energy", help="默认取电动船每小时耗电 × 往返航行时间")
+    dwell = c5.number_input("最短停靠时间 (h)", value=float(st.session_state.get('turnaround_time', params['turnaround_time'])), min_value=0.0, step=0.5, key="ps_dwell")
+    max_wait = c6.number_input("最长排队时间 (h，0 表示不限)", value=0.0, min_value=0.0, step=0.5, key="ps_wait")
+    c7, c8 = st.columns(2)
+    trip_cv = c7.slider("航次时长波动 (变异系数)", 0.0, 1.0, 0.2, 0.05, key="ps_cv")
+    years = c8.select_slider("仿真年数", [1, 5, 10, 50], value=1, key="ps_years")
+    kwargs = dict(n_vessels=int(n_vessels), charger_kw=float(power_kw), trip_hours=float(trip_hours),
+                  energy_per_trip=float(energy), min_dwell=float(dwell), max_wait=float(max_wait) or np.inf,
+                  trip_cv=float(trip_cv), horizon_hours=float(params['annual_hours']) * years, seed=0)
+    counts = tuple(range(low, high + 1))
+    expected = int(n_vessels * kwargs['horizon_hours'] / (trip_hours + dwell))
+    st.caption(f"单桩功率取上方充电功率 {power_kw:.1f} kW；预计每个桩数约 {expected:,} 次靠港。")
+    if expected > SWEEP_CALLS:
+        st.warning(f"靠港次数超过 {SWEEP_CALLS:,} 次上限：扫描只仿真前 {SWEEP_CALLS:,} 次靠港，"
+                   "指标按实际仿真时长年化。")
+    key = (counts, tuple(sorted(kwargs.items())))
+    job = current_job(JOB_NAME, key)
+    if st.button("运行排队仿真", key="ps_run"):
+        job = submit_job(JOB_NAME, _run, counts, {**kwargs, 'max_calls': SWEEP_CALLS}, key=key) or job
+    if job is not None:
+        job_status(job, "排队仿真")
+    if job is None or job.status != 'done':
+        if job is None:
+            st.info("点击按钮按充电桩数量扫描。")
+        poll(job)
+        return
+    res = job.result
+    fig = go.Figure()
+    for q, dash in ((50, 'solid'), (90, 'dash'), (99, 'dot')):
+        fig.add_trace(go.Scatter(x=res['chargers'], y=res[f'wait_p{q}'], mode='lines+markers', name=f"等待 P{q}", line=dict(dash=dash)))
+    fig.add_trace(go.Bar(x=res['chargers'], y=res['utilisation'] * 100, name="充电桩利用率 (%)", yaxis='y2', opacity=0.3))
+    fig.update_layout(title="排队等待时间与充电桩利用率", xaxis_title="充电桩数量", yaxis_title="等待时间 (h)",
+                      yaxis2=dict(title="利用率 (%)", overlaying='y', side='right', range=[0, 100]), hovermode='x unified')
+    st.plotly_chart(fig, use_container_width=True)
+    st.dataframe({"充电桩": res['chargers'], "平均等待 (h)": res['wait_mean'].round(2), "平均在港 (h)": res['port_hours'].round(2),
+                  "年航次/船": (res['trips_per_year'] * params['annual_hours'] / 8760).round(1),
+                  "供电满足率 (%)": (res['delivered_share'] * 100).round(1)}, hide_index=True)
+    chosen = st.select_slider("查看桩数", [int(c) for c in res['chargers']], value=int(res['chargers'][-1]), key="ps_chosen")
+    detail = simulate_port(n_chargers=chosen, **{**kwargs, 'horizon_hours': float(params['annual_hours']), 'max_calls': DETAIL_CALLS})
+    fig2 = go.Figure(go.Histogram(x=detail['waits'], nbinsx=40))
+    fig2.update_layout(title=f"{chosen} 桩时的单次排队等待时间分布（首年）", xaxis_title="等待时间 (h)", yaxis_title="靠港次数")
+    st.plotly_chart(fig2, use_container_width=True)
+    fig3 = go.Figure(go.Histogram(x=detail['energy'] * params['annual_hours'] / 8760 / 1e3, nbinsx=40))
+    fig3.update_layout(title=f"{chosen} 桩时各船首年获得电量分布", xaxis_title="电量 (MWh)", yaxis_title="船舶数")
+    st.plotly_chart(fig3, use_container_width=True)
+    if detail['truncated']:
+        st.caption(f"分布图仿真达到 {DETAIL_CALLS:,} 次靠港上限，只统计了前 {detail['simulated_hours']:,.0f} h，"
+                   "年化电量按实际仿真时长折算。")
+    idx = int(np.searchsorted(res['chargers'], chosen))
+    applied = st.session_state.get(APPLIED_KEY)
+    c1, c2 = st.columns(2)
+    if c1.button("应用在港时间到成本模型", key="ps_apply"):
+        st.session_state[APPLIED_KEY] = {'turnaround_time': float(res['port_hours'][idx])}
+        st.rerun()
+    if applied and c2.button("恢复侧边栏在港时间", key="ps_reset"):
+        del st.session_state[APPLIED_KEY]
+        st.rerun()
+    if applied:
+        st.caption(f"成本模型当前使用仿真平均在港时间 {applied['turnaround_time']:.2f} h。")
@@ -5,6 +5,7 @@
 """
 
 import streamlit as st
+from core.formulas import cruise_power, installed_power
 
 
 def power_module() -> None:
@@ -13,8 +14,8 @@ def power_module() -> None:
         st.subheader("基于排水量的功率经验估算")
         displacement = st.number_input('排水量 Δ (t)', value=1800.0, min_value=0.0, step=10.0, key='disp')
         k_disp = st.slider('经验系数 k_disp (0.5–0.7 kW/t)', min_value=0.1, max_value=1.0, value=0.6, step=0.05, key='k_disp')
-        P_inst = k_disp * displacement
-        P_cruise = P_inst * 0.7
+        P_inst = installed_power(displacement, k_disp)
+        P_cruise = cruise_power(P_inst)
         st.metric("⚡ 推荐安装功率 P_inst (kW)", f"{P_inst:.0f} kW")
         st.metric("⏱️ 估算连续巡航功率 P_cruise (kW)", f"{P_cruise:.0f} kW")
         st.markdown(f"""
@@ -0,0 +1,53 @@
+# profiling_panel.py (v6.0)
+"""性能剖析面板（v6.0）。
+
+侧边栏的隐藏开关（设置环境变量 ``BOTIX_PROFILE=1`` 或在网址后加
+``?debug=1`` 时才显示）控制本会话是否记录 ``core.profiling`` 计时。
+面板只展示本会话的记录：最近一次运行的瀑布图、各段滚动 p50/p95，
+并可导出 JSON 与 Chrome trace；清空记录也只影响本会话。
+"""
+
+import pandas as pd
+import streamlit as st
+
+from core import profiling
+from modules.job_status import session_id
+
+
+def sync_profiling() -> None:
+    """按会话中的开关状态设置当前脚本线程的剖析开关（fragment 重跑同样适用）。"""
+    profiling.set_enabled(st.session_state.get("profile_enabled", profiling.ENABLED_BY_ENV), session_id())
+
+
+def profiling_toggle() -> None:
+    """在侧边栏显示隐藏的剖析开关。"""
+    if profiling.ENABLED_BY_ENV or st.query_params.get("debug") == "1":
+        with st.sidebar.expander("⚙️ 诊断", expanded=False):
+            st.checkbox("启用性能剖析", value=profiling.ENABLED_BY_ENV, key="profile_enabled")
+
+
+def profiling_panel() -> None:
+    """展示最近一次运行的瀑布图与各段耗时统计。"""
+    import plotly.graph_objects as go
+    with st.expander("⏱️ 性能剖析", expanded=True):
+        session = session_id()
+        runs = profiling.runs(session)
+        if not runs:
+            st.info("暂无剖析记录，重跑一次页面后显示。")
+            return
+        last = runs[-1]
+        spans = last['spans']
+        fig = go.Figure(go.Bar(
+            x=[s['duration_ms'] for s in spans], base=[s['offset_ms'] for s in spans], orientation='h',
+            y=[f"{i:02d} {'· ' * s['depth']}{s['name']}" for i, s in enumerate(spans)],
+            hovertemplate='%{y}<br>开始 %{base:.1f} ms，耗时 %{x:.1f} ms<extra></extra>'))
+        fig.update_layout(title=f"最近一次运行「{last['name']}」瀑布图（共 {last['duration_ms']:.0f} ms）",
+                          xaxis_title="时间 (ms)", yaxis=dict(autorange='reversed'), height=max(300, 22 * len(spans)))
+        st.plotly_chart(fig, use_container_width=True)
+        table = pd.DataFrame(profiling.stats(session)).T.sort_values('p95_ms', ascending=False)
+        st.dataframe(table.style.format({'count': '{:.0f}', 'mean_ms': '{:.1f}', 'p50_ms': '{:.1f}', 'p95_ms': '{:.1f}'}), use_container_width=True)
+        col1, col2, col3 = st.columns(3)
+        col1.download_button("导出 JSON", profiling.to_json(session), "botix_profile.json", "application/json", key="profile_json")
+        col2.download_button("导出 Chrome trace", profiling.to_chrome_trace(session), "botix_trace.json", "application/json", key="profile_trace")
+        if col3.button("清空记录", key="profile_reset"):
+            profiling.reset(session)
@@ -0,0 +1,82 @@
+# report_export.py (v6.0)
+"""批量报告导出模块（v6.0）。
+
+把当前侧边栏场景或上传的多场景文件（CSV / Parquet，列名同
+``core.batch_runner``）导出为含成本表格与静态图表的 Excel 工作簿
+和/或 PDF 报告。导出由 ``core.report_export`` 流式完成，作为后台
+任务提交到共享任务池，图表在进程池中渲染，可随时取消；完成后提供
+下载按钮。
+"""
+
+import os
+import tempfile
+
+import streamlit as st
+
+from core.report_export import count_scenarios, export_reports, read_scenarios
+from core.scenario import Scenario
+from modules.job_status import current_job, job_status, poll, submit_job
+
+JOB_NAME = "report_export"
+FORMATS = {"Excel": ('xlsx', "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+           "PDF": ('pdf', "application/pdf")}
+
+
+def _run(ctx, source, formats, charts: bool):
+    """任务函数：导出到临时目录，每写完一个场景汇报一次进度，返回 {格式: 文件路径}。"""
+    if isinstance(source, str):
+        total, scenarios = count_scenarios(source), read_scenarios(source)
+    else:
+        total, scenarios = 1, [("当前场景", source)]
+    out_dir = tempfile.mkdtemp(prefix='botix-export-')
+    paths = {fmt: os.path.join(out_dir, f"botix_report.{FORMATS[fmt][0]}") for fmt in formats}
+    export_reports(scenarios, paths.get("Excel"), paths.get("PDF"), workers=os.cpu_count() or 1, charts=charts,
+                   on_progress=lambda done, name: ctx.report(done / max(total, 1), message=f"已导出 {done}/{total}：{name}"))
+    return paths
+
+
+def _upload_path(upload) -> str:
+    """上传文件落盘一次（按文件 ID），导出时按块流式读取。"""
+    paths = st.session_state.setdefault("report_uploads", {})
+    if upload.file_id not in paths:
+        suffix = os.path.splitext(upload.name)[1] or '.csv'
+        with tempfile.NamedTemporaryFile(prefix='botix-scenarios-', suffix=suffix, delete=False) as fh:
+            fh.write(upload.getbuffer())
+        paths[upload.file_id] = fh.name
+    return paths[upload.file_id]
+
+
+def report_export_module(params) -> None:
+    """展示批量报告导出。"""
+    with st.expander("📄 批量报告导出模块"):
+        source_kind = st.radio("导出场景", ["当前侧边栏场景", "上传场景文件"], horizontal=True, key="rep_source")
+        if source_kind == "上传场景文件":
+            upload = st.file_uploader("场景文件（每行一个场景，列名同参数名，缺失列取默认值）", type=["csv", "parquet"], key="rep_upload")
+            if upload is None:
+                st.info("请上传 CSV 或 Parquet 场景文件。")
+                return
+            source = _upload_path(upload)
+            key_source = upload.file_id
+        else:
+            scenario = Scenario.from_params(params)
+            source, key_source = scenario.to_params(), scenario
+        c1, c2 = st.columns(2)
+        formats = tuple(c1.multiselect("输出格式", list(FORMATS), default=list(FORMATS), key="rep_formats"))
+        charts = c2.checkbox("Excel 中嵌入图表", value=True, key="rep_charts")
+        if not formats:
+            st.warning("⚠️ 请至少选择一种输出格式。")
+            return
+        key = (key_source, formats, charts)
+        job = current_job(JOB_NAME, key)
+        if st.button("开始导出", key="rep_run"):
+            job = submit_job(JOB_NAME, _run, source, formats, charts, key=key) or job
+        if job is None:
+            st.info("点击按钮开始导出。")
+            return
+        job_status(job, "报告导出")
+        if job.status == 'done':
+            cols = st.columns(len(job.result))
+            for col, (fmt, path) in zip(cols, job.result.items()):
+                with open(path, 'rb') as fh:
+                    col.download_button(f"下载 {fmt} 报告", fh, os.path.basename(path), FORMATS[fmt][1], key=f"rep_download_{fmt}")
+        poll(job)
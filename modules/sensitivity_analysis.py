@@ -1,50 +1,59 @@
 # sensitivity_analysis.py (v6.0)
 """敏感性分析模块（v6.0）。
 
-分析关键参数变化对船舶累计成本的影响，通过选择敏感因素并对其取值
-进行±20%变化，绘制累计成本曲线对比图。
+分析关键参数变化对船舶累计成本的影响：选择任意数值参数并对其取值
+进行±20%变化绘制累计成本曲线对比图，给出全部参数按累计成本或回本
+年份的龙卷风排序，以及任意两个参数的二维网格热力图。计算均由 ``core.sensitivity``
+批量完成；超过 ``INLINE_GRID`` 的大网格作为后台任务分块计算，逐块
+刷新热力图，可取消。
 """
 
+import numpy as np
 import streamlit as st
 import plotly.graph_objects as go
-from copy import deepcopy
-from cost_calculations import calculate_costs
+from core.scenario import Scenario
+from core.vessels import VESSEL_TYPES
+from core.sensitivity import base_value, numeric_params, sweep, sweep_2d, tornado
+from modules.job_status import current_job, job_status, poll, submit_job
+
+INLINE_GRID = 100  # 网格密度不超过该值时直接在页面中计算
+JOB_NAME = "sweep_2d"
+
+FACTOR_KEYS = {
+    "柴油价格": 'mgo_price',
+    "电价": 'electricity_price',
+    "电池价格": 'battery_price',
+    "年度运营小时数": 'annual_hours',
+    "保险优惠比例": 'insurance_discount',
+}
+
+
+def _grid_job(ctx, params, key_x, xs, key_y, ys):
+    """任务函数：每块约一万个格点，完成后汇报进度与已填充的热力图。"""
+    return sweep_2d(params, key_x, xs, key_y, ys, chunk_rows=max(1, 10_000 // len(ys)),
+                    on_chunk=lambda frac, partial: ctx.report(frac, partial))
+
+
+def _factor_options(params) -> dict:
+    """常用因素在前，其余数值参数按参数名列出。"""
+    options = dict(FACTOR_KEYS)
+    options.update({k: k for k in numeric_params(params) if k not in FACTOR_KEYS.values()})
+    return options
 
 
 def sensitivity_module(costs, params) -> None:
     """展示敏感性分析。"""
     with st.expander("📊 敏感性分析模块"):
         st.subheader("敏感因素选择")
-        factor = st.selectbox(
-            "选择敏感因素",
-            ["柴油价格", "电价", "电池价格", "年度运营小时数", "保险优惠比例"],
-        )
+        options = _factor_options(params)
+        factor = st.selectbox("选择敏感因素", list(options))
         variations = [-20, -10, 0, 10, 20]
-        results = {}
-        for var in variations:
-            adj = 1 + var / 100.0
-            new_params = deepcopy(params)
-            # 根据敏感因素调整参数
-            if factor == "柴油价格":
-                new_params['mgo_price'] = params['mgo_price'] * adj
-            if factor == "电价":
-                new_params['electricity_price'] = params['electricity_price'] * adj
-            if factor == "电池价格":
-                new_params['battery_price'] = params['battery_price'] * adj
-            if factor == "年度运营小时数":
-                new_params['annual_hours'] = params['annual_hours'] * adj
-            if factor == "保险优惠比例":
-                new_params['insurance_discount'] = params['insurance_discount'] * adj
-            # 调整换电成本
-            new_params['battery_replace_cost_eu'] = new_params['battery_capacity_kWh'] * new_params['battery_price'] * new_params['battery_replace_ratio_eu']
-            new_params['battery_replace_cost_cn'] = new_params['battery_capacity_kWh'] * new_params['battery_price'] * 0.7 * new_params['battery_replace_ratio_cn']
-            # 重新计算成本
-            adj_costs = calculate_costs(new_params)
-            results[f"{var}%"] = adj_costs['cumulative_costs']
+        base = base_value(params, options[factor])
+        res = sweep(params, options[factor], [base * (1 + v / 100.0) for v in variations])
         # 绘图
         fig = go.Figure()
-        base_labels = {"STAGE V 柴油船 (EU)": "EU D", "电动船 (EU)": "EU E", "电动船 (CN)": "CN E"}
-        colors = ['blue', 'green', 'orange']
+        base_labels = {v.name: v.short for v in VESSEL_TYPES}
+        colors = [v.color for v in VESSEL_TYPES]
         # 基准曲线
         for idx, name in enumerate(base_labels):
             fig.add_trace(go.Scatter(
@@ -55,13 +64,13 @@ def sensitivity_module(costs, params) -> None:
                 line=dict(width=3, color=colors[idx]),
             ))
         # 敏感性曲线
-        for var, data in results.items():
+        for row, var in enumerate(variations):
             for idx, name in enumerate(base_labels):
                 fig.add_trace(go.Scatter(
                     x=costs['years'],
-                    y=[v/1e4 for v in data[name]],
+                    y=res['cumulative_costs'][row, idx] / 1e4,
                     mode='lines',
-                    name=f"{base_labels[name]} ({factor} {var})",
+                    name=f"{base_labels[name]} ({factor} {var}%)",
                     line=dict(width=1.5, dash='dot', color=colors[idx]),
                 ))
         fig.update_layout(
@@ -70,4 +79,57 @@ def sensitivity_module(costs, params) -> None:
             yaxis_title='累计成本 (10k €)',
             hovermode='x unified'
         )
-        st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+        st.plotly_chart(fig, use_container_width=True)
+
+        st.subheader("龙卷风图（全部参数 ±20%）")
+        ship = st.radio("选择船型：", list(base_labels), horizontal=True, key="tornado_ship")
+        idx = list(base_labels).index(ship)
+        metric = st.radio("排序口径：", ["累计成本", "回本年份"], horizontal=True, key="tornado_metric")
+        tr = tornado(params)
+        horizon = tr['horizon_years']
+        if metric == "累计成本":
+            top = tr['order'][idx][:15][::-1]
+            values, base_v = tr['tco'][top, :, idx] / 1e4, tr['base_tco'][idx] / 1e4
+            title, axis = f"{ship} {horizon} 年累计成本敏感性排序 (10k €)", f"{horizon} 年累计成本 (10k €)"
+        else:
+            top = tr['order_payback'][idx][:15][::-1]
+            values = np.where(tr['payback'][top, :, idx] < 0, horizon, tr['payback'][top, :, idx])
+            base_v = horizon if tr['base_payback'][idx] < 0 else tr['base_payback'][idx]
+            title, axis = f"{ship} 回本年份敏感性排序（未回本按 {horizon} 年计）", "回本年份"
+        labels = [tr['params'][i] for i in top]
+        fig_t = go.Figure()
+        fig_t.add_trace(go.Bar(y=labels, x=values[:, 0] - base_v, base=base_v, orientation='h', name='-20%', marker_color='#00CC96'))
+        fig_t.add_trace(go.Bar(y=labels, x=values[:, 1] - base_v, base=base_v, orientation='h', name='+20%', marker_color='#EF553B'))
+        fig_t.update_layout(title=title, barmode='overlay', xaxis_title=axis)
+        st.plotly_chart(fig_t, use_container_width=True)
+
+        st.subheader("双参数网格扫描")
+        keys = list(options)
+        c1, c2, c3 = st.columns(3)
+        fx = c1.selectbox("横轴参数", keys, index=0, key="sweep_x")
+        fy = c2.selectbox("纵轴参数", keys, index=1, key="sweep_y")
+        size = c3.slider("网格密度", 10, 300, 50, 10, key="sweep_size")
+        if fx == fy:
+            st.warning("⚠️ 横轴与纵轴请选择不同的参数。")
+            return
+        bx, by = base_value(params, options[fx]), base_value(params, options[fy])
+        axes = (options[fx], np.linspace(bx * 0.8, bx * 1.2, size), options[fy], np.linspace(by * 0.8, by * 1.2, size))
+        job = None
+        if size <= INLINE_GRID:
+            grid = sweep_2d(params, *axes)
+        else:
+            key = (Scenario.from_params(params), options[fx], options[fy], size)
+            job = current_job(JOB_NAME, key) or submit_job(JOB_NAME, _grid_job, params, *axes, key=key)
+            if job is None:
+                return
+            job_status(job, "网格扫描")
+            if job.status in ('cancelled', 'error') and st.button("重新计算", key="sweep_retry"):
+                job = submit_job(JOB_NAME, _grid_job, params, *axes, key=key) or job
+            grid = job.result if job.status == 'done' else job.partial
+            if grid is None:
+                poll(job)
+                return
+        fig_h = go.Figure(go.Heatmap(x=grid['xs'], y=grid['ys'], z=grid['tco'][idx].T / 1e4, colorbar=dict(title='10k €')))
+        fig_h.update_layout(title=f"{ship} {costs['horizon_years']} 年累计成本 (10k €)", xaxis_title=fx, yaxis_title=fy)
+        st.plotly_chart(fig_h, use_container_width=True)
+        poll(job)
@@ -0,0 +1,58 @@
+# voyage_simulation.py (v6.0)
+"""航次能量仿真模块（v6.0）。
+
+串联岸电充电、功率需求与续航计算：按航段与靠泊逐段推进电池
+荷电状态，判断给定电池容量能否在 SOC 下限之上完成航线，并在
+一组候选容量上一次性求出最小可行电池容量。
+"""
+
+import pandas as pd
+import streamlit as st
+
+from core.voyage import min_feasible_battery, simulate_voyage
+
+DEFAULT_ROUTE = pd.DataFrame({
+    '航段距离(km)': [25.0, 15.0, 25.0, 15.0],
+    '航速(km/h)': [10.0, 10.0, 10.0, 10.0],
+    '靠泊时长(h)': [3.0, 0.5, 3.0, 0.5],
+    '岸电电流(A)': [250.0, 0.0, 250.0, 0.0],
+})
+
+
+def voyage_module() -> None:
+    """展示航次能量仿真界面。"""
+    import plotly.graph_objects as go
+    with st.expander("🧭 航次能量仿真模块"):
+        st.subheader("航线设置（每行一个航段及其后的靠泊，电流为 0 表示无岸电）")
+        route = st.data_editor(DEFAULT_ROUTE, num_rows="dynamic", key="voyage_route").dropna()
+        col1, col2, col3 = st.columns(3)
+        battery = col1.number_input('电池容量(kWh)', value=2000.0, min_value=100.0, step=100.0, key='voyage_battery')
+        displacement = col2.number_input('排水量 Δ (t)', value=600.0, min_value=0.0, step=10.0, key='voyage_disp')
+        k_disp = col3.slider('经验系数 k_disp (kW/t)', 0.1, 1.0, 0.6, 0.05, key='voyage_k_disp')
+        design_speed = col1.number_input('设计航速(km/h)', value=10.0, min_value=1.0, key='voyage_design_speed')
+        voltage = col2.number_input('岸电电压(V)', value=400.0, key='voyage_voltage')
+        power_factor = col3.number_input('功率因数（PF）', value=0.9, min_value=0.8, max_value=1.0, step=0.01, key='voyage_pf')
+        hotel = col1.number_input('辅助负荷(kW)', value=20.0, min_value=0.0, key='voyage_hotel')
+        soc_floor = col2.slider('SOC 下限 (%)', 0, 50, 20, 5, key='voyage_floor') / 100.0
+        n_cycles = col3.number_input('连续往返次数', value=1, min_value=1, max_value=50, key='voyage_cycles')
+        if route.empty:
+            st.info("请至少输入一个航段。")
+            return
+        legs, speeds, dwell, current = (route[c].to_numpy(dtype=float) for c in DEFAULT_ROUTE.columns)
+        kwargs = dict(k_disp=k_disp, design_speed=design_speed, voltage=voltage, current=current,
+                      power_factor=power_factor, hotel_kW=hotel, soc_floor=soc_floor, n_cycles=int(n_cycles))
+        res = simulate_voyage(legs, speeds, dwell, battery, displacement, record=True, **kwargs)
+        sizing = min_feasible_battery(legs, speeds, dwell, displacement, **kwargs)
+        feasible = bool(res['feasible'][0])
+        st.metric("🔋 最低荷电状态", f"{res['min_soc'][0] * 100:.1f} %")
+        st.metric("⚡ 航行平均耗电(kWh/h)", f"{res['consumption_per_hour'][0]:.0f}")
+        minimum = sizing['min_feasible']
+        st.metric("📐 最小可行电池容量(kWh)", f"{minimum:,.0f}" if minimum is not None else "候选范围内不可行")
+        fig = go.Figure(go.Scatter(y=res['soc'][0] * 100, mode='lines+markers', name='SOC'))
+        fig.add_hline(y=soc_floor * 100, line_dash='dash', line_color='red', annotation_text='SOC 下限')
+        fig.update_layout(title="航线荷电状态变化", xaxis_title="航段 / 靠泊序号", yaxis_title="SOC (%)")
+        st.plotly_chart(fig, use_container_width=True)
+        if feasible:
+            st.success(f"电池容量 {battery:,.0f} kWh 可在 SOC 下限之上完成 {int(n_cycles)} 次航线。")
+        else:
+            st.warning(f"电池容量 {battery:,.0f} kWh 无法在 SOC 下限之上完成航线。")
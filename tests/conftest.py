@@ -0,0 +1,7 @@
+# conftest.py (v6.0)
+"""测试公共配置：把仓库根目录加入导入路径。"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,67 @@
+# test_cost_calculations.py (v6.0)
+"""成本引擎回归测试：标量快速路径与批量引擎的一致性、字符串仿真设置列。"""
+
+import math
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.batch_runner import evaluate_chunk
+from cost_calculations import (STEPS_PER_YEAR, _scalar_ready, calculate_costs, calculate_costs_batch, format_costs,
+                               merge_columns)
+from utils.param_metadata import default_params
+
+
+def _same(a, b) -> bool:
+    """逐位比较结果：键顺序、类型与数值（NaN 视为相等）均须一致。"""
+    if isinstance(a, dict):
+        return isinstance(b, dict) and list(a) == list(b) and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, list):
+        return isinstance(b, list) and len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    if isinstance(a, float) and isinstance(b, float):
+        return a == b or (math.isnan(a) and math.isnan(b))
+    return type(a) is type(b) and a == b
+
+
+def _random_scenarios(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    base = default_params()
+    for _ in range(count):
+        p = dict(base)
+        for key, value in base.items():
+            if isinstance(value, float) and rng.random() < 0.4:
+                p[key] = value * rng.choice([0.0, rng.uniform(0.2, 3.0)])
+        p['smart_equipment_selected'] = rng.random() < 0.5
+        p['horizon_years'] = rng.choice([1, 10, 25, 40])
+        if rng.random() < 0.3:
+            p['grid_carbon_intensity'] = rng.uniform(0.0, 0.6)
+        if rng.random() < 0.3:
+            p['annual_income'] = rng.choice([0.0, 1e6])
+        if rng.random() < 0.2:
+            p['battery_replace_cost_eu'] = 12345.0
+        yield p
+
+
+@pytest.mark.parametrize('time_step', list(STEPS_PER_YEAR))
+def test_calculate_costs_matches_batch(time_step):
+    for params in _random_scenarios(200):
+        params['time_step'] = time_step
+        assert _scalar_ready(params) == (time_step == 'year')
+        with np.errstate(all='ignore'):
+            expected = format_costs(calculate_costs_batch(params))
+        assert _same(calculate_costs(params), expected)
+
+
+def test_string_time_step_column():
+    cols = merge_columns(default_params(), {'electricity_price': np.array([0.1, 0.2]),
+                                            'time_step': np.array(['month', 'month'], dtype=object)})
+    res = calculate_costs_batch(cols)
+    assert res['steps_per_year'] == 12
+    assert res['cumulative_costs'].shape[-1] == res['horizon_years'] * 12 + 1
+
+    frame = pd.DataFrame({'electricity_price': [0.1, 0.2], 'time_step': ['week', 'week']})
+    assert len(evaluate_chunk(frame)) == 2
+    with pytest.raises(ValueError):
+        calculate_costs_batch(merge_columns(default_params(), {'time_step': np.array(['month', 'week'], dtype=object)}))
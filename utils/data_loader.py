@@ -1,15 +1,147 @@
 # data_loader.py (v6.0)
 """数据加载模块（v6.0）。
 
-提供读取 Excel 数据的函数。使用 Streamlit 的缓存机制
-避免重复加载文件。
+提供读取 Excel 数据的函数。每个工作表首次读取后转换为未压缩的
+Feather (Arrow IPC) 文件存入磁盘缓存，之后以内存映射方式加载，
+可只读取所需的工作表与列。缓存按源文件修改时间与 SHA-256 失效：
+修改时间和大小未变时直接复用，变化时再比对内容哈希。``load_sheets``
+与 ``build_cache`` 不导入 Streamlit，可在批处理进程与工作进程中使用；
+页面中的 ``load_data`` 首次调用时才导入 Streamlit，在其上叠加
+``st.cache_data`` 进程内缓存。缓存文件先写入同目录的临时文件再原子
+替换，并发读取者不会读到写了一半的文件。
 """
 
+import hashlib
+import json
+import os
+import re
+from typing import Dict, Iterable, Mapping, Optional, Union
+
 import pandas as pd
-import streamlit as st
+
+DEFAULT_FILE = 'detailed_ship_cost_analysis_updated.xlsx'
+CACHE_ENV = 'BOTIX_DATA_CACHE'  # 设置该环境变量可指定缓存目录
+MANIFEST = 'manifest.json'
+_cached_load = None
+
+Columns = Optional[Union[Iterable[str], Mapping[str, Iterable[str]]]]
+
+
+def cache_dir_for(file_path: str, cache_dir: Optional[str] = None) -> str:
+    """源文件对应的缓存目录，默认位于源文件旁的 ``.botix_cache/<文件名>``。"""
+    root = cache_dir or os.environ.get(CACHE_ENV) or os.path.join(os.path.dirname(os.path.abspath(file_path)), '.botix_cache')
+    return os.path.join(root, os.path.basename(file_path))
+
+
+def _sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _arrow_safe(df: pd.DataFrame) -> pd.DataFrame:
+    """列名转为字符串、混合类型的对象列转为字符串，使工作表可写入 Arrow。"""
+    import pyarrow as pa
+    df = df.copy()
+    df.columns = [str(c) for c in df.columns]
+    for col in df.columns[df.dtypes == object]:
+        try:
+            pa.array(df[col])
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            df[col] = df[col].map(lambda v: None if pd.isna(v) else str(v))
+    return df.reset_index(drop=True)
+
+
+def _read_manifest(path: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(path, MANIFEST), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(path: str, manifest: dict) -> None:
+    tmp = os.path.join(path, f"{MANIFEST}.{os.getpid()}.tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp, os.path.join(path, MANIFEST))
+
+
+def build_cache(file_path: str, cache_dir: Optional[str] = None) -> dict:
+    """解析整本 Excel 并把每个工作表写成一个 Feather 文件，返回缓存清单。"""
+    import pyarrow.feather as feather
+    path = cache_dir_for(file_path, cache_dir)
+    os.makedirs(path, exist_ok=True)
+    stat = os.stat(file_path)
+    sheets = {}
+    for idx, (name, df) in enumerate(pd.read_excel(file_path, sheet_name=None).items()):
+        fname = f"{idx:03d}_{re.sub(r'[^0-9A-Za-z_-]+', '_', str(name))[:40]}.feather"
+        target = os.path.join(path, fname)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        try:
+            feather.write_feather(_arrow_safe(df), tmp, compression='uncompressed')
+            os.replace(tmp, target)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        sheets[str(name)] = fname
+    manifest = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': _sha256(file_path), 'sheets': sheets}
+    _write_manifest(path, manifest)
+    return manifest
+
+
+def ensure_cache(file_path: str, cache_dir: Optional[str] = None) -> dict:
+    """返回有效的缓存清单，源文件内容变化时重新构建。"""
+    path = cache_dir_for(file_path, cache_dir)
+    manifest = _read_manifest(path)
+    if manifest is None:
+        return build_cache(file_path, cache_dir)
+    stat = os.stat(file_path)
+    if (manifest['mtime_ns'], manifest['size']) == (stat.st_mtime_ns, stat.st_size):
+        return manifest
+    if manifest['sha256'] != _sha256(file_path):
+        return build_cache(file_path, cache_dir)
+    # 仅修改时间变化（如重新拷贝），内容未变：更新清单后继续复用
+    manifest.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+    _write_manifest(path, manifest)
+    return manifest
+
+
+def load_sheets(file_path: str = DEFAULT_FILE, sheets: Optional[Iterable[str]] = None,
+                columns: Columns = None, cache_dir: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+    """按需读取工作表，返回 ``{工作表名: DataFrame}``。
+
+    Args:
+        file_path: Excel 源文件路径。
+        sheets: 需要的工作表名，默认全部。
+        columns: 需要的列名；为列表时对所有工作表生效（缺失的列忽略），
+            为字典时按工作表分别指定。
+        cache_dir: 缓存根目录，默认取环境变量 ``BOTIX_DATA_CACHE`` 或源文件旁目录。
+    """
+    import pyarrow.feather as feather
+    manifest = ensure_cache(file_path, cache_dir)
+    path = cache_dir_for(file_path, cache_dir)
+    names = list(manifest['sheets']) if sheets is None else list(sheets)
+    missing = [n for n in names if n not in manifest['sheets']]
+    if missing:
+        raise KeyError(f"工作表不存在: {missing}")
+    out = {}
+    for name in names:
+        source = os.path.join(path, manifest['sheets'][name])
+        wanted = columns.get(name) if isinstance(columns, Mapping) else columns
+        if wanted is not None:
+            available = set(feather.read_table(source, columns=[], memory_map=True).schema.names)
+            wanted = [c for c in wanted if c in available]
+        out[name] = feather.read_table(source, columns=wanted, memory_map=True).to_pandas()
+    return out
 
 
-@st.cache_data
-def load_data(file_path: str = 'detailed_ship_cost_analysis_updated.xlsx'):
-    """读取 Excel 文件并返回所有工作表的字典。"""
-    return pd.read_excel(file_path, sheet_name=None)
\ No newline at end of file
+def load_data(file_path: str = DEFAULT_FILE, sheets: Optional[tuple] = None, columns: Optional[tuple] = None):
+    """读取 Excel 文件并返回工作表字典（默认全部工作表），结果由 ``st.cache_data`` 缓存。"""
+    global _cached_load
+    if _cached_load is None:
+        import streamlit as st
+        _cached_load = st.cache_data(load_sheets)
+    return _cached_load(file_path, sheets, columns)
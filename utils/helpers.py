@@ -1,10 +1,16 @@
 # helpers.py (v6.0)
 """通用辅助函数模块（v6.0）。
 
-提供跳年计算等简单工具函数，供成本计算和可视化模块引用。
+提供跳年计算等简单工具函数，以及按需加载中文字体的 Matplotlib 图对象，
+供成本计算、可视化与报告导出模块引用。
 """
 
+import os
 from typing import List
+import numpy as np
+
+FONT_PATH = os.path.join("fonts", "NotoSansCJKsc-Regular.otf")
+_Figure = None
 
 
 def get_jump_years(cycle: float, last_year: int) -> List[int]:
@@ -27,4 +33,60 @@ def get_jump_years(cycle: float, last_year: int) -> List[int]:
             k += 1
         else:
             break
-    return jumps
\ No newline at end of file
+    return jumps
+
+
+def jump_steps(cycles: np.ndarray, last_year: int, steps_per_year: int = 1):
+    """``get_jump_years`` 的向量化版本，返回全部事件的 (行下标, 时间步下标)。
+
+    第 k 次事件落在时间步 ``round(cycle * steps_per_year * k)``，按年步长时
+    与 ``get_jump_years`` 完全一致。
+
+    Args:
+        cycles: 长度 N 的周期数组（年），要求不小于 1 或为非有限值。
+        last_year: 最后一年。
+        steps_per_year: 每年时间步数。"""
+    cycles = np.asarray(cycles, dtype=float).reshape(-1)
+    last_step = last_year * steps_per_year
+    finite = cycles[np.isfinite(cycles) & (cycles > 0)]
+    k_max = min(last_step, int(last_year / finite.min()) + 1) if finite.size else 0
+    k = np.arange(1, k_max + 1)
+    with np.errstate(invalid='ignore', over='ignore'):
+        y = np.rint(cycles[:, None] * steps_per_year * k)
+        valid = (cycles[:, None] > 0) & (y > 0) & (y <= last_step)
+    rows, cols = np.nonzero(valid)
+    return rows, y[rows, cols].astype(int)
+
+
+def jump_year_mask(cycles: np.ndarray, last_year: int, steps_per_year: int = 1) -> np.ndarray:
+    """``jump_steps`` 的稠密形式，返回 (N, last_year * steps_per_year + 1) 布尔掩码。
+
+    Args:
+        cycles: 长度 N 的周期数组（年），要求不小于 1 或为非有限值。
+        last_year: 最后一年。
+        steps_per_year: 每年时间步数。
+
+    Returns:
+        掩码数组，``mask[i, t]`` 为 True 表示第 i 组参数在第 t 个时间步发生事件。"""
+    cycles = np.asarray(cycles, dtype=float).reshape(-1)
+    mask = np.zeros((len(cycles), last_year * steps_per_year + 1), dtype=bool)
+    rows, steps = jump_steps(cycles, last_year, steps_per_year)
+    mask[rows, steps] = True
+    return mask
+
+
+def mpl_figure(**kwargs):
+    """首次绘制 Matplotlib 图表时才导入并加载中文字体，返回不入 pyplot 注册表的新图。"""
+    global _Figure
+    if _Figure is None:
+        import matplotlib
+        import matplotlib.font_manager as fm
+        from matplotlib.figure import Figure
+        # 加载字体文件并全局设置字体；字体文件缺失时沿用下方备选字体
+        if os.path.exists(FONT_PATH):
+            fm.fontManager.addfont(FONT_PATH)
+            matplotlib.rcParams['font.family'] = fm.FontProperties(fname=FONT_PATH).get_name()
+        matplotlib.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Arial Unicode MS']
+        matplotlib.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
+        _Figure = Figure
+    return _Figure(**kwargs)
@@ -33,6 +33,34 @@ param_info = {
     "insurance_discount": {"default": 5.0},
 }
 
+# 侧边栏中未列入 param_info 的其余输入默认值
+extra_defaults = {
+    "subsidy_ratio_stage_v": 0.2,
+    "subsidy_ratio_electric_eu": 0.3,
+    "subsidy_ratio_electric_cn": 0.3,
+    "annual_income": 0.0,
+    "insurance_rate": 5.0,
+    "smart_equipment_selected": False,
+    "horizon_years": 25,
+    "time_step": "year",
+    "grid_carbon_intensity": 0.35,  # kg CO2/kWh，电动船年排放 = 年耗电 × 碳强度
+}
+
+# 初期建造成本分项默认值（单位：10k €），顺序同 cost_calculations.BUILD_COMPONENTS
+build_cost_defaults = {
+    '柴油船': [60.0, 25.0, 20.0, 10.0, 8.0, 5.0],
+    '电动船(EU)': [60.0, 20.0, 25.0, 10.0, 8.0, 5.0],
+    '电动船(CN)': [40.0, 15.0, 15.0, 7.0, 6.0, 3.5],
+}
+
+
+def default_params() -> dict:
+    """返回一份完整的默认参数字典，可直接用于 calculate_costs。"""
+    params = {k: v['default'] for k, v in param_info.items()}
+    params.update(extra_defaults)
+    params.update({k: list(v) for k, v in build_cost_defaults.items()})
+    return params
+
 
 def get_param_help(key: str) -> str:
     """返回参数的帮助说明（占位函数）。实际说明请参考项目文档。"""
@@ -1,93 +1,99 @@
 # visualizations.py (v6.0)
 """可视化模块（v6.0）：成本对比曲线、运营占比、ROI与碳排放。"""
 
-import streamlit as st
-import plotly.graph_objects as go
-import matplotlib.pyplot as plt
-from utils.helpers import get_jump_years
+import io
 
+import streamlit as st
+from core.cache import ResultCache
+from core.profiling import profiled, span
+from core.vessels import vessel
+from utils.helpers import mpl_figure
 
-import matplotlib.font_manager as fm
-import os
+WEBGL_THRESHOLD = 2000  # 单图数据点数超过该值时自动改用 WebGL (Scattergl)
+figure_cache = ResultCache(maxsize=64)
 
-# 加载字体文件
-font_path = os.path.join("fonts", "NotoSansCJKsc-Regular.otf")
-prop = fm.FontProperties(fname=font_path)
 
-# 全局设置字体
-plt.rcParams['font.family'] = prop.get_name()
-plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
+def _plot(fig) -> None:
+    """输出 Plotly 图表，剖析时单独计时序列化与发送。"""
+    with span("plotly_chart"):
+        st.plotly_chart(fig, use_container_width=True)
 
 
-plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Arial Unicode MS']; plt.rcParams['axes.unicode_minus'] = False
+@profiled()
+def _build_cost_figure(series, markers, webgl):
+    """构建累计成本曲线；每条曲线的周期节点合并为一条标记 trace。"""
+    import plotly.graph_objects as go
+    trace = go.Scattergl if webgl else go.Scatter
+    fig = go.Figure()
+    for (label, color, years, values), (symbol, text, position, jumps) in zip(series, markers):
+        fig.add_trace(trace(x=years, y=[v/1e4 for v in values], mode='lines+markers', name=label, line=dict(color=color)))
+        if jumps:
+            fig.add_trace(trace(x=[years[j] for j in jumps], y=[values[j]/1e4 for j in jumps], mode='markers+text', marker=dict(color='black', size=10, symbol=symbol), text=[text] * len(jumps), textposition=position, showlegend=False, name=f"{label} {text}"))
+    fig.update_layout(title='累计成本对比 (10k €)', xaxis_title='运营年数', yaxis_title='累计成本 (10k €)', hovermode='x unified')
+    return fig
 
 
-def show_cost_charts(costs, params) -> None:
+def show_cost_charts(costs, params, webgl=None) -> None:
     st.subheader("📈 模块 M2 - 成本累计与对比分析")
-    labels = list(costs['cumulative_costs'])
-    checks = [params.get('show_stage_v', True), params.get('show_electric_eu', True), params.get('show_electric_cn', True)]
-    colors = ['#636EFA', '#00CC96', '#EF553B']
-    years = costs['years']
-    fig = go.Figure()
-    for idx, (label, check) in enumerate(zip(labels, checks)):
-        if not check:
+    years = tuple(costs['years'])
+    pos = {t: i for i, t in enumerate(years)}
+    series, markers = [], []
+    for label in costs['cumulative_costs']:
+        v = vessel(label)
+        if not params.get(v.show_key, True):
             continue
-        y_data = costs['cumulative_costs'][label]
-        fig.add_trace(go.Scatter(x=years, y=[v/1e4 for v in y_data], mode='lines+markers', name=label, line=dict(color=colors[idx])))
-        # 标注周期性节点
-        if '电动船' in label:
-            cycle_ratio = (params['annual_hours'] * params['electric_consumption_per_hour'] / params['battery_capacity_kWh']) if params['battery_capacity_kWh'] else 0
-            battery_cycle = params['battery_cycle_life'] / cycle_ratio if cycle_ratio else 0
-            for jump in get_jump_years(battery_cycle, years[-1]):
-                fig.add_trace(go.Scatter(x=[jump], y=[y_data[jump]/1e4], mode='markers+text', marker=dict(color='black', size=10, symbol='diamond'), text=["电池更换"], textposition="top right", showlegend=False))
-        else:
-            overhaul_int = params.get('overhaul_interval_years_diesel', 10)
-            for jump in get_jump_years(overhaul_int, years[-1]):
-                fig.add_trace(go.Scatter(x=[jump], y=[y_data[jump]/1e4], mode='markers+text', marker=dict(color='black', size=10, symbol='x'), text=["大修"], textposition="bottom right", showlegend=False))
-    fig.update_layout(title='累计成本对比 (10k €)', xaxis_title='运营年数', yaxis_title='累计成本 (10k €)', hovermode='x unified')
-    st.plotly_chart(fig, use_container_width=True)
+        series.append((label, v.color, years, tuple(costs['cumulative_costs'][label])))
+        # 标注周期性节点（读取成本结果中的事件时间步）
+        steps = tuple(pos[t] for t in costs['event_years'][label])
+        position = "top right" if v.event.kind == 'battery' else "bottom right"
+        markers.append((v.event.symbol, v.event.marker, position, steps))
+    if webgl is None:
+        webgl = len(years) * len(series) > WEBGL_THRESHOLD
+    key = ('cost', tuple(series), tuple(markers), webgl)
+    fig = figure_cache.get_or_compute(key, lambda: _build_cost_figure(series, markers, webgl))
+    _plot(fig)
+
+
+@profiled()
+def _render_pie(sizes, labels, title) -> bytes:
+    """绘制占比饼图并返回 PNG 字节，绘制后立即释放图对象。"""
+    fig = mpl_figure(figsize=(5, 5))
+    ax = fig.subplots()
+    wedges, *_ = ax.pie(sizes, labels=None, autopct=lambda p: f'{p:.1f}%' if p > 0 else '', startangle=90, pctdistance=0.75)
+    ax.legend(wedges, labels, title='成本分项', loc='center left', bbox_to_anchor=(1, 0, 0.5, 1), frameon=False)
+    ax.set_title(title, y=1.05)
+    ax.axis('equal')
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', bbox_inches='tight')
+    fig.clear()
+    return buf.getvalue()
+
+
 def show_opex_piecharts(costs, params) -> None:
     st.subheader("📊 模块 M8 - 运营成本占比分析")
-    ship_type = st.radio("选择船型：", ["电动船 (EU)", "电动船 (CN)", "STAGE V 柴油船 (EU)"], horizontal=True, key="opex_ship")
+    ships = list(costs['annual_breakdown'])
+    ship_type = st.radio("选择船型：", ships, index=min(1, len(ships) - 1), horizontal=True, key="opex_ship")
     view_type = st.radio("选择成本视图：", ["年度运营成本", "全生命周期成本"], horizontal=True, key="opex_view")
-    years = params.get('lifecycle_years', 25)
-    crew = params['crew_num'] * params['crew_avg_cost']
-    # 计算各项
-    if "柴油" in ship_type:
-        energy = params['diesel_consumption_per_hour'] * params['annual_hours'] * params['mgo_price']
-        port = params['port_fee']
-        maint = params['maintenance_cost_diesel']
-        overhaul = params['overhaul_cost_per_event_diesel'] * (years // params['overhaul_interval_years_diesel'])
-        battery = 0
-    else:
-        energy = params['electric_consumption_per_hour'] * params['annual_hours'] * params['electricity_price']
-        port = 0
-        maint = params['maintenance_cost_electric']
-        replace = params['battery_replace_cost_eu'] if "EU" in ship_type else params['battery_replace_cost_cn']
-        cycle = params['battery_cycle_life'] / (params['annual_hours'] * params['electric_consumption_per_hour'] / params['battery_capacity_kWh']) if params['battery_capacity_kWh'] else float('inf')
-        battery = replace * (years // cycle)
-        overhaul = 0
-    insurance = costs['insurance_costs'][ship_type]
+    # 各分项与周期事件均读取成本结果，生命周期年限与成本曲线一致
+    years = costs['horizon_years']
+    part = costs['annual_breakdown'][ship_type]
+    events = {label: 0.0 for label in costs['event_labels'].values()}
+    events[costs['event_labels'][ship_type]] = sum(costs['event_costs'][ship_type])
     if view_type == "全生命周期成本":
-        energy *= years
-        maint *= years
-        crew *= years
-        port *= years
-        battery *= years
-        insurance *= years
-    labels = ['能源', '维护', '船员', '港口费', '大修费', '保险', '电池更换费']
-    sizes = [energy, maint, crew, port, overhaul, insurance, battery]
-    fig, ax = plt.subplots(figsize=(5, 5))
-    wedges, *_ = ax.pie(sizes, labels=None, autopct=lambda p: f'{p:.1f}%' if p > 0 else '', startangle=90, pctdistance=0.75)
-    ax.legend(wedges, labels, title='成本分项', loc='center left', bbox_to_anchor=(1, 0, 0.5, 1), frameon=False)
+        part = {label: value * years for label, value in part.items()}
+    else:
+        events = {label: value / years for label, value in events.items()}
+    labels = list(part) + list(events)
+    sizes = list(part.values()) + list(events.values())
     title = f"{ship_type} — {view_type} 占比图"
-    ax.set_title(title, y=1.05)
-    ax.axis('equal')
-    plt.tight_layout(); st.pyplot(fig)
+    key = ('pie', tuple(sizes), tuple(labels), title)
+    png = figure_cache.get_or_compute(key, lambda: _render_pie(sizes, labels, title))
+    st.image(png, use_container_width=True)
 def show_roi_analysis(costs, params) -> None:
+    import plotly.graph_objects as go
     st.subheader("💹 模块 M9 - ROI与回本周期分析")
-    ship_types = ["电动船 (EU)", "电动船 (CN)", "STAGE V 柴油船 (EU)"]
-    ship = st.radio("选择船型：", ship_types, horizontal=True, key="roi_ship")
+    ship_types = list(costs['cum_cashflow'])
+    ship = st.radio("选择船型：", ship_types, index=min(1, len(ship_types) - 1), horizontal=True, key="roi_ship")
     years = costs['years']
     cashflow = costs['cum_cashflow'][ship]
     payback = costs['payback_year'][ship]
@@ -95,12 +101,13 @@ def show_roi_analysis(costs, params) -> None:
     fig.add_trace(go.Scatter(x=years, y=cashflow, mode='lines+markers', name='累计净现金流'))
     if payback is not None:
         fig.add_vline(x=payback, line_dash='dash', line_color='red', annotation_text=f"回本年限: {payback}年")
-    fig.update_layout(title="累计净现金流与回本周期", xaxis_title="运营年数", yaxis_title="累计净现金流 (€)"); st.plotly_chart(fig, use_container_width=True)
+    fig.update_layout(title="累计净现金流与回本周期", xaxis_title="运营年数", yaxis_title="累计净现金流 (€)"); _plot(fig)
 def show_carbon_emissions(costs) -> None:
+    import plotly.graph_objects as go
     st.subheader("♻️ 模块 M11 - 碳排放与减排效益分析")
     annual_emissions = costs.get('annual_emissions', {})
     labels = list(annual_emissions.keys())
     values = [annual_emissions[k] for k in labels]
-    fig = go.Figure(go.Bar(x=labels, y=values, marker_color=['#EF553B', '#00CC96', '#636EFA']))
+    fig = go.Figure(go.Bar(x=labels, y=values, marker_color=[vessel(k).color for k in labels]))
     fig.update_layout(title='年度碳排放量 (吨CO₂)', yaxis_title="碳排放 (吨CO₂/年)")
-    st.plotly_chart(fig, use_container_width=True)
+    _plot(fig)